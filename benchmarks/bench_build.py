@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for the build pipeline.
+Generates synthetic content trees shaped like the real site and times
+BuildSystem.build() cold, warm and with no changes against each of them.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import logging
+import argparse
+import subprocess
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+SECTIONS = ['aws', 'gcp', 'azure', 'databricks', 'sql']
+TREE_VERSION = 2
+
+WORDS = (
+    'data pipeline stream batch partition shard replica leader follower quorum lease '
+    'latency throughput backpressure checkpoint watermark window join aggregate schema '
+    'parquet delta iceberg lakehouse warehouse cluster node executor driver shuffle spill '
+    'cache index compaction retention snapshot transaction isolation consistency '
+    'availability durability bucket object prefix region zone autoscaling quota budget'
+).split()
+
+
+class TreeGenerator:
+    """Writes a deterministic synthetic site tree with a given number of pages."""
+
+    def __init__(self, pages: int, seed: int = 42):
+        self.pages = pages
+        self.random = random.Random(seed)
+
+    def words(self, count: int) -> str:
+        return ' '.join(self.random.choice(WORDS) for _ in range(count))
+
+    def body_sections(self, target_bytes: int, markdown: bool) -> str:
+        """Produce roughly target_bytes of headings, paragraphs, lists, tables and code."""
+        parts = []
+        size = 0
+        while size < target_bytes:
+            heading = self.words(4).title()
+            paragraph = self.words(self.random.randint(40, 120))
+            items = [self.words(8) for _ in range(4)]
+            if markdown:
+                block = (
+                    f"## {heading}\n\n{paragraph}\n\n"
+                    + ''.join(f"- {item}\n" for item in items)
+                    + "\n| Option | Effect |\n|---|---|\n"
+                    + ''.join(f"| {self.words(2)} | {self.words(6)} |\n" for _ in range(3))
+                    + f"\n```python\nresult = {self.random.choice(WORDS)}(batch_size={self.random.randint(1, 512)})\n```\n\n"
+                )
+            else:
+                block = (
+                    f'<section class="mb-8"><h2 id="{heading.lower().replace(" ", "-")}" '
+                    f'class="text-2xl font-bold mb-4">{heading}</h2>\n'
+                    f'<p class="text-slate-600 mb-4">{paragraph}</p>\n<ul class="list-disc pl-6">\n'
+                    + ''.join(f'<li>{item}</li>\n' for item in items)
+                    + '</ul>\n<pre><code>' + self.words(12) + '</code></pre>\n'
+                    + (f'<a href="../index.html" class="hover:text-purple-600">{self.words(2)}</a>\n')
+                    + '</section>\n'
+                )
+            parts.append(block)
+            size += len(block)
+        return ''.join(parts)
+
+    def html_page(self, title: str, target_bytes: int) -> str:
+        return (
+            '<!DOCTYPE html>\n<html lang="en">\n<head>\n    <meta charset="UTF-8">\n'
+            f'    <title>{title}</title>\n'
+            '    <script src="https://cdn.tailwindcss.com"></script>\n'
+            '    <style>\n        body { font-family: "Inter", sans-serif; }\n    </style>\n'
+            '</head>\n<body class="bg-slate-50 text-slate-800">\n'
+            '<header class="bg-white"><nav><a href="../index.html">Home</a></nav></header>\n'
+            '<main class="container mx-auto px-4">\n'
+            f'<h1 class="text-4xl font-extrabold">{title}</h1>\n'
+            + self.body_sections(target_bytes, markdown=False)
+            + '</main>\n<footer class="bg-slate-800"><p>Footer</p></footer>\n</body>\n</html>\n'
+        )
+
+    def markdown_page(self, title: str, target_bytes: int) -> str:
+        return f"# {title}\n\n" + self.body_sections(target_bytes, markdown=True)
+
+    def yaml_page(self, title: str, target_bytes: int) -> str:
+        body = self.body_sections(target_bytes, markdown=True)
+        indented = ''.join(f'  {line}\n' if line else '\n' for line in body.split('\n'))
+        return (
+            f'title: "{title}"\n'
+            f'description: "{self.words(12)}"\n'
+            f'keywords: ["{self.random.choice(WORDS)}", "{self.random.choice(WORDS)}"]\n'
+            f'content: |\n{indented}'
+        )
+
+    def page_size(self) -> int:
+        # Realistic page sizes: 5-40 KB, skewed towards the small end
+        return int(5000 + 35000 * self.random.random() ** 2)
+
+    def generate(self, root: Path):
+        """Write the tree under root: content/, src/templates and the asset directory."""
+        content = root / 'content'
+        shutil.copytree(PROJECT_ROOT / 'src' / 'templates', root / 'src' / 'templates')
+        (content / 'pages').mkdir(parents=True)
+        (content / 'pages' / 'index.yaml').write_text(self.yaml_page('Home', 5000), encoding='utf-8')
+
+        assets = content / 'learn_concepts' / 'assets'
+        assets.mkdir(parents=True)
+        for asset in (PROJECT_ROOT / 'content' / 'learn_concepts' / 'assets').iterdir():
+            shutil.copy2(asset, assets / asset.name)
+
+        # Roughly 40% learn_concepts docs, the rest spread across the cloud sections
+        for index in range(self.pages - 1):
+            title = f"{self.words(3).title()} {index}"
+            size = self.page_size()
+            if index % 5 < 2:
+                topic = content / 'learn_concepts' / 'docs' / f"{index % 7:02d}-{WORDS[index % len(WORDS)]}"
+                kind = 'html' if index % 2 else 'md'
+                target = topic / f"page-{index}.{kind}"
+                text = self.html_page(title, size) if kind == 'html' else self.markdown_page(title, size)
+            else:
+                section = content / SECTIONS[(index // 5) % len(SECTIONS)]
+                if index % 3 == 0:
+                    section = section / 'case_studies'
+                roll = index % 10
+                if roll < 6:
+                    target, text = section / f"page-{index}.html", self.html_page(title, size)
+                elif roll < 9:
+                    target, text = section / f"page-{index}.md", self.markdown_page(title, size)
+                else:
+                    target, text = section / f"page-{index}.yaml", self.yaml_page(title, size)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(text, encoding='utf-8')
+
+        (root / 'tree.json').write_text(json.dumps({'pages': self.pages, 'version': TREE_VERSION}))
+
+
+def ensure_tree(workdir: Path, pages: int) -> Path:
+    """Return a generated tree for this size, reusing one from an earlier run."""
+    root = workdir / f'site-{pages}'
+    marker = root / 'tree.json'
+    if marker.exists():
+        meta = json.loads(marker.read_text())
+        if meta.get('pages') == pages and meta.get('version') == TREE_VERSION:
+            return root
+    if root.exists():
+        shutil.rmtree(root)
+    started = time.perf_counter()
+    TreeGenerator(pages).generate(root)
+    print(f"Generated {pages}-page tree in {time.perf_counter() - started:.1f}s at {root}", file=sys.stderr)
+    return root
+
+
+def reset_outputs(root: Path):
+    """Remove everything except the sources, so the next build is cold."""
+    for child in root.iterdir():
+        if child.name in ('content', 'src', 'tree.json'):
+            continue
+        if child.is_dir():
+            shutil.rmtree(child)
+        else:
+            child.unlink()
+
+
+def touch_sources(root: Path, fraction: float):
+    """Modify a fraction of the sources to simulate an edit between builds."""
+    sources = sorted(p for p in (root / 'content').rglob('*') if p.suffix in ('.html', '.md', '.yaml'))
+    step = max(1, int(1 / fraction))
+    for source in sources[::step]:
+        with open(source, 'a', encoding='utf-8') as f:
+            f.write('\n')
+
+
+def output_bytes(root: Path) -> int:
+    total = 0
+    for child in root.iterdir():
+        if child.name in ('content', 'src', 'tree.json', '.build_cache'):
+            continue
+        paths = child.rglob('*') if child.is_dir() else [child]
+        total += sum(p.stat().st_size for p in paths if p.is_file())
+    return total
+
+
+def run_one(root: Path, jobs: int) -> Dict[str, Any]:
+    """Run a single build in this process and return its measurements."""
+    from build_system import BuildConfig, BuildSystem
+
+    build_config = BuildConfig(project_root=root, jobs=jobs)
+    builder = BuildSystem(build_config)
+    logging.getLogger().setLevel(logging.WARNING)
+
+    started = time.perf_counter()
+    success = builder.build()
+    wall = time.perf_counter() - started
+
+    peak = None
+    if resource is not None:
+        peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                   resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+        if sys.platform == 'darwin':
+            peak //= 1024
+    return {'success': success, 'wall': wall, 'peak_rss_kb': peak}
+
+
+def measure(root: Path, pages: int, mode: str, jobs: int) -> Dict[str, Any]:
+    """Run one build in a fresh interpreter so memory is measured per run."""
+    if mode == 'cold':
+        reset_outputs(root)
+    elif mode == 'warm':
+        touch_sources(root, 0.01)
+
+    command = [sys.executable, __file__, '--run-one', str(root), '--jobs', str(jobs)]
+    completed = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+    result = json.loads(completed.stdout)
+    result.update({
+        'pages': pages,
+        'mode': mode,
+        'jobs': jobs,
+        'pages_per_second': pages / result['wall'] if result['wall'] else None,
+        'output_bytes': output_bytes(root),
+    })
+    return result
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_ROOT,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout.strip()
+    except OSError:
+        return ''
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: Path):
+    """Print throughput changes against a previous results file.
+
+    Results are matched on pages, mode and jobs; a result with no such
+    baseline falls back to the same pages and mode at another job count, and
+    is reported with both job counts. Results without any baseline are listed.
+    """
+    baseline = json.loads(baseline_path.read_text())
+    previous = {(r['pages'], r['mode'], r['jobs']): r for r in baseline['results']}
+    by_mode: Dict[Tuple[int, str], Dict[str, Any]] = {}
+    for r in baseline['results']:
+        by_mode.setdefault((r['pages'], r['mode']), r)
+    print(f"\nCompared with {baseline_path} ({baseline.get('commit') or 'unknown commit'}):")
+    if baseline.get('cpus') and baseline['cpus'] != os.cpu_count():
+        print(f"  baseline ran on {baseline['cpus']} CPUs, this run on {os.cpu_count()}")
+    for result in results:
+        label = f"  {result['pages']:>7} {result['mode']:<9}"
+        old = previous.get((result['pages'], result['mode'], result['jobs']))
+        jobs = ''
+        if old is None:
+            old = by_mode.get((result['pages'], result['mode']))
+            if old is not None:
+                jobs = f" (-j {result['jobs']} vs -j {old['jobs']})"
+        if old is None:
+            print(f"{label} no baseline for {result['pages']} pages/{result['mode']}/-j {result['jobs']}")
+        elif old.get('pages_per_second') and result.get('pages_per_second'):
+            change = (result['pages_per_second'] / old['pages_per_second'] - 1) * 100
+            print(f"{label} {change:+6.1f}% pages/s{jobs}")
+        else:
+            print(f"{label} no throughput to compare{jobs}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the site build on synthetic content trees')
+    parser.add_argument('--sizes', default='1000,10000,100000', help='Comma-separated page counts')
+    parser.add_argument('--modes', default='cold,warm,nochange', help='Comma-separated build modes')
+    parser.add_argument('--jobs', '-j', type=int, default=1, help='Worker processes passed to the build')
+    parser.add_argument('--workdir', type=Path, default=Path(tempfile.gettempdir()) / 'site-bench',
+                        help='Where synthetic trees are generated and kept between runs')
+    parser.add_argument('--output', type=Path, help='Results JSON (default: benchmarks/results/<time>-<commit>.json)')
+    parser.add_argument('--compare', type=Path, help='Previous results JSON to compare against')
+    parser.add_argument('--run-one', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args.run_one, args.jobs)))
+        return
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    modes = args.modes.split(',')
+    results = []
+    for pages in sizes:
+        root = ensure_tree(args.workdir, pages)
+        for mode in modes:
+            result = measure(root, pages, mode, args.jobs)
+            results.append(result)
+            print(f"{pages:>7} pages {mode:<9} {result['wall']:8.2f}s "
+                  f"{result['pages_per_second'] or 0:9.1f} pages/s "
+                  f"peak {result['peak_rss_kb']} KB, output {result['output_bytes']} B")
+
+    commit = git_commit()
+    output = args.output or PROJECT_ROOT / 'benchmarks' / 'results' / \
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{commit or 'nocommit'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'cpus': os.cpu_count(),
+            'results': results,
+        }, f, indent=2)
+    print(f"Results written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
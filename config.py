@@ -17,11 +17,66 @@ class Config:
         self.templates_dir = self.project_root / "src" / "templates"
         self.assets_dir = self.project_root / "assets"
         self.output_dir = self.project_root  # GitHub.io serves from root
+        self.cache_dir = self.project_root / ".build_cache"  # Incremental build state
 
         # Build settings
         self.clean_build = True
+        self.incremental_build = True
+        self.link_assets = True  # Reflink/hardlink verbatim files instead of copying
+        self.fingerprint_assets = True  # Content-hashed asset names + asset-manifest.json
+        self.fingerprint_extensions = [".css", ".js"]
+        self.utility_css = True  # Build-time utility stylesheet instead of the Tailwind CDN script
+        self.tailwind_cdn_url = "https://cdn.tailwindcss.com"
+        self.search_index = True  # Sharded client-side search index under search/
+        self.search_shard_bytes = 16384  # Target size of one term shard (uncompressed JSON)
+        self.search_doc_chunk = 64  # Pages per title table
+        self.search_max_postings = 2000  # Pages kept per term, best-weighted first
+        self.related_pages = 5  # Related guides listed under each page; 0 turns them off
+        self.related_max_terms = 64  # Terms per page vector
+        self.related_min_score = 0.1  # Cosine similarity a related page needs at least
+        self.prefetch_pages = 4  # Likely next pages hinted with <link rel="prefetch">; 0 turns them off
+        self.prefetch_budget = 32768  # Compressed bytes the hints of one page may fetch in total
+        # Loaded on demand, only by pages with Mermaid diagrams
+        self.mermaid_url = "https://cdn.jsdelivr.net/npm/mermaid@10/dist/mermaid.min.js"
+        # Offline service worker (sw.js) and its hashed precache-manifest.json
+        self.service_worker = True
+        self.precache_extensions = [".html", ".css", ".js", ".svg", ".png", ".jpg", ".jpeg", ".gif", ".webp",
+                                    ".ico", ".woff2"]
         self.verbose_logging = False
 
+        # Precompressed .gz/.zst siblings of text outputs (--precompress)
+        self.precompress = False
+        self.precompress_formats = ["gzip", "zstd"]  # zstd needs the zstandard package
+        self.precompress_extensions = [".html", ".css", ".js", ".xml", ".txt", ".json"]
+        self.precompress_min_size = 1024  # bytes; smaller files are not worth it
+        self.precompress_max_ratio = 0.9  # skip files that don't shrink below 90%
+
+        # Internal link check after every build (--check-links)
+        self.check_links = False
+
+        # Page weight budgets checked after every build (--check-budgets), by
+        # top-level section or output path glob. Every matching entry applies,
+        # later ones overriding earlier limits (None lifts a limit); external_*
+        # count third-party URLs.
+        self.check_budgets = False
+        self.page_budgets = {
+            "*": {
+                "html_bytes": 65536,
+                "gzip_bytes": 16384,
+                "inline_script_bytes": 24576,
+                "inline_style_bytes": 8192,
+                "external_scripts": 1,
+                "external_stylesheets": 1,
+            },
+            "learn_concepts": {"inline_script_bytes": 8192, "external_scripts": 0},
+        }
+
+        # Output regions that change on every build; a page differing only in
+        # these is not rewritten
+        self.volatile_output_patterns = [
+            r'\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}',  # build_time timestamps
+        ]
+
         # Site settings
         self.site_name = "Data Engineering Guides"
         self.site_description = "Comprehensive data engineering concepts, services, and best practices across major cloud platforms."
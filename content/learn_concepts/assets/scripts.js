@@ -1,5 +1,3 @@
-        mermaid.initialize({ startOnLoad: true, theme: 'default' });
-
         // Sidebar toggle functionality
         document.addEventListener('DOMContentLoaded', function() {
             const sidebar = document.getElementById('sidebar');
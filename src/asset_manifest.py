@@ -0,0 +1,78 @@
+"""
+Content-hashed asset names.
+Maps each fingerprinted asset (path relative to the output root) to a copy named
+after its content hash, and rewrites page URLs that point at it, so browsers can
+cache assets indefinitely and only download what changed.
+"""
+
+import re
+import json
+import posixpath
+from typing import Dict, Optional
+
+from build_manifest import hash_data
+
+
+HASH_LENGTH = 10
+
+# name.0123456789.css as produced by hashed_name()
+HASHED_NAME_RE = re.compile(r'^(.+)\.[0-9a-f]{%d}(\.[^.]+)$' % HASH_LENGTH)
+
+# URL path and the query string / fragment that follows it
+URL_PATH_RE = re.compile(r'([^?#]*)(.*)', re.DOTALL)
+
+
+def is_hashed(name: str) -> bool:
+    """True if a file name is a fingerprinted copy."""
+    return HASHED_NAME_RE.match(name) is not None
+
+
+def hashed_name(key: str, digest: str) -> str:
+    """styles.css -> styles.<hash>.css, in the same directory."""
+    stem, suffix = posixpath.splitext(key)
+    return f'{stem}.{digest[:HASH_LENGTH]}{suffix}'
+
+
+class AssetManifest:
+    """Original asset paths and their fingerprinted names, relative to the output root."""
+
+    def __init__(self, assets: Optional[Dict[str, str]] = None):
+        self.assets: Dict[str, str] = dict(assets or {})
+
+    def add(self, key: str, digest: str) -> str:
+        """Register an asset by its content hash. Returns the fingerprinted path."""
+        self.assets[key] = hashed_name(key, digest)
+        return self.assets[key]
+
+    @property
+    def version(self) -> str:
+        """Hash of the whole mapping; pages referencing assets depend on it."""
+        return hash_data(self.assets)
+
+    def resolve(self, url: str, page_key: str = '') -> str:
+        """Rewrite a URL found in the page at page_key if it points at a fingerprinted asset.
+
+        Root-relative ('/assets/x.css') and document-relative ('../assets/x.css')
+        URLs keep their form; anything else is returned unchanged.
+        """
+        if not self.assets or not url or '//' in url or url.startswith(('#', 'data:', 'mailto:')):
+            return url
+
+        path, query = URL_PATH_RE.match(url).groups()
+        if path.startswith('/'):
+            key = path.lstrip('/')
+        else:
+            key = posixpath.normpath(posixpath.join(posixpath.dirname(page_key), path))
+
+        hashed = self.assets.get(key)
+        if hashed is None:
+            return url
+        head, slash, _ = path.rpartition('/')
+        return f'{head}{slash}{posixpath.basename(hashed)}{query}'
+
+    @classmethod
+    def from_json(cls, text: str) -> 'AssetManifest':
+        return cls(json.loads(text))
+
+    def to_json(self) -> str:
+        return json.dumps(self.assets, indent=2, sort_keys=True) + '\n'
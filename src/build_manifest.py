@@ -0,0 +1,211 @@
+"""
+Persistent build manifest for incremental builds.
+Records a content hash of every input that contributed to each output.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+
+MANIFEST_VERSION = 1
+
+
+def hash_bytes(data: bytes) -> str:
+    """Return the hex digest used for all manifest hashes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_data(data: Any) -> str:
+    """Hash a JSON-serialisable value in a key-order independent way."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hash_bytes(encoded)
+
+
+class BuildManifest:
+    """Tracks the inputs of every output written by the build."""
+
+    def __init__(self, manifest_path: Path, project_root: Path, output_dir: Path,
+                 generator_files: Iterable[Path] = ()):
+        self.manifest_path = manifest_path
+        self.project_root = project_root
+        self.output_dir = output_dir
+        self.previous: Dict[str, Dict[str, Any]] = {}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # (size, mtime_ns, hash) per input file, so unchanged files are not re-read
+        self.previous_files: Dict[str, List[Any]] = {}
+        self.files: Dict[str, List[Any]] = {}
+        self._file_hashes: Dict[Path, str] = {}
+        # Why load() found nothing to build on, for --explain
+        self.invalid_reason: Optional[str] = None
+        self.generator = self._hash_generator(generator_files)
+
+    def _hash_generator(self, files: Iterable[Path]) -> str:
+        """Hash the build code itself so a generator change invalidates everything."""
+        digests = {}
+        for file_path in sorted(files):
+            if file_path.exists():
+                digests[file_path.name] = self.file_hash(file_path)
+        return hash_data(digests)
+
+    def load(self) -> bool:
+        """Load the previous manifest. Returns False if it is missing or unusable."""
+        self.previous = {}
+        self.entries = {}
+        self.refresh()
+        if not self.manifest_path.exists():
+            self.invalid_reason = 'no previous build'
+            return False
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            self.invalid_reason = 'unreadable build manifest'
+            return False
+
+        if data.get('version') != MANIFEST_VERSION:
+            self.invalid_reason = 'build manifest format changed'
+            return False
+        if data.get('generator') != self.generator:
+            self.invalid_reason = 'build code changed'
+            return False
+
+        self.previous = data.get('outputs', {})
+        self.previous_files = data.get('files', {})
+        self.invalid_reason = None
+        return True
+
+    def save(self):
+        """Persist the manifest for the next build."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'generator': self.generator,
+            'outputs': self.entries,
+            'files': self.files,
+        }
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        tmp_path.replace(self.manifest_path)
+        # A long-running process builds on top of what it just saved
+        self.previous = dict(self.entries)
+        self.previous_files = dict(self.files)
+
+    def carry_over(self):
+        """Keep every output of the previous build, for builds that only touch some of them."""
+        self.entries = {**self.previous, **self.entries}
+        self.files = {**self.previous_files, **self.files}
+
+    def refresh(self):
+        """Forget memoized hashes so files edited since are looked at again."""
+        self._file_hashes = {}
+
+    def file_hash(self, file_path: Path) -> str:
+        """Hash a file's bytes, memoized for the lifetime of one build.
+
+        A file whose size and mtime match the previous build reuses its recorded
+        hash instead of being read again.
+        """
+        digest = self._file_hashes.get(file_path)
+        if digest is not None:
+            return digest
+
+        stat = file_path.stat()
+        key = self.input_key(file_path)
+        previous = self.previous_files.get(key)
+        if previous and previous[0] == stat.st_size and previous[1] == stat.st_mtime_ns:
+            digest = previous[2]
+        else:
+            digest = hash_bytes(file_path.read_bytes())
+        self.files[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        self._file_hashes[file_path] = digest
+        return digest
+
+    def input_key(self, file_path: Path) -> str:
+        """Manifest key for an input file; inputs outside the project keep their full path."""
+        try:
+            return file_path.relative_to(self.project_root).as_posix()
+        except ValueError:
+            return str(file_path)
+
+    def output_key(self, output_file: Path) -> str:
+        """Manifest key for an output file."""
+        return output_file.relative_to(self.output_dir).as_posix()
+
+    def fingerprint(self, source_file: Path, templates: Dict[str, Path] = None,
+                    page_config: Optional[Dict[str, Any]] = None,
+                    assets: Optional[str] = None,
+                    related: Optional[List[Dict[str, str]]] = None,
+                    prefetch: Optional[List[Dict[str, str]]] = None) -> Dict[str, Any]:
+        """Describe every input of an output: source bytes, templates, page config,
+        the version of the fingerprinted asset names it links to, the related
+        pages it lists and the pages it prefetches."""
+        inputs = {'source': self.file_hash(source_file)}
+        if templates:
+            inputs['templates'] = {name: self.file_hash(path) for name, path in sorted(templates.items())}
+        if page_config is not None:
+            inputs['config'] = hash_data(page_config)
+        if assets is not None:
+            inputs['assets'] = assets
+        if related:
+            inputs['related'] = hash_data(related)
+        if prefetch:
+            inputs['prefetch'] = hash_data(prefetch)
+        return inputs
+
+    def is_fresh(self, output_file: Path, inputs: Dict[str, Any]) -> bool:
+        """True if the output exists and was built from exactly these inputs."""
+        entry = self.previous.get(self.output_key(output_file))
+        return entry is not None and entry.get('inputs') == inputs and output_file.exists()
+
+    def changed_inputs(self, output_file: Path, inputs: Dict[str, Any]) -> Optional[List[str]]:
+        """Names of the inputs that differ from the previous build, templates as
+        'templates:<name>'; None if the output wasn't built before."""
+        entry = self.previous.get(self.output_key(output_file))
+        if entry is None:
+            return None
+        previous = entry.get('inputs', {})
+        changed = []
+        for name in sorted(set(previous) | set(inputs)):
+            if name == 'templates':
+                old, new = previous.get(name) or {}, inputs.get(name) or {}
+                changed += [f'templates:{template}' for template in sorted(set(old) | set(new))
+                            if old.get(template) != new.get(template)]
+            elif previous.get(name) != inputs.get(name):
+                changed.append(name)
+        return changed
+
+    def record(self, output_file: Path, source_file: Path, inputs: Dict[str, Any],
+               flags: Optional[Dict[str, Any]] = None):
+        """Record the inputs an output was built from, and flags describing it."""
+        entry = {
+            'source': self.input_key(source_file),
+            'inputs': inputs,
+        }
+        if flags:
+            entry['flags'] = flags
+        self.entries[self.output_key(output_file)] = entry
+
+    def flags(self, output_file: Path) -> Dict[str, Any]:
+        """Flags the previous build recorded for an output, still valid while it is fresh."""
+        entry = self.previous.get(self.output_key(output_file))
+        return dict(entry.get('flags', {})) if entry else {}
+
+    def set_flags(self, output_file: Path, flags: Dict[str, Any]):
+        """Replace the flags of an output recorded in this build."""
+        entry = self.entries.get(self.output_key(output_file))
+        if entry is None:
+            return
+        if flags:
+            entry['flags'] = flags
+        else:
+            entry.pop('flags', None)
+
+    def stale_outputs(self) -> Iterable[Path]:
+        """Outputs of the previous build whose source file has since been removed."""
+        for key in sorted(set(self.previous) - set(self.entries)):
+            source = self.project_root / self.previous[key].get('source', '')
+            if not source.is_file():
+                yield self.output_dir / key
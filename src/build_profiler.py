@@ -0,0 +1,144 @@
+"""
+Build profiler: wall/CPU time per build phase, per page and per page sub-step.
+All hooks are no-ops unless profiling is enabled.
+"""
+
+import sys
+import json
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _peak_rss_kb(who: int) -> Optional[int]:
+    """Peak resident set size in KB for this process or its waited-for children."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+class BuildProfiler:
+    """Collects timings and I/O counters for one build."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.phases: List[Dict[str, Any]] = []
+        self.pages: List[Dict[str, Any]] = []
+        self.current: Optional[Dict[str, Any]] = None
+        self._start_wall = time.perf_counter()
+        self._start_cpu = time.process_time()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a top-level build phase."""
+        if not self.enabled:
+            yield
+            return
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.phases.append({
+                'name': name,
+                'wall': time.perf_counter() - wall,
+                'cpu': time.process_time() - cpu,
+            })
+
+    @contextmanager
+    def page(self, output: str, kind: str, source_file: Optional[Path] = None) -> Iterator[Optional[Dict[str, Any]]]:
+        """Time the work for one output. Yields the record so tasks can return it to the main process."""
+        if not self.enabled:
+            yield None
+            return
+        record = {
+            'output': output,
+            'kind': kind,
+            'steps': {},
+            'bytes_read': source_file.stat().st_size if source_file and source_file.exists() else 0,
+            'bytes_written': 0,
+        }
+        previous, self.current = self.current, record
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall'] = time.perf_counter() - wall
+            record['cpu'] = time.process_time() - cpu
+            self.current = previous
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        """Time a sub-step of the page currently being built."""
+        record = self.current
+        if record is None:
+            yield
+            return
+        wall = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['steps'][name] = record['steps'].get(name, 0.0) + time.perf_counter() - wall
+
+    def add_page(self, record: Optional[Dict[str, Any]], extra_steps: Optional[Dict[str, float]] = None):
+        """Collect a page record, possibly produced in a worker process."""
+        if record is None:
+            return
+        if extra_steps:
+            for name, seconds in extra_steps.items():
+                record['steps'][name] = record['steps'].get(name, 0.0) + seconds
+                record['wall'] += seconds
+        self.pages.append(record)
+
+    def report(self) -> Dict[str, Any]:
+        """Summarise the build as a JSON-serialisable dict."""
+        pages = sorted(self.pages, key=lambda record: record['wall'], reverse=True)
+        return {
+            'wall': time.perf_counter() - self._start_wall,
+            'cpu': time.process_time() - self._start_cpu,
+            'phases': self.phases,
+            'pages': pages,
+            'bytes_read': sum(record['bytes_read'] for record in pages),
+            'bytes_written': sum(record['bytes_written'] for record in pages),
+            'peak_rss_kb': {
+                'main': _peak_rss_kb(resource.RUSAGE_SELF) if resource else None,
+                'workers': _peak_rss_kb(resource.RUSAGE_CHILDREN) if resource else None,
+            },
+        }
+
+    def write_report(self, report: Dict[str, Any], report_path: Path):
+        """Write the JSON report."""
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    def format_table(self, report: Dict[str, Any], top_n: int = 20) -> str:
+        """Render the phases and the top-N slowest pages as a text table."""
+        lines = [f"{'phase':<28}{'wall ms':>10}{'cpu ms':>10}"]
+        for phase in report['phases']:
+            lines.append(f"{phase['name']:<28}{phase['wall'] * 1000:>10.1f}{phase['cpu'] * 1000:>10.1f}")
+
+        lines.append('')
+        lines.append(f"{'slowest outputs':<60}{'kind':>14}{'wall ms':>10}{'cpu ms':>10}  slowest step")
+        for record in report['pages'][:top_n]:
+            slowest = max(record['steps'].items(), key=lambda item: item[1], default=('-', 0.0))
+            lines.append(
+                f"{record['output'][-60:]:<60}{record['kind']:>14}{record['wall'] * 1000:>10.1f}"
+                f"{record['cpu'] * 1000:>10.1f}  {slowest[0]} ({slowest[1] * 1000:.1f} ms)"
+            )
+
+        rss = report['peak_rss_kb']
+        lines.append('')
+        lines.append(
+            f"total {report['wall']:.2f}s wall, {report['cpu']:.2f}s cpu (main); "
+            f"read {report['bytes_read']} B, wrote {report['bytes_written']} B; "
+            f"peak RSS main {rss['main']} KB, workers {rss['workers']} KB"
+        )
+        return '\n'.join(lines)
@@ -5,33 +5,151 @@ Uses Jinja2 templating, proper error handling, and centralized configuration.
 """
 
 import os
+import re
+import io
+import html
 import sys
 import json
+import time
 import shutil
 import logging
-import re
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Set, Tuple
 from datetime import datetime
 
-import markdown
-import yaml
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
 
-from path_manager import PathManager
+from site_routes import COPIED_SECTION, Route, SiteRoutes
+from template_graph import TemplateGraph
+from page_loader import Page, PageLoader
+from build_manifest import BuildManifest, hash_data
+from fragment_cache import FragmentCache
+from file_sync import FileSync
+from output_writer import OutputWriter
+from build_profiler import BuildProfiler
+from markdown_engine import MarkdownEngine
+from precompress import Precompressor, SIBLING_SUFFIXES, is_sibling
+from asset_manifest import AssetManifest, is_hashed
+from utility_css import UtilityCss, extract_candidates
+from search_index import SearchIndex, SEARCH_DIR, assign_ids, extract_document
+from related_pages import (
+    RelatedPages, STATE_VERSION as RELATED_STATE_VERSION, PYTHON_SCORER_PAGES, SCORER_NAMES, stored_terms
+)
+from precache import PrecacheManifest
+from prefetch_hints import PrefetchPlanner, STATE_VERSION as PREFETCH_STATE_VERSION, compressed_size, extract_page
+from link_checker import LinkChecker, extract_links
+from page_weight import PageBudgets, STATE_VERSION as WEIGHT_STATE_VERSION, format_report, measure_page, weight_report
+from sitemap import SitemapWriter, git_dates
+from html_rewriter import (
+    HtmlRewriter, RewriteRule, ReplaceElementRule, DropElementRule, AppendToHeadRule, AddClassRule,
+    RewriteUrlRule, ReplaceScriptRule, DropInlineScriptRule, AppendToBodyIfClassRule, InsertBeforeEndTagRule
+)
 from config import config
 
 
+# Templates each kind of output is rendered from; the template graph adds
+# everything they include, extend or import
+PAGE_TEMPLATES = ['base.html']
+FRAGMENT_TEMPLATES = ['components/header.html', 'components/footer.html', 'components/related.html']
+
+# --explain wording for a changed manifest input
+INPUT_CHANGES = {
+    'source': 'source changed',
+    'config': 'page config changed',
+    'assets': 'fingerprinted assets changed',
+    'related': 'related pages changed',
+    'prefetch': 'prefetch hints changed',
+}
+
+# Generated stylesheet (relative to the output root) and the files scanned for its classes
+UTILITY_STYLESHEET = 'assets/utilities.css'
+UTILITY_SOURCE_SUFFIXES = {'.html', '.md', '.yaml', '.js'}
+
+# Browser side of the search index, shipped as a generated asset
+SEARCH_SCRIPT = 'assets/search.js'
+
+# Mermaid is only loaded by pages with diagrams, through a loader that fetches
+# the library when the first diagram nears the viewport
+MERMAID_SCRIPT = 'assets/mermaid.js'
+MERMAID_CLASS_RE = re.compile(r'''class\s*=\s*["'](?:[^"']*\s)?mermaid[\s"']''')
+# What copied pages load and run themselves, dropped in favour of the loader
+MERMAID_CDN_PREFIX = 'https://cdn.jsdelivr.net/npm/mermaid@'
+MERMAID_INIT_PATTERN = r'mermaid\.initialize\([^)]*\);?'
+
+# Offline service worker, at the site root so it controls every page
+SERVICE_WORKER = 'sw.js'
+PRECACHE_MANIFEST = 'precache-manifest.json'
+# Same as in base.html; the dev server (--watch) runs without it
+SERVICE_WORKER_TAG = ("<script>if ('serviceWorker' in navigator && !/^(localhost|127\\.0\\.0\\.1)$/"
+                      ".test(location.hostname)) { navigator.serviceWorker.register('/sw.js'); }</script>")
+
+# Format of .build_cache/sitemap.json, the lastmod history of every page
+SITEMAP_STATE_VERSION = 1
+
+
 class BuildConfig:
     """Configuration for the build system."""
-    def __init__(self, verbose=False, clean=True):
-        self.project_root = config.project_root
-        self.source_dir = config.source_dir
-        self.output_dir = config.output_dir
-        self.templates_dir = config.templates_dir
-        self.assets_dir = config.assets_dir
+    def __init__(self, verbose=False, clean=True, incremental=True, jobs=1, profile=False,
+                 profile_report=None, profile_top=20, precompress=False, check_links=False,
+                 link_report=None, check_budgets=False, weight_report=None, sections=None, only=None,
+                 files=None, explain=False, project_root=None):
+        # Directories keep their layout relative to the project root, so a
+        # different root (e.g. a benchmark tree) can be built the same way
+        root = Path(project_root) if project_root else config.project_root
+
+        def rebase(path: Path) -> Path:
+            return root / path.relative_to(config.project_root)
+
+        self.project_root = root
+        self.source_dir = rebase(config.source_dir)
+        self.output_dir = rebase(config.output_dir)
+        self.templates_dir = rebase(config.templates_dir)
+        self.assets_dir = rebase(config.assets_dir)
+        self.cache_dir = rebase(config.cache_dir)
+        self.link_assets = config.link_assets
+        self.fingerprint_assets = config.fingerprint_assets
+        self.fingerprint_extensions = config.fingerprint_extensions
+        self.utility_css = config.utility_css
+        self.tailwind_cdn_url = config.tailwind_cdn_url
+        self.site_url = config.site_url
+        self.search_index = config.search_index
+        self.search_shard_bytes = config.search_shard_bytes
+        self.search_doc_chunk = config.search_doc_chunk
+        self.search_max_postings = config.search_max_postings
+        self.related_pages = config.related_pages
+        self.related_max_terms = config.related_max_terms
+        self.related_min_score = config.related_min_score
+        self.prefetch_pages = config.prefetch_pages
+        self.prefetch_budget = config.prefetch_budget
+        self.mermaid_url = config.mermaid_url
+        self.service_worker = config.service_worker
+        self.precache_extensions = config.precache_extensions
+        self.volatile_output_patterns = config.volatile_output_patterns
+        self.markdown_extensions = config.markdown_extensions
+        self.markdown_extension_configs = config.markdown_extension_configs
+        self.precompress = precompress
+        self.precompress_formats = config.precompress_formats
+        self.precompress_extensions = config.precompress_extensions
+        self.precompress_min_size = config.precompress_min_size
+        self.precompress_max_ratio = config.precompress_max_ratio
         self.verbose = verbose
         self.clean = clean
+        self.incremental = incremental
+        self.jobs = max(1, jobs)
+        self.profile = profile
+        self.profile_report = profile_report or self.cache_dir / 'profile.json'
+        self.profile_top = profile_top
+        self.check_links = check_links
+        self.link_report = link_report or self.cache_dir / 'link-report.json'
+        self.check_budgets = check_budgets
+        self.weight_report = weight_report or self.cache_dir / 'weight-report.json'
+        self.page_budgets = config.page_budgets
+        # Partial builds: top-level source directories, glob patterns and source files
+        self.sections = list(sections or [])
+        self.only = list(only or [])
+        self.files = [Path(path) for path in files or []]
+        self.partial = bool(self.sections or self.only or self.files)
+        self.explain = explain
 
 
 class BuildError(Exception):
@@ -39,17 +157,95 @@ class BuildError(Exception):
     pass
 
 
+def page_flags(page: Page) -> Dict[str, bool]:
+    """Features a page needs scripts for, recorded in the manifest; only set flags are kept."""
+    flags = {}
+    if MERMAID_CLASS_RE.search(page.body):
+        flags['mermaid'] = True
+    return flags
+
+
+# Per-process build system used by pool workers, created by _init_worker
+_worker_builder = None
+
+
+def _init_worker(build_config: BuildConfig, assets: Dict[str, str]):
+    """Give each worker process its own build system and Jinja environment."""
+    global _worker_builder
+    _worker_builder = BuildSystem(build_config, worker=True)
+    _worker_builder.use_asset_manifest(AssetManifest(assets))
+
+
+def _run_in_worker(method_name: str, item: Any) -> Any:
+    """Run a BuildSystem task method on the worker's build system."""
+    return getattr(_worker_builder, method_name)(item)
+
+
 class BuildSystem:
     """Main build system class."""
 
-    def __init__(self, config: BuildConfig):
+    def __init__(self, config: BuildConfig, worker: bool = False):
         self.config = config
-        self.path_manager = PathManager(config.project_root)
+        self.worker = worker
+        self.executor = None
+        self.executor_assets: Dict[str, str] = {}
+        self.pending_post_process: List[Tuple[Path, Path, List[Dict[str, str]], List[Dict[str, str]]]] = []
+        self.routes = SiteRoutes(config.source_dir, config.output_dir)
+        self.page_loader = PageLoader()
+        self.manifest = BuildManifest(
+            config.cache_dir / 'manifest.json',
+            config.project_root,
+            config.output_dir,
+            generator_files=list(Path(__file__).parent.glob('*.py')) + [config.project_root / 'config.py']
+        )
+        self.incremental = False
+        self.file_sync = FileSync(link=config.link_assets)
+        self.output_writer = OutputWriter(config.volatile_output_patterns)
+        self.build_time = datetime.now()
+        self.profiler = BuildProfiler(enabled=config.profile)
+        self.markdown_engine = MarkdownEngine(
+            config.markdown_extensions,
+            config.markdown_extension_configs,
+            cache_dir=config.cache_dir / 'markdown'
+        )
+        self.precompressor = Precompressor(
+            config.precompress_formats,
+            config.precompress_extensions,
+            config.precompress_min_size,
+            config.precompress_max_ratio
+        )
+        self.asset_manifest = AssetManifest()
+        self.fingerprinted_sources: Set[Path] = set()
+        self.utilities = UtilityCss()
+        # Assets written by the build itself: {output key: file in the build cache}
+        self.generated_assets: Dict[str, Path] = {}
+        self.sitemap_writer = SitemapWriter(config.output_dir, config.site_url, self.output_writer)
+        self.search_indexer = SearchIndex(config.search_shard_bytes, config.search_doc_chunk, config.search_max_postings)
+        self.related_engine = RelatedPages(config.related_pages, config.related_max_terms, config.related_min_score)
+        # Related output keys per output key, and the titles they are linked with
+        self.related: Dict[str, List[str]] = {}
+        self.related_titles: Dict[str, str] = {}
+        self.prefetch_planner = PrefetchPlanner(config.prefetch_pages, config.prefetch_budget)
+        # Prefetch hints per output key, from the link graph of the last full build
+        self.prefetch: Dict[str, List[Dict[str, str]]] = {}
+        self.precache = PrecacheManifest(config.output_dir, config.cache_dir / 'precache.json')
+        if config.search_index:
+            self.generated_assets[SEARCH_SCRIPT] = Path(__file__).parent / 'search.js'
+        self.generated_assets[MERMAID_SCRIPT] = Path(__file__).parent / 'mermaid.js'
         self.setup_logging()
-        self.setup_jinja()
+        # Created on first render, so builds that render nothing never import Jinja
+        self._jinja_env = None
+        self.template_graph = TemplateGraph(config.templates_dir, config.cache_dir / 'templates.json',
+                                            self.referenced_templates)
+        self.fragments = FragmentCache(config.templates_dir, self.render_template, self.fragment_templates)
 
     def setup_logging(self):
         """Set up logging configuration."""
+        # Workers report back to the main process, which does all the logging
+        if self.worker:
+            self.logger = logging.getLogger(__name__)
+            return
+
         # Ensure output directory exists
         self.config.output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -64,52 +260,106 @@ class BuildSystem:
         )
         self.logger = logging.getLogger(__name__)
 
+    @property
+    def jinja_env(self):
+        """The Jinja2 environment, set up on first use."""
+        if self._jinja_env is None:
+            self._jinja_env = self.setup_jinja()
+        return self._jinja_env
+
     def setup_jinja(self):
-        """Set up Jinja2 environment."""
-        self.jinja_env = Environment(
+        """Set up Jinja2 environment.
+
+        Compiled templates are kept in the build cache, so warm starts and pool
+        workers load them instead of compiling every template again. Jinja only
+        checks a cached template against its source, so the cache directory is
+        per build code version (which covers the environment options below).
+        """
+        from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, pass_context
+
+        bytecode_root = self.config.cache_dir / 'jinja'
+        bytecode_dir = bytecode_root / self.manifest.generator[:16]
+        bytecode_dir.mkdir(parents=True, exist_ok=True)
+        if not self.worker:
+            for stale in bytecode_root.iterdir():
+                if stale != bytecode_dir:
+                    shutil.rmtree(stale, ignore_errors=True)
+
+        jinja_env = Environment(
             loader=FileSystemLoader(self.config.templates_dir),
             trim_blocks=True,
             lstrip_blocks=True,
-            autoescape=True
+            autoescape=True,
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_dir))
         )
 
         # Add custom filters
-        self.jinja_env.filters['basename'] = lambda x: Path(x).name
-        self.jinja_env.filters['dirname'] = lambda x: str(Path(x).parent)
-
-    def load_page_config(self, page_path: Path) -> Dict[str, Any]:
-        """Load configuration for a specific page."""
-        # If it's already a YAML file, load it directly
-        if page_path.suffix == '.yaml':
-            try:
-                with open(page_path, 'r', encoding='utf-8') as f:
-                    config = yaml.safe_load(f) or {}
-                    # Remove content from config as it's handled separately
-                    config.pop('content', None)
-                    return config
-            except Exception as e:
-                self.logger.warning(f"Failed to load config for {page_path}: {e}")
-                return {}
-
-        # Look for a separate YAML config file
-        config_file = page_path.with_suffix('.yaml')
-        if config_file.exists():
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    return yaml.safe_load(f) or {}
-            except Exception as e:
-                self.logger.warning(f"Failed to load config for {page_path}: {e}")
-                return {}
-
-        # Default config
-        return {
-            'title': page_path.stem.replace('-', ' ').title(),
-            'description': 'Data engineering concepts and guides',
-            'keywords': ['data engineering', 'cloud', 'distributed systems']
-        }
+        jinja_env.filters['basename'] = lambda x: Path(x).name
+        jinja_env.filters['dirname'] = lambda x: str(Path(x).parent)
+        # Root-relative asset URL -> its fingerprinted name. pass_context stops Jinja
+        # from folding constant URLs into compiled templates, which outlive a rebuild
+        jinja_env.filters['asset_url'] = pass_context(lambda context, url: self.asset_manifest.resolve(url))
+        jinja_env.globals['utility_css'] = self.config.utility_css
+        jinja_env.globals['search_index'] = self.config.search_index
+        jinja_env.globals['mermaid_url'] = self.config.mermaid_url
+        jinja_env.globals['service_worker'] = self.config.service_worker
+        return jinja_env
+
+    def load_page(self, source_file: Path) -> Page:
+        """Metadata and body of a page source, parsed once per build."""
+        return self.page_loader.load(source_file, self.routes.sidecar(source_file))
+
+    def referenced_templates(self, source: str) -> Iterable[Optional[str]]:
+        """Templates a template source includes, extends or imports (None if computed)."""
+        from jinja2 import meta
+        return meta.find_referenced_templates(self.jinja_env.parse(source))
+
+    def template_paths(self, template_names: List[str]) -> Dict[str, Path]:
+        """Map the templates an output is rendered from, and every template they
+        reach, to their files, for manifest fingerprints."""
+        return {name: self.config.templates_dir / name for name in self.template_graph.dependencies(template_names)}
+
+    def fragment_templates(self, template_name: str) -> List[str]:
+        """Templates a cached fragment is rendered from, itself included."""
+        if not self.template_graph.edges:
+            # Workers don't scan templates up front; the main process keeps the cache current
+            self.load_template_graph()
+        return self.template_graph.dependencies([template_name]) or [template_name]
+
+    def load_template_graph(self):
+        parsed = self.template_graph.load()
+        if parsed:
+            self.logger.debug(f"Parsed {parsed} changed templates")
+
+    def explain_rebuild(self, output_file: Path, inputs: Dict[str, Any], template_names: List[str]):
+        """Log why an output is being rebuilt (--explain)."""
+        if not self.config.explain:
+            return
+        if not self.config.incremental:
+            reasons = ['--full']
+        elif self.manifest.invalid_reason:
+            reasons = [self.manifest.invalid_reason]
+        else:
+            changed = self.manifest.changed_inputs(output_file, inputs)
+            if changed is None:
+                reasons = ['not built before']
+            elif not changed:
+                reasons = ['output missing']
+            else:
+                reasons = []
+                for name in changed:
+                    if name.startswith('templates:'):
+                        template = name[len('templates:'):]
+                        chain = self.template_graph.chain(template_names, template)
+                        via = f" (via {' -> '.join(chain[:-1])})" if len(chain) > 1 else ''
+                        reasons.append(f"template {template} changed{via}")
+                    else:
+                        reasons.append(INPUT_CHANGES.get(name, f"{name} changed"))
+        self.logger.info(f"Rebuilding {self.manifest.output_key(output_file)}: {'; '.join(reasons)}")
 
     def render_template(self, template_name: str, context: Dict[str, Any]) -> str:
         """Render a Jinja2 template with context."""
+        from jinja2 import TemplateNotFound
         try:
             template = self.jinja_env.get_template(template_name)
             return template.render(**context)
@@ -118,145 +368,42 @@ class BuildSystem:
         except Exception as e:
             raise BuildError(f"Template rendering failed: {e}")
 
-    def process_markdown_file(self, md_file: Path) -> str:
-        """Convert markdown file to HTML."""
-        try:
-            with open(md_file, 'r', encoding='utf-8') as f:
-                md_content = f.read()
-
-            # Configure markdown extensions
-            md_extensions = [
-                'markdown.extensions.extra',
-                'markdown.extensions.codehilite',
-                'markdown.extensions.tables',
-                'markdown.extensions.toc',
-                'markdown.extensions.fenced_code'
-            ]
-
-            # Convert markdown to HTML
-            html_content = markdown.markdown(
-                md_content,
-                extensions=md_extensions,
-                extension_configs={
-                    'markdown.extensions.codehilite': {'use_pygments': False}
-                }
-            )
-
-            return html_content
-
-        except Exception as e:
-            raise BuildError(f"Failed to process markdown file {md_file}: {e}")
-
-    def process_yaml_file(self, yaml_file: Path) -> str:
-        """Process YAML file with content."""
-        try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                yaml_content = yaml.safe_load(f)
-
-            # Extract content from YAML
-            content = yaml_content.get('content', '')
-
-            # Clean up content - remove common leading whitespace from YAML block scalar
-            if content:
-                lines = content.split('\n')
-                # Find the minimum indentation of non-empty lines
-                non_empty_lines = [line for line in lines if line.strip()]
-                if non_empty_lines:
-                    min_indent = min(len(line) - len(line.lstrip()) for line in non_empty_lines if line.strip())
-                    # Remove the common indentation
-                    cleaned_lines = []
-                    for line in lines:
-                        if line.strip():  # Non-empty line
-                            cleaned_lines.append(line[min_indent:] if len(line) > min_indent else line.lstrip())
-                        else:  # Empty line
-                            cleaned_lines.append('')
-                    content = '\n'.join(cleaned_lines)
-
-            # Process content as markdown if it contains markdown-like syntax
-            if content and ('#' in content or '*' in content or '[' in content):
-                # Configure markdown extensions
-                md_extensions = [
-                    'markdown.extensions.extra',
-                    'markdown.extensions.codehilite',
-                    'markdown.extensions.tables',
-                    'markdown.extensions.toc',
-                    'markdown.extensions.fenced_code'
-                ]
-
-                # Convert markdown to HTML
-                html_content = markdown.markdown(
-                    content,
-                    extensions=md_extensions,
-                    extension_configs={
-                        'markdown.extensions.codehilite': {'use_pygments': False}
-                    }
-                )
-                return html_content
-            else:
-                # Return content as-is (assuming it's already HTML)
-                return content
-
-        except Exception as e:
-            raise BuildError(f"Failed to process YAML file {yaml_file}: {e}")
-
-    def build_page(self, source_file: Path, template: str = 'base.html') -> str:
+    def build_page(self, source_file: Path, template: str = 'base.html',
+                   page: Optional[Page] = None, related: Optional[List[Dict[str, str]]] = None,
+                   prefetch: Optional[List[Dict[str, str]]] = None) -> str:
         """Build a single page."""
         try:
-            # Load page configuration
-            page_config = self.load_page_config(source_file)
+            if page is None:
+                with self.profiler.step('config_load'):
+                    page = self.load_page(source_file)
 
-            # Determine output path for path calculations
-            if source_file.name in ['index.yaml', 'index.md'] and 'pages' in source_file.parts:
-                # Root index files should be treated as root index.html for path calculations
-                temp_output_file = self.config.project_root / 'index.html'
-            else:
-                # Normal path calculation for relative URLs
-                rel_path = source_file.relative_to(self.config.source_dir)
-                if source_file.suffix in ['.md', '.yaml']:
-                    temp_output_file = self.config.project_root / rel_path.with_suffix('.html')
-                else:
-                    temp_output_file = self.config.project_root / rel_path
-
-            # Get path information
-            nav_paths = self.path_manager.get_navigation_paths(temp_output_file)
-            section_info = self.path_manager.get_section_info(temp_output_file)
+            route = self.routes.route(source_file)
+            if route is None:
+                raise BuildError(f"{source_file} is not a page source")
 
-            # Handle breadcrumbs - for root index, no breadcrumbs
-            try:
-                breadcrumbs = self.path_manager.get_breadcrumb(temp_output_file)
-            except ValueError:
-                # If breadcrumb calculation fails (e.g., for root paths), use empty list
-                breadcrumbs = []
-
-            canonical_url = self.path_manager.get_canonical_url(temp_output_file)
-
-            # Process content based on file type
-            if source_file.suffix == '.md':
-                content_html = self.process_markdown_file(source_file)
-            elif source_file.suffix == '.yaml':
-                content_html = self.process_yaml_file(source_file)
-            elif source_file.suffix == '.html':
-                # For existing HTML files, we might need to extract content
-                # For now, just read as-is
-                with open(source_file, 'r', encoding='utf-8') as f:
-                    content_html = f.read()
-            else:
-                raise BuildError(f"Unsupported file type: {source_file.suffix}")
+            with self.profiler.step('markdown'):
+                if page.format == 'markdown':
+                    content_html = self.markdown_engine.convert(page.body)
+                else:
+                    content_html = page.body
 
             # Build context
             context = {
-                **page_config,
-                **nav_paths,
-                **section_info,
+                **page.metadata,
+                **self.routes.navigation(route.section, route.depth),
                 'content': content_html,
-                'breadcrumbs': breadcrumbs,
-                'canonical_url': canonical_url,
-                'build_time': datetime.now().isoformat(),
+                'breadcrumbs': route.breadcrumbs,
+                'canonical_url': route.canonical_url,
+                'has_mermaid': page_flags(page).get('mermaid', False),
+                'related_pages': related or [],
+                'prefetch_hints': self.hint_links(route.key, prefetch or []),
+                'build_time': self.build_time.isoformat(),
                 'source_file': str(source_file.relative_to(self.config.source_dir))
             }
 
             # Render template
-            return self.render_template(template, context)
+            with self.profiler.step('render'):
+                return self.render_template(template, context)
 
         except Exception as e:
             raise BuildError(f"Failed to build page {source_file}: {e}")
@@ -264,261 +411,436 @@ class BuildSystem:
     def copy_assets(self):
         """Copy static assets and HTML files to output directory."""
         try:
+            # Content-hashed copies of CSS/JS, written next to the originals
+            hashed_copies = self.fingerprint_assets()
+
             # Copy assets
             if self.config.assets_dir.exists():
                 target_dir = self.config.output_dir / 'assets'
                 # Don't copy if source and target are the same
                 if target_dir != self.config.assets_dir:
-                    if target_dir.exists():
-                        shutil.rmtree(target_dir)
-                    shutil.copytree(self.config.assets_dir, target_dir)
-                    self.logger.info(f"Copied assets to {target_dir}")
+                    synced = self.file_sync.sync_tree(self.config.assets_dir, target_dir)
+                    synced |= self.copy_hashed_assets(hashed_copies, target_dir)
+                    self.file_sync.remove_stale(target_dir, synced, keep=lambda path: is_sibling(path, synced))
+                    self.logger.info(f"Synced assets to {target_dir}")
                 else:
+                    # Only outdated fingerprinted copies are removed from the source tree
+                    current = self.copy_hashed_assets(hashed_copies, target_dir)
+                    self.file_sync.remove_stale(target_dir, current, keep=lambda path: not is_hashed(path.name))
                     self.logger.debug(f"Assets directory is already in target location: {target_dir}")
+            elif self.generated_assets:
+                # No assets directory: output/assets only holds generated files
+                target_dir = self.config.output_dir / 'assets'
+                current = self.copy_hashed_assets(hashed_copies, target_dir)
+                self.file_sync.remove_stale(target_dir, current, keep=lambda path: is_sibling(path, current))
 
-            # Copy HTML files directly
-            for html_file in self.config.source_dir.rglob('*.html'):
-                # Skip files in templates, components, src, and venv directories
-                # Also skip pages/index.html since it's handled by YAML build
-                if not any(part in ['templates', 'components', 'src', 'venv']
-                          for part in html_file.parts) and not (html_file.name == 'index.html' and 'pages' in html_file.parts):
-                    # Calculate relative path and create output path
-                    rel_path = html_file.relative_to(self.config.source_dir)
-
-                    # Special handling for root pages (pages/ directory)
-                    if str(rel_path).startswith('pages/'):
-                        # Remove the pages/ prefix for root output
-                        rel_path = rel_path.relative_to('pages')
-
-                    output_file = self.config.output_dir / rel_path
-
-                    # Create output directory
-                    output_file.parent.mkdir(parents=True, exist_ok=True)
-
-                    # Copy the file
-                    shutil.copy2(html_file, output_file)
-
-                    # Post-process HTML files to update headers/footers for consistency
-                    if output_file != self.config.output_dir / 'index.html':  # Don't modify the template-generated index.html
-                        self.post_process_html_file(output_file)
-
-                    self.logger.debug(f"Copied HTML file: {rel_path}")
+            # Copy HTML files directly, post-processing all but the root index.html
+            # to give them the site's header and footer
+            for route in self.routes.copied_html():
+                if self.copy_source_file(route.source, route.output, route.kind == 'post_process'):
+                    self.logger.debug(f"Copied HTML file: {route.key}")
 
             # Special handling: copy learn_concepts directory as a whole and post-process its HTML files
             learn_concepts_src = self.config.source_dir / 'learn_concepts'
             learn_concepts_dst = self.config.output_dir / 'learn_concepts'
             if learn_concepts_src.exists():
-                # Remove existing directory if it exists
-                if learn_concepts_dst.exists():
-                    shutil.rmtree(learn_concepts_dst)
-                # Copy the entire directory
-                shutil.copytree(learn_concepts_src, learn_concepts_dst)
-                self.logger.info(f"Copied learn_concepts directory to {learn_concepts_dst}")
-
-                # Post-process all HTML files in the copied learn_concepts directory
-                for html_file in learn_concepts_dst.rglob('*.html'):
-                    self.post_process_html_file(html_file)
+                copied = 0
+                expected = set()
+                for src_file in learn_concepts_src.rglob('*'):
+                    if src_file.is_file():
+                        dst_file = learn_concepts_dst / src_file.relative_to(learn_concepts_src)
+                        expected.add(dst_file)
+                        if self.copy_source_file(src_file, dst_file, src_file.suffix == '.html'):
+                            copied += 1
+                expected |= self.copy_hashed_assets(hashed_copies, learn_concepts_dst)
+
+                # Mirror the source tree: drop files whose source is gone
+                # (compressed siblings of surviving files are managed by precompress_outputs)
+                self.file_sync.remove_stale(learn_concepts_dst, expected,
+                                            keep=lambda path: is_sibling(path, expected))
+                self.logger.info(f"Copied {copied} changed files to {learn_concepts_dst}")
+
+            self.post_process_pending()
+            self.logger.debug(
+                "File sync: {copied} copied, {linked} linked, {unchanged} unchanged, "
+                "{removed} removed".format(**self.file_sync.stats)
+            )
 
         except Exception as e:
             raise BuildError(f"Failed to copy assets: {e}")
 
-    def post_process_html_file(self, html_file: Path):
-        """Post-process HTML files to update headers/footers for consistency."""
+    def asset_dirs(self) -> List[Tuple[Path, Path]]:
+        """(source, output) directories whose CSS/JS files are fingerprinted."""
+        dirs = [
+            (self.config.assets_dir, self.config.output_dir / 'assets'),
+            (self.config.source_dir / 'learn_concepts' / 'assets', self.config.output_dir / 'learn_concepts' / 'assets'),
+        ]
+        return [(source_dir, output_dir) for source_dir, output_dir in dirs if source_dir.is_dir()]
+
+    def use_asset_manifest(self, asset_manifest: AssetManifest):
+        """Link pages to the given fingerprinted asset names."""
+        if asset_manifest.assets != self.asset_manifest.assets:
+            # Cached headers and footers link the previous names
+            self.fragments.clear()
+        self.asset_manifest = asset_manifest
+
+    def fingerprint_assets(self) -> Dict[Path, Path]:
+        """Hash every fingerprintable asset and write asset-manifest.json.
+
+        Returns {fingerprinted output file: source file} for the copy step.
+        """
+        asset_manifest = AssetManifest()
+        hashed_copies = {}
+        if self.config.fingerprint_assets:
+            for source_dir, output_dir in self.asset_dirs():
+                for source_file in sorted(source_dir.rglob('*')):
+                    if source_file.suffix not in self.config.fingerprint_extensions or \
+                       is_hashed(source_file.name) or not source_file.is_file():
+                        continue
+                    output_file = output_dir / source_file.relative_to(source_dir)
+                    key = output_file.relative_to(self.config.output_dir).as_posix()
+                    hashed = asset_manifest.add(key, self.manifest.file_hash(source_file))
+                    hashed_copies[self.config.output_dir / hashed] = source_file
+
+        self.fingerprinted_sources = set(hashed_copies.values())
+
+        # Generated assets only exist in the build cache, so they are always copied
+        for key, generated_file in sorted(self.generated_assets.items()):
+            if self.config.fingerprint_assets:
+                key = asset_manifest.add(key, self.manifest.file_hash(generated_file))
+            hashed_copies[self.config.output_dir / key] = generated_file
+
+        if self.config.fingerprint_assets:
+            self.output_writer.write_text(self.config.output_dir / 'asset-manifest.json', asset_manifest.to_json())
+            self.logger.debug(f"Fingerprinted {len(asset_manifest.assets)} assets")
+
+        self.use_asset_manifest(asset_manifest)
+        return hashed_copies
+
+    def utility_css_sources(self) -> List[Path]:
+        """Files whose class names end up in the utility stylesheet."""
+        sources = [path for path in self.config.source_dir.rglob('*')
+                   if path.suffix in UTILITY_SOURCE_SUFFIXES and not is_hashed(path.name)]
+        sources += self.config.templates_dir.rglob('*.html')
+        if self.config.assets_dir.is_dir():
+            sources += [path for path in self.config.assets_dir.rglob('*.js') if not is_hashed(path.name)]
+        sources += [path for path in self.generated_assets.values() if path.suffix == '.js']
+        return sorted(path for path in sources if path.is_file())
+
+    def utility_scan_task(self, source_file: Path) -> Tuple[Optional[str], List[str]]:
+        """Utility classes used in one file, returning an error message instead of raising."""
         try:
-            with open(html_file, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            # Generate new header and footer with context
-            rel_path = html_file.relative_to(self.config.output_dir)
-            path_parts = str(rel_path).split('/')
-
-            # Determine section for branding
-            section = None
-            if len(path_parts) > 0 and path_parts[0] in ['aws', 'gcp', 'azure', 'databricks', 'sql', 'learn_concepts']:
-                section = path_parts[0]
-
-            # Set up context for template rendering
-            depth = len(path_parts) - 1
-            prefix = '../' * depth if depth > 0 else './'
+            text = source_file.read_text(encoding='utf-8', errors='replace')
+            return None, sorted(token for token in extract_candidates(text) if self.utilities.rules(token))
+        except Exception as e:
+            return f"Failed to scan {source_file} for classes: {e}", []
 
-            # Build navigation links - current section links to itself
-            context = {
-                'home_link': prefix,
-                'aws_link': './' if section == 'aws' else prefix + 'aws/',
-                'gcp_link': './' if section == 'gcp' else prefix + 'gcp/',
-                'azure_link': './' if section == 'azure' else prefix + 'azure/',
-                'databricks_link': './' if section == 'databricks' else prefix + 'databricks/',
-                'sql_link': './' if section == 'sql' else prefix + 'sql/',
-                'case_studies_link': prefix + 'case_studies.html',
-                'learn_concepts_link': prefix + 'learn_concepts/',
-                'about_link': prefix + 'aboutme.html',
-                'section': section,  # Add section for conditional sidebar toggle
-            }
+    def generate_utility_css(self) -> bool:
+        """Write the utility stylesheet for every class used in sources, templates and scripts.
 
-            # Set section-specific branding
-            if section == 'aws':
-                context.update({
-                    'brand_text': 'AWS',
-                    'brand_gradient': 'gradient-aws'
-                })
-            elif section == 'gcp':
-                context.update({
-                    'brand_text': 'GCP',
-                    'brand_gradient': 'gradient-gcp'
-                })
-            elif section == 'azure':
-                context.update({
-                    'brand_text': 'Azure',
-                    'brand_gradient': 'gradient-azure'
-                })
-            elif section == 'databricks':
-                context.update({
-                    'brand_text': 'Databricks',
-                    'brand_gradient': 'gradient-databricks'
-                })
-            elif section == 'sql':
-                context.update({
-                    'brand_text': 'SQL',
-                    'brand_gradient': 'gradient-sql'
-                })
-            elif section == 'learn_concepts':
-                context.update({
-                    'brand_text': 'Learn',
-                    'brand_gradient': 'gradient-learn'
-                })
+        Candidates are cached per file by content hash, so only edited files are
+        rescanned. Returns True if the stylesheet changed.
+        """
+        state_file = self.config.cache_dir / 'utility_classes.json'
+        previous = {}
+        if state_file.exists():
+            try:
+                state = json.loads(state_file.read_text(encoding='utf-8'))
+                if state.get('generator') == self.manifest.generator:
+                    previous = state.get('files', {})
+            except (OSError, ValueError):
+                pass
+
+        files = {}
+        tasks = []
+        for source_file in self.utility_css_sources():
+            key = self.manifest.input_key(source_file)
+            digest = self.manifest.file_hash(source_file)
+            entry = previous.get(key)
+            if entry is None or entry[0] != digest:
+                tasks.append((key, source_file, digest))
             else:
-                context.update({
-                    'brand_text': 'Home',
-                    'brand_gradient': 'gradient-text'
-                })
-
-            # Render new header and footer
-            new_header = self.render_template('components/header.html', context)
-            new_footer = self.render_template('components/footer.html', context)
-
+                files[key] = entry
+
+        results = self.map_tasks('utility_scan_task', [source_file for _, source_file, _ in tasks])
+        for (key, _, digest), (error, classes) in zip(tasks, results):
+            if error:
+                # Not cached, so the file is scanned again next build
+                self.logger.warning(error)
+                continue
+            files[key] = [digest, classes]
+        candidates = {name for _, classes in files.values() for name in classes}
+
+        css, used = self.utilities.generate(candidates)
+        stylesheet = self.config.cache_dir / 'utilities.css'
+        changed = self.output_writer.write_text(stylesheet, css)
+        self.output_writer.write_text(state_file, json.dumps({'generator': self.manifest.generator, 'files': files}))
+        self.generated_assets[UTILITY_STYLESHEET] = stylesheet
+        self.logger.info(f"Utility stylesheet: {used} classes, {len(css)} bytes")
+        return changed
+
+    def copy_hashed_assets(self, hashed_copies: Dict[Path, Path], output_dir: Path) -> Set[Path]:
+        """Copy the fingerprinted assets that belong under output_dir. Returns their paths."""
+        copied = set()
+        for hashed_file, source_file in hashed_copies.items():
+            if output_dir in hashed_file.parents:
+                self.copy_source_file(source_file, hashed_file)
+                copied.add(hashed_file)
+        return copied
+
+    def copy_source_file(self, source_file: Path, output_file: Path, post_process: bool = False) -> bool:
+        """Copy a source file into the output tree unless it is up to date.
+
+        Returns True if the output was (re)written.
+        """
+        if not post_process:
+            # Verbatim files are compared directly against the output by the sync engine
+            self.manifest.record(output_file, source_file, {})
+            return self.file_sync.sync_file(source_file, output_file)
+
+        key = self.manifest.output_key(output_file)
+        related, prefetch = self.related_links(key), self.prefetch.get(key, [])
+        inputs = self.manifest.fingerprint(
+            source_file, self.template_paths(FRAGMENT_TEMPLATES), assets=self.asset_manifest.version,
+            related=related, prefetch=prefetch
+        )
+        if self.manifest.is_fresh(output_file, inputs):
+            self.manifest.record(output_file, source_file, inputs, self.manifest.flags(output_file))
+            return False
+        self.explain_rebuild(output_file, inputs, FRAGMENT_TEMPLATES)
+
+        # Post-processing streams the rewritten source straight into the output
+        self.pending_post_process.append((source_file, output_file, related, prefetch))
+        self.manifest.record(output_file, source_file, inputs)
+        return True
+
+    def post_process_task(self, task: Tuple[Path, Path, List[Dict[str, str]], List[Dict[str, str]]]) -> Tuple[
+            Optional[str], Optional[Dict[str, Any]], Dict[str, bool]]:
+        """Post-process one file, returning an error message instead of raising.
+
+        Also returns the file's profiler record (None unless profiling) and its
+        page flags.
+        """
+        source_file, html_file, related, prefetch = task
+        output = html_file.relative_to(self.config.output_dir).as_posix()
+        written_before = self.output_writer.stats['bytes_written']
+        flags = {}
+        with self.profiler.page(output, 'post_process', source_file) as record:
+            try:
+                flags = self.post_process_html_file(html_file, source_file, related, prefetch)
+                error = None
+            except Exception as e:
+                error = str(e)
+        if record is not None:
+            record['bytes_written'] = self.output_writer.stats['bytes_written'] - written_before
+        return error, record, flags
+
+    def post_process_pending(self):
+        """Post-process every HTML file copied since the last call."""
+        tasks, self.pending_post_process = self.pending_post_process, []
+        for (_, html_file, _, _), (error, record, flags) in zip(tasks, self.map_tasks('post_process_task', tasks)):
+            self.profiler.add_page(record)
+            if error:
+                self.logger.warning(error)
+            else:
+                self.manifest.set_flags(html_file, flags)
+                self.logger.debug(f"Post-processed HTML file: {html_file}")
+
+    def get_post_process_rules(self, new_header: str, new_footer: str, page_key: str = '',
+                               related: str = '', prefetch: str = '') -> List[RewriteRule]:
+        """Rewrite rules applied to every copied HTML page, in a single pass."""
+        stylesheet = self.asset_manifest.resolve('/assets/styles.css')
+        # The Mermaid version a page pins is the one its loader fetches
+        mermaid_cdn = ReplaceScriptRule(MERMAID_CDN_PREFIX, '')
+        rules = [
             # Replace old header and footer
-            # Look for header pattern (from <header> to </header>)
-            header_pattern = r'<header[^>]*>.*?</header>'
-            content = re.sub(header_pattern, new_header, content, flags=re.DOTALL | re.IGNORECASE)
-
-            # Look for footer pattern (from <footer> to </footer>)
-            footer_pattern = r'<footer[^>]*>.*?</footer>'
-            content = re.sub(footer_pattern, new_footer, content, flags=re.DOTALL | re.IGNORECASE)
-
-            # Add or update CSS link to point to root assets
-            if '/assets/styles.css' not in content:
-                # Add CSS link after the last link/preconnect in head
-                css_link = '<link rel="stylesheet" href="/assets/styles.css">'
-                # Insert after the last link tag in head
-                head_end_pattern = r'(\s*)(</head>)'
-                content = re.sub(head_end_pattern, f'\\1    {css_link}\\1\\2', content, count=1)
-
+            ReplaceElementRule('header', new_header),
+            ReplaceElementRule('footer', new_footer),
+            # Add CSS link to point to root assets
+            AppendToHeadRule(f'<link rel="stylesheet" href="{stylesheet}">',
+                             unless_present='/assets/styles.css'),
             # Remove inline <style> tags to prevent conflicts with new CSS
-            style_pattern = r'<style[^>]*>.*?</style>'
-            content = re.sub(style_pattern, '', content, flags=re.DOTALL | re.IGNORECASE)
-
-            # Update body class for sticky footer (add flexbox classes if not present)
-            body_pattern = r'<body([^>]*)class="([^"]*)"([^>]*)>'
-            def update_body_class(match):
-                attrs_before = match.group(1)
-                classes = match.group(2)
-                attrs_after = match.group(3)
-                # Add flexbox classes if not already present
-                if 'min-h-screen' not in classes:
-                    classes += ' min-h-screen'
-                if 'flex' not in classes:
-                    classes += ' flex'
-                if 'flex-col' not in classes:
-                    classes += ' flex-col'
-                return f'<body{attrs_before}class="{classes}"{attrs_after}>'
-            content = re.sub(body_pattern, update_body_class, content)
-
-            # Update main class for sticky footer (add flex-1 if not present)
-            main_pattern = r'<main([^>]*)class="([^"]*)"([^>]*)>'
-            def update_main_class(match):
-                attrs_before = match.group(1)
-                classes = match.group(2)
-                attrs_after = match.group(3)
-                # Add flex-1 if not already present
-                if 'flex-1' not in classes and 'flex-grow' not in classes:
-                    classes += ' flex-1'
-                return f'<main{attrs_before}class="{classes}"{attrs_after}>'
-            content = re.sub(main_pattern, update_main_class, content)
-
-            # Write back the updated content
-            with open(html_file, 'w', encoding='utf-8') as f:
-                f.write(content)
-
-            self.logger.debug(f"Post-processed HTML file: {html_file}")
+            DropElementRule('style'),
+            # Sticky footer: flexbox classes on body, flex-1 on main
+            AddClassRule('body', ['min-h-screen', 'flex', 'flex-col']),
+            AddClassRule('main', ['flex-1'], unless_any=['flex-grow']),
+            # Pages load Mermaid through the on-demand loader, and only if they have diagrams
+            mermaid_cdn,
+            DropInlineScriptRule(MERMAID_INIT_PATTERN),
+            AppendToBodyIfClassRule('mermaid', lambda: self.mermaid_loader_tag(mermaid_cdn.replaced)),
+            # Point stylesheets and scripts at their fingerprinted names
+            RewriteUrlRule({'link': 'href', 'script': 'src'},
+                           partial(self.asset_manifest.resolve, page_key=page_key)),
+        ]
+        if self.config.utility_css:
+            # Link the prebuilt stylesheet instead of compiling classes in the browser
+            utilities = self.asset_manifest.resolve('/' + UTILITY_STYLESHEET)
+            rules.insert(-1, ReplaceScriptRule(self.config.tailwind_cdn_url,
+                                               f'<link rel="stylesheet" href="{utilities}">'))
+        if related:
+            # The related pages list closes the page's main content
+            rules.append(InsertBeforeEndTagRule('main', related))
+        if prefetch:
+            rules.append(AppendToHeadRule(prefetch))
+        if self.config.service_worker:
+            rules.append(InsertBeforeEndTagRule('body', SERVICE_WORKER_TAG))
+        return rules
+
+    def mermaid_loader_tag(self, mermaid_src: Optional[str] = None) -> str:
+        """The on-demand loader, fetching the page's own Mermaid build if it had one, else mermaid_url."""
+        loader = self.asset_manifest.resolve('/' + MERMAID_SCRIPT)
+        src = html.escape(html.unescape(mermaid_src)) if mermaid_src else self.config.mermaid_url
+        return f'<script src="{loader}" data-mermaid-src="{src}" defer></script>'
+
+    def post_process_html_file(self, html_file: Path, source_file: Optional[Path] = None,
+                               related: Optional[List[Dict[str, str]]] = None,
+                               prefetch: Optional[List[Dict[str, str]]] = None) -> Dict[str, bool]:
+        """Post-process HTML files to update headers/footers for consistency.
+
+        The page is read from source_file (or html_file itself) and streamed
+        into html_file with all rewrite rules applied in one pass, with its
+        related pages added at the end of <main> and its prefetch hints at the
+        end of <head>. Returns the page's flags (see page_flags).
+        """
+        try:
+            rel_path = html_file.relative_to(self.config.output_dir)
+            section, depth = self.routes.placement(rel_path.as_posix())
+
+            # Header and footer only vary by section and depth, so reuse rendered fragments
+            def context_factory():
+                return self.routes.navigation(section, depth)
+            with self.profiler.step('fragments'):
+                new_header = self.fragments.get('components/header.html', section, depth, context_factory)
+                new_footer = self.fragments.get('components/footer.html', section, depth, context_factory)
+                related_html = self.render_template('components/related.html', {'related_pages': related}) \
+                    if related else ''
+
+            with self.profiler.step('rewrite'):
+                hints = ''.join(f'<link rel="{hint["rel"]}" href="{html.escape(hint["href"])}">'
+                                for hint in self.hint_links(rel_path.as_posix(), prefetch or []))
+                rules = self.get_post_process_rules(new_header, new_footer, rel_path.as_posix(),
+                                                    related_html.strip(), hints)
+                rewriter = HtmlRewriter(rules)
+                rewriter.rewrite_file(source_file or html_file, html_file, self.output_writer)
+            mermaid = next(rule for rule in rules if isinstance(rule, AppendToBodyIfClassRule))
+            return {'mermaid': True} if mermaid.found else {}
 
         except Exception as e:
-            self.logger.warning(f"Failed to post-process {html_file}: {e}")
-
-    def find_source_files(self) -> List[Path]:
-        """Find all source files to build."""
-        source_files = []
-
-        # Find Markdown and YAML files (HTML files will be copied directly)
-        for file_path in self.config.source_dir.rglob('*.md'):
-            if not any(part in ['templates', 'components', 'src', 'venv', 'learn_concepts']
-                      for part in file_path.parts):
-                source_files.append(file_path)
+            raise BuildError(f"Failed to post-process {html_file}: {e}")
+
+    def entry_flags(self, page: Page) -> Dict[str, Any]:
+        """Manifest flags of a rendered page: its page_flags, and the key of its
+        cached Markdown fragment so prune_markdown_cache keeps it."""
+        flags: Dict[str, Any] = dict(page_flags(page))
+        if page.format == 'markdown':
+            flags['fragment'] = self.markdown_engine.fragment_key(page.body)
+        return flags
+
+    def render_page_task(self, task: Tuple[Path, Path, Page, List[Dict[str, str]], List[Dict[str, str]]]) -> Tuple[
+            Optional[str], Optional[Dict[str, Any]]]:
+        """Build one page and write it out, returning an error message instead of raising.
+
+        Also returns the page's profiler record (None unless profiling).
+        """
+        source_file, output_file, page, related, prefetch = task
+        output = output_file.relative_to(self.config.output_dir).as_posix()
+        written_before = self.output_writer.stats['bytes_written']
+        with self.profiler.page(output, 'page', source_file) as record:
+            try:
+                # Build page
+                html_content = self.build_page(source_file, page=page, related=related, prefetch=prefetch)
 
-        for file_path in self.config.source_dir.rglob('*.yaml'):
-            # Skip files in templates, components, src, venv, and learn_concepts directories
-            if not any(part in ['templates', 'components', 'src', 'venv', 'learn_concepts']
-                      for part in file_path.parts):
-                source_files.append(file_path)
+                # Write output (creates the directory; skipped if nothing changed)
+                with self.profiler.step('write'):
+                    self.output_writer.write_text(output_file, html_content)
+                error = None
+            except Exception as e:
+                error = str(e)
+        if record is not None:
+            record['bytes_written'] = self.output_writer.stats['bytes_written'] - written_before
+        return error, record
+
+    def map_tasks(self, method_name: str, items: List[Any]) -> List[Any]:
+        """Run a task method over items, across the worker pool when --jobs > 1."""
+        if self.config.jobs <= 1 or len(items) < 2:
+            method = getattr(self, method_name)
+            return [method(item) for item in items]
+
+        if self.executor is not None and self.executor_assets != self.asset_manifest.assets:
+            # Workers link pages to the asset names they were started with
+            self.shutdown_workers()
+        if self.executor is None:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor_assets = self.asset_manifest.assets
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.config.jobs,
+                initializer=_init_worker,
+                initargs=(self.config, self.asset_manifest.assets)
+            )
+        chunksize = max(1, len(items) // (self.config.jobs * 4))
+        return list(self.executor.map(partial(_run_in_worker, method_name), items, chunksize=chunksize))
 
-        return source_files
+    def shutdown_workers(self):
+        """Stop the worker pool, if one was started."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
 
-    def build_all_pages(self):
-        """Build all pages."""
-        source_files = self.find_source_files()
-        self.logger.info(f"Found {len(source_files)} source files to build")
+    def build_all_pages(self, routes: Optional[List[Route]] = None):
+        """Build all pages, or just the given ones."""
+        if routes is None:
+            routes = self.routes.pages()
+        self.logger.info(f"Found {len(routes)} source files to build")
 
         built_pages = []
         errors = []
+        skipped = 0
+        tasks = []
+        config_times = {}
 
-        for source_file in source_files:
+        for route in routes:
+            source_file, output_file = route.source, route.output
             try:
-                self.logger.debug(f"Building {source_file}")
-
-                # Determine output path
-                rel_path = source_file.relative_to(self.config.source_dir)
-
-                # Special handling for root index files
-                if source_file.name in ['index.md', 'index.yaml'] and 'pages' in source_file.parts:
-                    # Root index files should output to root index.html
-                    output_file = self.config.output_dir / 'index.html'
-                elif source_file.suffix == '.md':
-                    # Convert .md to .html
-                    output_file = self.config.output_dir / rel_path.with_suffix('.html')
-                elif source_file.suffix == '.yaml':
-                    # Convert .yaml to .html
-                    output_file = self.config.output_dir / rel_path.with_suffix('.html')
-                else:
-                    output_file = self.config.output_dir / rel_path
-
-                # Create output directory
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-
-                # Build page
-                html_content = self.build_page(source_file)
-
-                # Write output
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
+                # Skip pages whose source, templates and config are unchanged
+                started = time.perf_counter()
+                page = self.load_page(source_file)
+                config_times[source_file] = time.perf_counter() - started
+                related, prefetch = self.related_links(route.key), self.prefetch.get(route.key, [])
+                inputs = self.manifest.fingerprint(
+                    source_file, self.template_paths(PAGE_TEMPLATES), page.metadata,
+                    assets=self.asset_manifest.version, related=related, prefetch=prefetch
+                )
+                if self.manifest.is_fresh(output_file, inputs):
+                    self.manifest.record(output_file, source_file, inputs, self.manifest.flags(output_file))
+                    built_pages.append(output_file)
+                    skipped += 1
+                    self.logger.debug(f"Up to date: {output_file}")
+                    continue
 
-                built_pages.append(output_file)
-                self.logger.debug(f"Built {output_file}")
+                self.logger.debug(f"Building {source_file}")
+                self.explain_rebuild(output_file, inputs, PAGE_TEMPLATES)
+                # Workers get the parsed page, so the source is not read again
+                tasks.append(((source_file, output_file, page, related, prefetch), inputs))
 
             except Exception as e:
                 error_msg = f"Failed to build {source_file}: {e}"
                 self.logger.error(error_msg)
                 errors.append(error_msg)
 
-        self.logger.info(f"Successfully built {len(built_pages)} pages")
+        results = self.map_tasks('render_page_task', [task for task, _ in tasks])
+        for ((source_file, output_file, page, _, _), inputs), (error, record) in zip(tasks, results):
+            self.profiler.add_page(record, {'config_load': config_times[source_file]})
+            if error:
+                error_msg = f"Failed to build {source_file}: {error}"
+                self.logger.error(error_msg)
+                errors.append(error_msg)
+                continue
+
+            self.manifest.record(output_file, source_file, inputs, self.entry_flags(page))
+            built_pages.append(output_file)
+            self.logger.debug(f"Built {output_file}")
+
+        self.logger.info(f"Successfully built {len(built_pages)} pages ({skipped} up to date)")
         if errors:
             self.logger.error(f"Encountered {len(errors)} errors during build")
             for error in errors:
@@ -526,40 +848,84 @@ class BuildSystem:
 
         return built_pages, errors
 
-    def generate_sitemap(self, built_pages: List[Path]):
-        """Generate sitemap.xml."""
+    def sitemap_pages(self, keys: Optional[List[str]] = None) -> List[Tuple[str, str]]:
+        """(output key, lastmod) of every HTML page, sorted by key.
+
+        lastmod only moves when a page's source or page config changes: the
+        content hash each date was taken for is kept in the build cache, and a
+        new or changed page is dated by the last commit of its source and page
+        config, so a fresh checkout gets the same dates. Files with uncommitted
+        changes, and every file outside a git tree, are dated by their mtime.
+        Template and asset changes don't count, they change every page at
+        once. With keys, only those outputs are looked at and the rest come
+        from the cache.
+        """
+        state_path = self.config.cache_dir / 'sitemap.json'
+        previous = {}
         try:
-            base_url = config.site_url
-
-            sitemap_entries = []
-            for page in built_pages:
-                rel_path = page.relative_to(self.config.output_dir)
-                url_path = str(rel_path).replace('index.html', '').replace('.html', '/')
-                if url_path.endswith('/'):
-                    url_path = url_path[:-1] if url_path != '/' else url_path
-
-                # Ensure proper URL construction with leading slash
-                if not url_path.startswith('/'):
-                    url_path = f"/{url_path}"
-                full_url = f"{base_url.rstrip('/')}{url_path}"
-
-                sitemap_entries.append({
-                    'url': full_url,
-                    'lastmod': datetime.now().strftime('%Y-%m-%d'),
-                    'changefreq': 'weekly',
-                    'priority': '0.8' if url_path == '/' else '0.6'
-                })
-
-            # Render sitemap template
-            context = {'entries': sitemap_entries}
-            sitemap_content = self.render_template('sitemap.xml', context)
-
-            # Write sitemap
-            sitemap_path = self.config.output_dir / 'sitemap.xml'
-            with open(sitemap_path, 'w', encoding='utf-8') as f:
-                f.write(sitemap_content)
-
-            self.logger.info(f"Generated sitemap at {sitemap_path}")
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == SITEMAP_STATE_VERSION:
+                previous = state.get('pages', {})
+        except (OSError, ValueError):
+            pass
+
+        if keys is None or not previous:
+            history = {}
+            keys = [key for key, _ in self.html_outputs()]
+        else:
+            history = dict(previous)
+            keys = [key for key in keys if key.endswith('.html')]
+
+        undated: Dict[str, Tuple[str, List[Path]]] = {}
+        for key in keys:
+            entry = self.manifest.entries.get(key)
+            if entry is None or not (self.config.output_dir / key).is_file():
+                history.pop(key, None)
+                continue
+            digest = hash_data({name: entry['inputs'].get(name) for name in ['source', 'config']})
+            known = previous.get(key)
+            if known and known[0] == digest:
+                history[key] = [digest, known[1]]
+            else:
+                source_file = self.config.project_root / entry['source']
+                undated[key] = (digest, [path for path in [source_file, self.routes.sidecar(source_file)] if path])
+
+        committed = git_dates(self.config.project_root, {path for _, paths in undated.values() for path in paths})
+        for key, (digest, paths) in undated.items():
+            dates = []
+            for path in paths:
+                if path in committed:
+                    dates.append(committed[path])
+                    continue
+                try:
+                    modified = datetime.fromtimestamp(path.stat().st_mtime)
+                except OSError:
+                    modified = self.build_time
+                dates.append(modified.strftime('%Y-%m-%d'))
+            history[key] = [digest, max(dates)]
+
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': SITEMAP_STATE_VERSION, 'pages': history}, separators=(',', ':'), sort_keys=True))
+        return sorted((key, value[1]) for key, value in history.items())
+
+    def generate_sitemap(self, keys: Optional[List[str]] = None):
+        """Generate sitemap.xml for every HTML page of the site, streamed to disk.
+
+        With keys (output keys of a partial build), only those entries are updated.
+        """
+        try:
+            pages = self.sitemap_pages(keys)
+            files, written = self.sitemap_writer.write(pages)
+            for stale in self.sitemap_writer.stale_children(files):
+                stale.unlink()
+                self.precompressor.remove_siblings(stale)
+                self.logger.debug(f"Removed stale sitemap: {stale}")
+
+            self.logger.info(
+                f"Generated sitemap at {files[0]}: {len(pages)} pages in {len(files)} files ({written} written)"
+            )
 
         except Exception as e:
             self.logger.error(f"Failed to generate sitemap: {e}")
@@ -569,12 +935,601 @@ class BuildSystem:
         try:
             robots_content = self.render_template('robots.txt', {})
             robots_path = self.config.output_dir / 'robots.txt'
-            with open(robots_path, 'w', encoding='utf-8') as f:
-                f.write(robots_content)
+            self.output_writer.write_text(robots_path, robots_content)
             self.logger.info(f"Generated robots.txt at {robots_path}")
         except Exception as e:
             self.logger.error(f"Failed to generate robots.txt: {e}")
 
+    def precache_outputs(self) -> List[str]:
+        """Output keys the service worker caches: pages, copied files and the assets they link."""
+        keys = set(self.manifest.entries)
+        assets_dir = self.config.output_dir / 'assets'
+        if assets_dir.exists():
+            keys.update(self.manifest.output_key(path) for path in assets_dir.rglob('*') if path.is_file())
+        # Pages link the fingerprinted copies, not the originals
+        keys -= set(self.asset_manifest.assets)
+        return sorted(key for key in keys if Path(key).suffix in self.config.precache_extensions
+                      and (self.config.output_dir / key).is_file())
+
+    def generate_service_worker(self):
+        """Write precache-manifest.json and the service worker stamped with its version.
+
+        Only outputs written since the last build are hashed again, and both
+        files are write-if-changed, so a build that changes nothing leaves the
+        installed service workers alone.
+        """
+        manifest, hashed = self.precache.build(self.precache_outputs())
+        output_dir = self.config.output_dir
+        self.output_writer.write_text(output_dir / PRECACHE_MANIFEST,
+                                      json.dumps(manifest, separators=(',', ':'), sort_keys=True))
+        worker = (Path(__file__).parent / 'sw.js').read_text(encoding='utf-8')
+        self.output_writer.write_text(output_dir / SERVICE_WORKER, worker.replace('__PRECACHE_VERSION__',
+                                                                                   manifest['version']))
+        entries = len(manifest['core']) + sum(len(group) for group in manifest['groups'].values())
+        self.logger.info(f"Service worker: {entries} files precached, {len(manifest['core'])} in the core shell "
+                         f"and {len(manifest['groups'])} sections cached on first visit ({hashed} hashed)")
+
+    def source_stamp(self, source_file: Path) -> List[int]:
+        """Size and mtime of a page source and of the YAML config next to it."""
+        stamp = []
+        for path in [source_file, self.routes.sidecar(source_file)]:
+            if path is not None:
+                stat = path.stat()
+                stamp += [stat.st_size, stat.st_mtime_ns]
+        return stamp
+
+    def related_extract_task(self, task: Tuple[Path, Optional[str]]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Extract one page source for the related pages, returning an error message instead of raising.
+
+        Rendered pages come with their title and body already, copied pages are read here.
+        """
+        source_file, markup = task
+        try:
+            if markup is None:
+                markup = source_file.read_text(encoding='utf-8', errors='replace')
+            return None, extract_document(markup)
+        except Exception as e:
+            return f"Failed to read {source_file} for related pages: {e}", None
+
+    def build_related_pages(self):
+        """Find the related pages of every page, before any page is built.
+
+        Sources are only read again when their size or mtime changed, and the
+        lists are recomputed only around pages whose terms changed.
+        """
+        self.related, self.related_titles = {}, {}
+        if not self.config.related_pages:
+            return
+
+        previous = self.read_related_state()
+        cached = previous['documents'] if previous else {}
+
+        documents = {}
+        tasks = []
+        for route in sorted(self.routes.routes.values(), key=lambda route: route.key if route else ''):
+            # Section index pages list everything, they aren't related to anything in particular
+            if route is None or route.kind == 'copy' or route.key.rsplit('/', 1)[-1] == 'index.html':
+                continue
+            stamp = self.source_stamp(route.source)
+            entry = cached.get(route.key)
+            if entry and entry[0] == stamp:
+                documents[route.key] = entry
+                continue
+            markup = None
+            if route.kind == 'page':
+                page = self.load_page(route.source)
+                title = html.escape(str(page.metadata.get('title', '')))
+                markup = f'<title>{title}</title><main>{page.body}</main>'
+            tasks.append((route, stamp, markup))
+
+        results = self.map_tasks('related_extract_task', [(route.source, markup) for route, _, markup in tasks])
+        for (route, stamp, _), (error, document) in zip(tasks, results):
+            if error:
+                self.logger.warning(error)
+            elif document is not None:
+                documents[route.key] = [stamp, document['title'], stored_terms(document['terms'])]
+
+        changed = {key for key, entry in documents.items() if key not in cached or cached[key][2] != entry[2]}
+        related, recomputed, drift = self.related_engine.update(
+            {key: entry[2] for key, entry in documents.items()}, changed, previous
+        )
+
+        state = {
+            'version': RELATED_STATE_VERSION, 'settings': self.related_engine.settings,
+            'generator': self.manifest.generator, 'documents': documents,
+            'related': related, 'drift': drift
+        }
+        state_path = self.config.cache_dir / 'related.json'
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(state, separators=(',', ':'), sort_keys=True))
+
+        self.use_related_state(state)
+        backend = self.related_engine.backend
+        self.logger.info(f"Related pages: {len(documents)} pages ({len(tasks)} read), "
+                         f"{recomputed} lists recomputed with the {SCORER_NAMES[backend]}")
+        if backend == 'python' and recomputed > PYTHON_SCORER_PAGES:
+            self.logger.warning("Related pages: NumPy/SciPy are not installed, so the pure-Python scorer was used; "
+                                "install them (requirements.txt) to score large sites in seconds")
+
+    def read_related_state(self) -> Optional[Dict[str, Any]]:
+        """Related pages of the previous build, if they were computed the same way."""
+        try:
+            with open(self.config.cache_dir / 'related.json', 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('version') == RELATED_STATE_VERSION and state.get('settings') == self.related_engine.settings \
+                and state.get('generator') == self.manifest.generator:
+            return state
+        return None
+
+    def use_related_state(self, state: Optional[Dict[str, Any]]):
+        """Link pages to the related pages in state (none without one)."""
+        state = state or {'documents': {}, 'related': {}}
+        self.related = {key: [other for other, _ in scores] for key, scores in state['related'].items()}
+        self.related_titles = {key: entry[1] or key for key, entry in state['documents'].items()}
+
+    def related_links(self, key: str) -> List[Dict[str, str]]:
+        """Related pages of an output, linked relative to its directory."""
+        prefix = '../' * key.count('/')
+        return [{'title': self.related_titles[other], 'url': prefix + other} for other in self.related.get(key, [])]
+
+    def html_outputs(self) -> List[Tuple[str, Path]]:
+        """(manifest key, path) of every HTML page this build wrote or kept."""
+        outputs = []
+        for key in sorted(self.manifest.entries):
+            output_file = self.config.output_dir / key
+            if output_file.suffix == '.html' and output_file.is_file():
+                outputs.append((key, output_file))
+        return outputs
+
+    def prefetch_extract_task(self, task: Tuple[Route, str, str, str]) -> Tuple[
+            Optional[str], Optional[Dict[str, Any]]]:
+        """Extract the links of one page as it will be built, returning an error message instead of raising.
+
+        Rendered pages are their body between the header and footer fragments,
+        with the related pages closing <main>; post-processed pages get the
+        same fragments and list in place of their own; copied pages are read
+        as they are.
+        """
+        route, header, footer, related = task
+        try:
+            if route.kind == 'page':
+                page = self.load_page(route.source)
+                body = self.markdown_engine.convert(page.body) if page.format == 'markdown' else page.body
+                markup = f'{header}<main>{body}{related}</main>{footer}'
+            else:
+                markup = route.source.read_text(encoding='utf-8', errors='replace')
+                if route.kind == 'post_process':
+                    rules = [ReplaceElementRule('header', header), ReplaceElementRule('footer', footer)]
+                    if related:
+                        rules.append(InsertBeforeEndTagRule('main', related))
+                    markup = ''.join(HtmlRewriter(rules).rewrite(io.StringIO(markup)))
+            return None, extract_page(markup)
+        except Exception as e:
+            return f"Failed to read links of {route.source}: {e}", None
+
+    def build_prefetch_hints(self):
+        """Pick the prefetch hints of every page from the site's link graph, before any page is built.
+
+        The graph comes from the sources as they will be built, so every page
+        is rendered once, with its final hints. A page is extracted again only
+        when its source, header and footer templates or related pages changed.
+        """
+        if not self.config.prefetch_pages:
+            self.prefetch = {}
+            return
+        previous = self.read_prefetch_state()
+        cached = previous['pages'] if previous and previous.get('generator') == self.manifest.generator else {}
+
+        templates = self.template_paths(FRAGMENT_TEMPLATES)
+        templates_version = hash_data({name: self.manifest.file_hash(path) for name, path in sorted(templates.items())})
+        pages = {}
+        tasks = []
+        for route in sorted(self.routes.by_output.values(), key=lambda route: route.key):
+            stamp = self.source_stamp(route.source)
+            related, version = [], ''
+            if route.kind != 'copy':
+                # Copied pages are served as they are, the others get the site's header, footer and related pages
+                related = self.related_links(route.key)
+                version = hash_data([templates_version, route.section, route.depth, related])
+            entry = cached.get(route.key)
+            if entry and entry[:2] == [stamp, version]:
+                pages[route.key] = entry
+                continue
+            header = footer = related_html = ''
+            if route.kind != 'copy':
+                def context_factory(route=route):
+                    return self.routes.navigation(route.section, route.depth)
+                header = self.fragments.get('components/header.html', route.section, route.depth, context_factory)
+                footer = self.fragments.get('components/footer.html', route.section, route.depth, context_factory)
+                if related:
+                    related_html = self.render_template('components/related.html', {'related_pages': related}).strip()
+            tasks.append((route.key, stamp, version, (route, header, footer, related_html)))
+        results = self.map_tasks('prefetch_extract_task', [task for _, _, _, task in tasks])
+        for (key, stamp, version, _), (error, extracted) in zip(tasks, results):
+            if error:
+                self.logger.warning(error)
+            else:
+                pages[key] = [stamp, version, extracted]
+
+        asset_sizes = {}
+
+        def asset_size(key: str) -> Optional[int]:
+            # Pages aren't built yet, so module scripts are read from their sources
+            if key not in asset_sizes:
+                head, _, rest = key.partition('/')
+                path = self.config.assets_dir / rest if head == 'assets' else self.config.source_dir / key
+                asset_sizes[key] = compressed_size(path.read_bytes()) if path.is_file() else None
+            return asset_sizes[key]
+
+        # Every page is part of the graph, but only rendered and post-processed pages get hints
+        targets = {key for key in pages if self.routes.by_output[key].kind != 'copy'}
+        hints = self.prefetch_planner.plan({key: entry[2] for key, entry in pages.items()}, targets, asset_size)
+        self.prefetch = {key: page_hints for key, page_hints in hints.items() if page_hints}
+
+        state = {
+            'version': PREFETCH_STATE_VERSION, 'settings': self.prefetch_planner.settings,
+            'generator': self.manifest.generator, 'pages': pages, 'hints': self.prefetch
+        }
+        state_path = self.config.cache_dir / 'prefetch.json'
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(state, separators=(',', ':'), sort_keys=True))
+
+        hinted = sum(1 for page_hints in self.prefetch.values() for hint in page_hints if hint['rel'] == 'prefetch')
+        self.logger.info(f"Prefetch hints: {hinted} hints on {len(self.prefetch)} pages ({len(tasks)} pages read)")
+
+    def hint_links(self, key: str, hints: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """Prefetch hints of an output as linked from it: module scripts under
+        their fingerprinted names, like the page's own script tags."""
+        return [{**hint, 'href': self.asset_manifest.resolve(hint['href'], page_key=key)}
+                if hint['rel'] == 'modulepreload' else hint for hint in hints]
+
+    def read_prefetch_state(self) -> Optional[Dict[str, Any]]:
+        """Prefetch hints of the previous build, if they were picked the same way."""
+        try:
+            with open(self.config.cache_dir / 'prefetch.json', 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('version') == PREFETCH_STATE_VERSION and state.get('settings') == self.prefetch_planner.settings:
+            return state
+        return None
+
+    def search_extract_task(self, output_file: Path) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Extract one page for the search index, returning an error message instead of raising."""
+        try:
+            return None, extract_document(output_file.read_text(encoding='utf-8', errors='replace'))
+        except Exception as e:
+            return f"Failed to index {output_file}: {e}", None
+
+    def build_search_index(self):
+        """Write the sharded search index for every HTML output of this build.
+
+        Extracted pages are cached by output size and mtime, so only pages whose
+        bytes changed are read again.
+        """
+        state_path = self.config.cache_dir / 'search.json'
+        previous, previous_ids = {}, {}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('settings') == self.search_indexer.settings and state.get('generator') == self.manifest.generator:
+                previous = state.get('outputs', {})
+                previous_ids = state.get('ids', {})
+        except (OSError, ValueError):
+            pass
+
+        current = {}
+        tasks = []
+        for key, output_file in self.html_outputs():
+            stat = output_file.stat()
+            entry = previous.get(key)
+            if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+                current[key] = entry
+            else:
+                tasks.append((key, output_file, [stat.st_size, stat.st_mtime_ns]))
+        up_to_date = len(current)
+        index_file = self.config.output_dir / SEARCH_DIR / 'index.json'
+        if not tasks and current.keys() == previous.keys() and index_file.exists():
+            # No page changed, appeared or disappeared: the shards are current
+            self.logger.info(f"Search index: {up_to_date} pages unchanged")
+            return
+
+        results = self.map_tasks('search_extract_task', [output_file for _, output_file, _ in tasks])
+        for (key, _, stamp), (error, document) in zip(tasks, results):
+            if error:
+                self.logger.warning(error)
+                continue
+            current[key] = stamp + [document]
+
+        documents = {key: entry[2] for key, entry in current.items() if entry[2] is not None}
+        ids = assign_ids(list(documents), previous_ids)
+        files = self.search_indexer.build(documents, ids)
+
+        search_dir = self.config.output_dir / SEARCH_DIR
+        expected = set()
+        written = 0
+        for name, text in files.items():
+            output_file = search_dir / name
+            written += self.output_writer.write_text(output_file, text)
+            expected.add(output_file)
+        # Shard names carry a content hash, so replaced shards are removed
+        self.file_sync.remove_stale(search_dir, expected, keep=lambda path: is_sibling(path, expected))
+
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'settings': self.search_indexer.settings, 'generator': self.manifest.generator,
+                                'outputs': current, 'ids': ids}, separators=(',', ':'), sort_keys=True))
+        self.logger.info(
+            f"Search index: {len(documents)} pages ({up_to_date} unchanged), "
+            f"{len(files)} files, {written} written"
+        )
+
+    def link_extract_task(self, output_file: Path) -> Tuple[Optional[str], Optional[Tuple[List[str], List[str]]]]:
+        """Links and anchors of one page, returning an error message instead of raising."""
+        try:
+            return None, extract_links(output_file.read_text(encoding='utf-8', errors='replace'))
+        except Exception as e:
+            return f"Failed to read links of {output_file}: {e}", None
+
+    def check_links(self) -> bool:
+        """Check every internal link of the built pages and write the broken-link report.
+
+        Pages are parsed again only when their bytes changed; a page is checked
+        again when it changed or something it links to appeared, disappeared or
+        lost anchors. Returns True if no link is broken.
+        """
+        state_path = self.config.cache_dir / 'links.json'
+        previous, previous_exists = {}, {}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('generator') == self.manifest.generator:
+                previous = state.get('pages', {})
+                previous_exists = state.get('exists', {})
+        except (OSError, ValueError):
+            pass
+
+        outputs = self.html_outputs()
+        pages = {}
+        tasks = []
+        for key, output_file in outputs:
+            stat = output_file.stat()
+            entry = previous.get(key)
+            if entry and entry['stamp'] == [stat.st_size, stat.st_mtime_ns]:
+                pages[key] = entry
+            else:
+                tasks.append((key, output_file, [stat.st_size, stat.st_mtime_ns]))
+
+        # Targets whose anchors or existence changed since the last check,
+        # starting with pages that are gone
+        changed = set(previous) - {key for key, _ in outputs}
+        dirty = set()
+        results = self.map_tasks('link_extract_task', [output_file for _, output_file, _ in tasks])
+        for (key, _, stamp), (error, extracted) in zip(tasks, results):
+            if error:
+                self.logger.warning(error)
+                continue
+            links, anchors = extracted
+            if key not in previous or previous[key]['anchors'] != anchors:
+                changed.add(key)
+            pages[key] = {'stamp': stamp, 'links': links, 'anchors': anchors, 'depends': [], 'broken': []}
+            dirty.add(key)
+
+        other_anchors = {}
+
+        def anchors_of(key: str) -> Optional[List[str]]:
+            if key in pages:
+                return pages[key]['anchors']
+            if key not in other_anchors:
+                try:
+                    other_anchors[key] = extract_links((self.config.output_dir / key).read_text(encoding='utf-8'))[1]
+                except (OSError, ValueError):
+                    other_anchors[key] = None
+            return other_anchors[key]
+
+        checker = LinkChecker(self.config.output_dir, anchors_of)
+        changed.update(key for key, existed in previous_exists.items() if checker.is_file(key) != existed)
+        for key, entry in pages.items():
+            if key in dirty or not changed.isdisjoint(entry['depends']):
+                entry['broken'], entry['depends'] = checker.check_page(key, entry['links'])
+                dirty.add(key)
+
+        broken = sorted((link for entry in pages.values() for link in entry['broken']),
+                        key=lambda link: (link['page'], link['url']))
+        report = {
+            'pages': len(pages),
+            'checked': len(dirty),
+            'links': sum(len(entry['links']) for entry in pages.values()),
+            'broken': broken,
+        }
+        self.config.link_report.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.config.link_report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=1)
+
+        exists = {key: checker.is_file(key) for entry in pages.values() for key in entry['depends']}
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'generator': self.manifest.generator, 'pages': pages, 'exists': exists},
+                               separators=(',', ':'), sort_keys=True))
+
+        if not broken:
+            self.logger.info(f"Link check: {report['links']} links in {len(pages)} pages "
+                             f"({len(dirty)} checked), none broken")
+            return True
+        for link in broken[:20]:
+            self.logger.error(f"Broken link in {link['page']}: {link['url']} ({link['reason']})")
+        if len(broken) > 20:
+            self.logger.error(f"... and {len(broken) - 20} more")
+        self.logger.error(f"Link check: {len(broken)} broken links in "
+                          f"{len({link['page'] for link in broken})} pages, see {self.config.link_report}")
+        return False
+
+    def weight_measure_task(self, output_file: Path) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Measure one page, returning an error message instead of raising."""
+        try:
+            return None, measure_page(output_file.read_bytes())
+        except Exception as e:
+            return f"Failed to measure {output_file}: {e}", None
+
+    def check_page_weights(self) -> bool:
+        """Measure every built page, check it against its budget and write the weight report.
+
+        Pages are measured again only when their bytes changed. The report is
+        JSON, or a text table when its path ends in .txt. Returns True if no
+        page is over budget.
+        """
+        budgets = PageBudgets(self.config.page_budgets)
+        state_path = self.config.cache_dir / 'weights.json'
+        previous = {}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('version') == WEIGHT_STATE_VERSION:
+                previous = state.get('pages', {})
+        except (OSError, ValueError):
+            pass
+
+        pages = {}
+        tasks = []
+        for key, output_file in self.html_outputs():
+            stat = output_file.stat()
+            entry = previous.get(key)
+            if entry and entry[0] == [stat.st_size, stat.st_mtime_ns]:
+                pages[key] = entry
+            else:
+                tasks.append((key, output_file, [stat.st_size, stat.st_mtime_ns]))
+        results = self.map_tasks('weight_measure_task', [output_file for _, output_file, _ in tasks])
+        for (key, _, stamp), (error, measurement) in zip(tasks, results):
+            if error:
+                self.logger.warning(error)
+            else:
+                pages[key] = [stamp, measurement]
+
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'version': WEIGHT_STATE_VERSION, 'pages': pages}, separators=(',', ':'), sort_keys=True))
+
+        report = weight_report({key: entry[1] for key, entry in pages.items()}, budgets, len(tasks))
+        self.config.weight_report.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.config.weight_report, 'w', encoding='utf-8') as f:
+            if self.config.weight_report.suffix == '.txt':
+                f.write(format_report(report) + '\n')
+            else:
+                json.dump(report, f, indent=1)
+
+        self.logger.info(f"Page weights: {report['pages']} pages ({len(tasks)} measured), "
+                         f"{report['gzip_bytes']} B gzip in total")
+        if not report['over_budget']:
+            return True
+        self.logger.error("Page weights:\n" + format_report(report, top_n=10))
+        self.logger.error(f"Page weights: {report['over_budget']} pages over budget, see {self.config.weight_report}")
+        return False
+
+    def precompress_candidates(self) -> List[Path]:
+        """Text outputs of this build that get compressed siblings."""
+        outputs = [self.config.output_dir / key for key in self.manifest.entries]
+        assets_dir = self.config.output_dir / 'assets'
+        if assets_dir.exists():
+            outputs.extend(path for path in assets_dir.rglob('*') if path.is_file())
+        outputs.extend(self.config.output_dir / name
+                       for name in ['sitemap.xml', 'robots.txt', SERVICE_WORKER, PRECACHE_MANIFEST])
+        outputs.extend(self.config.output_dir.glob('sitemap-*.xml'))
+        search_dir = self.config.output_dir / SEARCH_DIR
+        if search_dir.exists():
+            outputs.extend(search_dir.glob('*.json'))
+        return [path for path in outputs if self.precompressor.wants(path) and path.is_file()]
+
+    def precompress_task(self, output_file: Path) -> Tuple[Optional[str], List[str]]:
+        """Compress one output, returning an error message instead of raising."""
+        try:
+            return None, self.precompressor.compress_file(output_file)
+        except Exception as e:
+            return f"Failed to precompress {output_file}: {e}", []
+
+    def precompress_outputs(self, outputs: Optional[List[Path]] = None):
+        """Write .gz/.zst siblings for text outputs whose bytes changed since the last run.
+
+        outputs limits the run to some outputs (a partial build); the state of
+        the others is kept.
+        """
+        state_path = self.config.cache_dir / 'precompress.json'
+        previous = {}
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get('settings') == self.precompressor.settings:
+                previous = state.get('outputs', {})
+        except (OSError, ValueError):
+            pass
+
+        # Unchanged outputs keep their mtime (write-if-changed), so size and
+        # mtime tell whether the siblings are still current
+        if outputs is None:
+            candidates = self.precompress_candidates()
+            current = {}
+        else:
+            candidates = [path for path in outputs if self.precompressor.wants(path) and path.is_file()]
+            current = dict(previous)
+        tasks = []
+        for output_file in candidates:
+            key = output_file.relative_to(self.config.output_dir).as_posix()
+            stat = output_file.stat()
+            entry = previous.get(key)
+            siblings = self.precompressor.siblings(output_file)
+            if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns] and \
+               all(siblings[fmt].exists() for fmt in entry[2]):
+                current[key] = entry
+            else:
+                tasks.append((key, output_file, [stat.st_size, stat.st_mtime_ns]))
+        up_to_date = len(candidates) - len(tasks)
+
+        written = 0
+        results = self.map_tasks('precompress_task', [output_file for _, output_file, _ in tasks])
+        for (key, _, stamp), (error, formats) in zip(tasks, results):
+            if error:
+                self.logger.warning(error)
+                continue
+            current[key] = stamp + [formats]
+            written += bool(formats)
+
+        # Outputs that are gone take their siblings with them
+        for key in set(previous) - set(current):
+            output_file = self.config.output_dir / key
+            if not output_file.exists():
+                self.precompressor.remove_siblings(output_file)
+
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(state_path, 'w', encoding='utf-8') as f:
+            json.dump({'settings': self.precompressor.settings, 'outputs': current}, f, indent=1, sort_keys=True)
+        self.logger.info(
+            f"Precompressed {written} changed outputs ({up_to_date} up to date, "
+            f"formats: {', '.join(self.precompressor.formats)})"
+        )
+
+    def prune_stale_outputs(self):
+        """Remove outputs of the previous build whose sources were deleted."""
+        for output_file in self.manifest.stale_outputs():
+            if output_file.is_file():
+                output_file.unlink()
+                self.logger.debug(f"Removed stale output: {output_file}")
+
+    def prune_markdown_cache(self):
+        """Remove cached Markdown fragments that no page of this build refers to.
+
+        Every page records the key of its fragment in the manifest (up-to-date
+        pages carry theirs over), so after a full build any other fragment
+        belongs to a deleted page or an old version of an edited one.
+        """
+        keep = {entry['flags']['fragment'] for entry in self.manifest.entries.values()
+                if 'fragment' in entry.get('flags', {})}
+        removed = self.markdown_engine.prune(keep)
+        if removed:
+            self.logger.debug(f"Removed {removed} orphaned Markdown fragments from the cache")
+
     def clean_output_dir(self):
         """Clean built files from output directory."""
         try:
@@ -583,7 +1538,8 @@ class BuildSystem:
                 built_files = [
                     "index.html", "aboutme.html", "case_studies.html",  # Main pages
                     "example.html",  # Example page
-                    "sitemap.xml", "robots.txt",  # Generated files
+                    "sitemap.xml", "robots.txt", "asset-manifest.json",  # Generated files
+                    SERVICE_WORKER, PRECACHE_MANIFEST,
                 ]
 
                 # Remove specific built files if they exist
@@ -593,6 +1549,16 @@ class BuildSystem:
                         file_path.unlink()
                         self.logger.debug(f"Removed built file: {file_path}")
 
+                # Remove child sitemaps of a split sitemap
+                for sitemap_file in self.config.output_dir.glob("sitemap-*.xml"):
+                    sitemap_file.unlink()
+
+                # Remove the generated search index
+                search_dir = self.config.output_dir / SEARCH_DIR
+                if search_dir.is_dir():
+                    shutil.rmtree(search_dir)
+                    self.logger.debug(f"Removed search index: {search_dir}")
+
                 # Remove assets directory if it exists (but not the source assets)
                 assets_dir = self.config.output_dir / "assets"
                 if assets_dir.exists() and assets_dir.is_dir():
@@ -628,22 +1594,82 @@ class BuildSystem:
         """Run the full build process."""
         try:
             self.logger.info("Starting build process...")
+            self.build_time = datetime.now()
+            self.profiler = BuildProfiler(enabled=self.config.profile)
+
+            # Reuse unchanged outputs when a manifest from a previous build is available
+            self.incremental = self.config.incremental and self.manifest.load()
+            if self.incremental:
+                self.logger.info("Incremental build: only changed outputs will be rebuilt")
+            elif self.config.clean:
+                with self.profiler.phase('clean_output_dir'):
+                    self.clean_output_dir()
+
+            with self.profiler.phase('scan_routes'):
+                self.routes.scan()
+            with self.profiler.phase('template_graph'):
+                self.load_template_graph()
+            self.page_loader.clear()
+            with self.profiler.phase('related_pages'):
+                self.build_related_pages()
+            with self.profiler.phase('prefetch_hints'):
+                self.build_prefetch_hints()
+            if self.config.utility_css:
+                with self.profiler.phase('utility_css'):
+                    self.generate_utility_css()
+            with self.profiler.phase('copy_assets'):
+                self.copy_assets()
+            with self.profiler.phase('build_all_pages'):
+                built_pages, errors = self.build_all_pages()
+            mermaid_pages = sum(1 for entry in self.manifest.entries.values() if entry.get('flags', {}).get('mermaid'))
+            self.logger.info(f"Mermaid loaded on demand by {mermaid_pages} pages with diagrams")
+            # Before anything that looks at the output tree (search index, link check)
+            if self.incremental and self.config.clean:
+                with self.profiler.phase('prune_stale_outputs'):
+                    self.prune_stale_outputs()
+            if not errors:
+                with self.profiler.phase('prune_markdown_cache'):
+                    self.prune_markdown_cache()
+
+            if self.config.search_index:
+                with self.profiler.phase('search_index'):
+                    self.build_search_index()
+
+            # Both are write-if-changed, so a no-op build leaves them alone
+            with self.profiler.phase('generate_sitemap'):
+                self.generate_sitemap()
+            with self.profiler.phase('generate_robots_txt'):
+                self.generate_robots_txt()
 
-            if self.config.clean:
-                self.clean_output_dir()
+            links_ok = True
+            if self.config.check_links:
+                with self.profiler.phase('check_links'):
+                    links_ok = self.check_links()
+            weights_ok = True
+            if self.config.check_budgets:
+                with self.profiler.phase('page_weights'):
+                    weights_ok = self.check_page_weights()
 
-            self.copy_assets()
-            built_pages, errors = self.build_all_pages()
+            if self.config.service_worker:
+                with self.profiler.phase('service_worker'):
+                    self.generate_service_worker()
 
-            if built_pages:
-                self.generate_sitemap(built_pages)
-                self.generate_robots_txt()
+            if self.config.precompress:
+                with self.profiler.phase('precompress'):
+                    self.precompress_outputs()
+
+            with self.profiler.phase('save_manifest'):
+                self.manifest.save()
 
-            success = len(errors) == 0
+            success = len(errors) == 0 and links_ok and weights_ok
             if success:
                 self.logger.info("Build completed successfully!")
-            else:
+            elif errors:
                 self.logger.error(f"Build completed with {len(errors)} errors")
+            elif not links_ok:
+                self.logger.error("Build completed with broken links")
+            else:
+                self.logger.error("Build completed with pages over their weight budget")
 
             return success
 
@@ -651,24 +1677,380 @@ class BuildSystem:
             self.logger.error(f"Build failed: {e}")
             return False
 
+        finally:
+            self.shutdown_workers()
+            if self.profiler.enabled:
+                self.write_profile_report()
+
+    def partial_target(self, source_file: Path) -> Optional[Tuple[str, Path]]:
+        """(kind, output) of a source picked for a partial build, or None if it
+        can't be built on its own (templates, fingerprinted assets, ...)."""
+        route = self.routes.route(source_file)
+        if route is not None:
+            return route.kind, route.output
+        if any(source_dir in source_file.parents for source_dir, _ in self.asset_dirs()):
+            # Pages link assets by content hash, renaming one needs a full pass
+            return None
+        rel_path = source_file.relative_to(self.config.source_dir)
+        if rel_path.parts[0] == COPIED_SECTION:
+            return 'copy', self.config.output_dir / rel_path
+        return None
+
+    def build_partial(self) -> bool:
+        """Build only the sources picked by --section, --only or file arguments.
+
+        All other outputs of the previous build are left alone and kept in the
+        manifest; the sitemap entries of the built pages are patched in, and
+        robots.txt is only written if it is missing. Falls back to a full build
+        when there is no previous build to patch or the selection changes the
+        utility stylesheet every page links to.
+        """
+        self.logger.info("Starting partial build...")
+        asset_manifest_path = self.config.output_dir / 'asset-manifest.json'
+        if not self.manifest.load() or (self.config.fingerprint_assets and not asset_manifest_path.is_file()):
+            self.logger.info("No previous build to patch, running a full build")
+            return self.build()
+
+        try:
+            sources = self.routes.select(self.config.sections, self.config.only, self.config.files)
+        except ValueError as e:
+            self.logger.error(f"Partial build failed: {e}")
+            return False
+        if not sources:
+            self.logger.error("Partial build: nothing matches the selection")
+            return False
+
+        if self.config.utility_css and self.generate_utility_css():
+            self.logger.info("New utility classes change every page's stylesheet, running a full build")
+            return self.build()
+
+        try:
+            self.build_time = datetime.now()
+            self.profiler = BuildProfiler(enabled=self.config.profile)
+            self.incremental = True
+            self.manifest.carry_over()
+            if not self.config.incremental:
+                # --full rebuilds the selected outputs even if they are up to date
+                self.manifest.previous = {}
+            self.load_template_graph()
+            if self.config.related_pages:
+                # The lists of the last full build; recomputing them needs every page
+                self.use_related_state(self.read_related_state())
+            if self.config.prefetch_pages:
+                # Hints of the last full build too, the graph spans the whole site
+                self.prefetch = (self.read_prefetch_state() or {}).get('hints', {})
+            if self.config.fingerprint_assets:
+                self.use_asset_manifest(AssetManifest.from_json(asset_manifest_path.read_text(encoding='utf-8')))
+
+            pages, copies, skipped = [], [], []
+            for source_file in sources:
+                target = self.partial_target(source_file)
+                if target is None:
+                    skipped.append(source_file)
+                elif target[0] == 'page':
+                    pages.append(self.routes.route(source_file))
+                else:
+                    copies.append((source_file, target[1], target[0] == 'post_process'))
+            for source_file in skipped:
+                self.logger.warning(f"Skipped {source_file.relative_to(self.config.project_root)}: "
+                                    f"only a full build can update it")
+            self.logger.info(f"Partial build: {len(pages)} pages and {len(copies)} copied files selected")
+
+            with self.profiler.phase('copy_assets'):
+                for source_file, output_file, post_process in copies:
+                    self.copy_source_file(source_file, output_file, post_process)
+                self.post_process_pending()
+            with self.profiler.phase('build_all_pages'):
+                _, errors = self.build_all_pages(pages)
+            outputs = [route.output for route in pages] + [output_file for _, output_file, _ in copies]
+            keys = [self.manifest.output_key(output_file) for output_file in outputs]
+
+            if self.config.search_index:
+                with self.profiler.phase('search_index'):
+                    self.build_search_index()
+            with self.profiler.phase('generate_sitemap'):
+                self.generate_sitemap(keys)
+            if not (self.config.output_dir / 'robots.txt').exists():
+                self.generate_robots_txt()
+
+            links_ok = True
+            if self.config.check_links:
+                with self.profiler.phase('check_links'):
+                    links_ok = self.check_links()
+            weights_ok = True
+            if self.config.check_budgets:
+                with self.profiler.phase('page_weights'):
+                    weights_ok = self.check_page_weights()
+
+            if self.config.service_worker:
+                with self.profiler.phase('service_worker'):
+                    self.generate_service_worker()
+
+            if self.config.precompress:
+                with self.profiler.phase('precompress'):
+                    shared = [self.config.output_dir / name
+                              for name in ['sitemap.xml', 'robots.txt', SERVICE_WORKER, PRECACHE_MANIFEST]]
+                    shared.extend(self.config.output_dir.glob('sitemap-*.xml'))
+                    shared.extend((self.config.output_dir / SEARCH_DIR).glob('*.json'))
+                    self.precompress_outputs(outputs + shared)
+
+            with self.profiler.phase('save_manifest'):
+                self.manifest.save()
+
+            success = len(errors) == 0 and links_ok and weights_ok
+            if success:
+                self.logger.info("Partial build completed successfully!")
+            elif errors:
+                self.logger.error(f"Partial build completed with {len(errors)} errors")
+            elif not links_ok:
+                self.logger.error("Partial build completed with broken links")
+            else:
+                self.logger.error("Partial build completed with pages over their weight budget")
+            return success
+
+        except Exception as e:
+            self.logger.error(f"Partial build failed: {e}")
+            return False
+
+        finally:
+            self.shutdown_workers()
+            if self.profiler.enabled:
+                self.write_profile_report()
+
+    def write_profile_report(self):
+        """Write the --profile JSON report and log the summary table."""
+        report = self.profiler.report()
+        report['jobs'] = self.config.jobs
+        report['incremental'] = self.incremental
+        self.profiler.write_report(report, self.config.profile_report)
+        self.logger.info(f"Profile report written to {self.config.profile_report}")
+        self.logger.info("Build profile:\n" + self.profiler.format_table(report, self.config.profile_top))
+
+    def classify_change(self, changed_file: Path) -> Optional[Tuple[str, Path, Optional[Path]]]:
+        """Map a changed input file to the single output it affects.
+
+        Returns (kind, source, output) where kind is 'page', 'copy', 'post_process'
+        or 'none', or None when the change can affect other outputs (templates,
+        added or deleted files) and needs a full incremental build.
+        """
+        if self.is_build_output(changed_file):
+            return 'none', changed_file, None
+        if not changed_file.is_file() or changed_file in self.fingerprinted_sources:
+            # Deleted files and fingerprinted assets (renamed in every page) need a full pass
+            return None
+
+        if self.config.assets_dir in changed_file.parents:
+            output_file = self.config.output_dir / 'assets' / changed_file.relative_to(self.config.assets_dir)
+            if output_file == changed_file:
+                # Assets are served from where they are edited
+                return 'none', changed_file, None
+            kind = 'copy'
+        elif self.config.source_dir in changed_file.parents:
+            rel_path = changed_file.relative_to(self.config.source_dir)
+            route = self.routes.route(changed_file)
+            if route is not None:
+                if route.kind == 'page':
+                    # A YAML file next to a Markdown page is that page's config
+                    sibling = changed_file.with_suffix('.yaml' if changed_file.suffix == '.md' else '.md')
+                    if sibling.exists():
+                        return None
+                output_file, kind = route.output, route.kind
+            elif rel_path.parts[0] == 'learn_concepts':
+                # Static files of learn_concepts are mirrored as they are
+                output_file = self.config.output_dir / rel_path
+                kind = 'copy'
+            else:
+                return 'none', changed_file, None
+        else:
+            # Templates feed many outputs
+            return None
+
+        # New outputs also change the sitemap
+        if not output_file.exists():
+            return None
+        return kind, changed_file, output_file
+
+    def is_build_output(self, path: Path) -> bool:
+        """True for files the build writes to output/assets, which is also the
+        watched assets directory here: hashed and generated assets and their
+        compressed siblings."""
+        assets_dir = self.config.output_dir / 'assets'
+        if assets_dir not in path.parents:
+            return False
+        if path.suffix in SIBLING_SUFFIXES.values() or is_hashed(path.name):
+            return True
+        return path.relative_to(self.config.output_dir).as_posix() in self.generated_assets
+
+    def rebuild_changed(self, changed_files: List[Path]) -> bool:
+        """Rebuild after a batch of edits, touching only the outputs they affect.
+
+        Falls back to a full incremental build when a change can affect more
+        than its own output.
+        """
+        targets = [self.classify_change(changed_file) for changed_file in changed_files]
+        if not self.manifest.previous or any(target is None for target in targets):
+            return self.build()
+
+        self.manifest.refresh()
+        self.page_loader.clear()
+        if self.config.utility_css and self.generate_utility_css():
+            # A new class changes the stylesheet every page links to
+            return self.build()
+
+        try:
+            self.build_time = datetime.now()
+            pages = []
+            for kind, source_file, output_file in targets:
+                if kind == 'page':
+                    page = self.load_page(source_file)
+                    key = self.manifest.output_key(output_file)
+                    related, prefetch = self.related_links(key), self.prefetch.get(key, [])
+                    inputs = self.manifest.fingerprint(
+                        source_file, self.template_paths(PAGE_TEMPLATES), page.metadata,
+                        assets=self.asset_manifest.version, related=related, prefetch=prefetch
+                    )
+                    pages.append(((source_file, output_file, page, related, prefetch), inputs))
+                elif kind in ['copy', 'post_process']:
+                    self.copy_source_file(source_file, output_file, kind == 'post_process')
+            self.post_process_pending()
+
+            errors = 0
+            for task, inputs in pages:
+                source_file, output_file, page = task[:3]
+                error, _ = self.render_page_task(task)
+                if error:
+                    self.logger.error(f"Failed to build {source_file}: {error}")
+                    errors += 1
+                    continue
+                self.manifest.record(output_file, source_file, inputs, self.entry_flags(page))
+                self.logger.debug(f"Built {output_file}")
+
+            if self.config.search_index:
+                self.build_search_index()
+            # An edit moves the page's lastmod
+            self.generate_sitemap()
+            links_ok = self.check_links() if self.config.check_links else True
+            weights_ok = self.check_page_weights() if self.config.check_budgets else True
+            if self.config.service_worker:
+                self.generate_service_worker()
+            self.manifest.save()
+            return errors == 0 and links_ok and weights_ok
+
+        except Exception as e:
+            self.logger.error(f"Rebuild failed: {e}")
+            return False
+
+    def watch_batch(self, changed_files: List[Path]) -> Optional[bool]:
+        """Rebuild for one batch of watched changes. Returns whether the rebuild
+        succeeded, or None when the batch only holds files the build wrote
+        itself (e.g. the assets renamed by the previous rebuild)."""
+        changed_files = [changed_file for changed_file in changed_files if not self.is_build_output(changed_file)]
+        if not changed_files:
+            return None
+        started = time.perf_counter()
+        for changed_file in changed_files:
+            self.logger.info(f"Changed: {changed_file.relative_to(self.config.project_root)}")
+        success = self.rebuild_changed(changed_files)
+        elapsed = (time.perf_counter() - started) * 1000
+        self.logger.info(f"Rebuilt in {elapsed:.0f} ms" if success else f"Rebuild failed after {elapsed:.0f} ms")
+        return success
+
+    def watch(self, port: int = 8000):
+        """Serve the output directory and rebuild whenever a source changes."""
+        # --full applies to the initial build only
+        self.config.incremental = True
+
+        from watcher import PollingWatcher
+        from dev_server import DevServer
+
+        server = DevServer(self.config.output_dir, port)
+        server.start()
+        watcher = PollingWatcher([self.config.source_dir, self.config.templates_dir, self.config.assets_dir])
+        self.logger.info(f"Serving {self.config.output_dir} at {server.url} (Ctrl+C to stop)")
+
+        def on_change(changed_files: List[Path]):
+            if self.watch_batch(changed_files) is not None:
+                server.reload()
+
+        try:
+            watcher.watch(on_change)
+        except KeyboardInterrupt:
+            self.logger.info("Stopped watching")
+        finally:
+            server.stop()
+            self.shutdown_workers()
+
 
 def main():
     """Main entry point."""
     import argparse
+    import cProfile
 
     parser = argparse.ArgumentParser(description='Build Data Engineering Guides website')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose logging')
     parser.add_argument('--no-clean', action='store_true', help='Don\'t clean output directory')
+    parser.add_argument('--full', action='store_true', help='Ignore the build manifest and rebuild everything')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for page rendering and post-processing (0 = one per CPU)')
+    parser.add_argument('--profile', action='store_true', help='Record per-phase and per-page timings')
+    parser.add_argument('--profile-report', type=Path, help='Where to write the JSON profile report')
+    parser.add_argument('--profile-top', type=int, default=20, help='Slowest pages to list in the profile table')
+    parser.add_argument('--precompress', action='store_true', default=config.precompress,
+                        help='Write .gz (and .zst) siblings of changed text outputs')
+    parser.add_argument('--check-links', action='store_true', default=config.check_links,
+                        help='Check internal links of the built pages; broken links fail the build')
+    parser.add_argument('--link-report', type=Path, help='Where to write the JSON broken-link report')
+    parser.add_argument('--check-budgets', action='store_true', default=config.check_budgets,
+                        help='Check page weights against their budgets; pages over budget fail the build')
+    parser.add_argument('--weight-report', type=Path,
+                        help='Where to write the page weight report (JSON, or a text table for .txt)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Serve the site with live reload and rebuild on every change')
+    parser.add_argument('--port', type=int, default=8000, help='Port for --watch')
+    parser.add_argument('--explain', action='store_true',
+                        help='Log why each rebuilt page or copied HTML file was rebuilt')
+    parser.add_argument('--cprofile', type=Path, metavar='FILE',
+                        help='Dump cProfile stats of the main process (for snakeviz/flameprof)')
+    parser.add_argument('--section', action='append', default=[], metavar='NAME',
+                        help='Only build this top-level content directory (e.g. aws); repeatable')
+    parser.add_argument('--only', action='append', default=[], metavar='GLOB',
+                        help="Only build sources or outputs matching this glob (e.g. 'gcp/case_studies/*'); repeatable")
+    parser.add_argument('files', nargs='*', type=Path,
+                        help='Only build these source files or directories')
 
     args = parser.parse_args()
 
     build_config = BuildConfig(
         verbose=args.verbose,
-        clean=not args.no_clean
+        clean=not args.no_clean,
+        incremental=not args.full,
+        jobs=args.jobs or os.cpu_count() or 1,
+        profile=args.profile,
+        profile_report=args.profile_report,
+        profile_top=args.profile_top,
+        precompress=args.precompress,
+        check_links=args.check_links,
+        link_report=args.link_report,
+        check_budgets=args.check_budgets,
+        weight_report=args.weight_report,
+        sections=args.section,
+        only=args.only,
+        files=args.files,
+        explain=args.explain
     )
 
     builder = BuildSystem(build_config)
-    success = builder.build()
+    run = builder.build_partial if build_config.partial else builder.build
+    if args.cprofile:
+        profiler = cProfile.Profile()
+        success = profiler.runcall(run)
+        profiler.dump_stats(args.cprofile)
+    else:
+        success = run()
+
+    if args.watch:
+        builder.watch(args.port)
+        return
 
     sys.exit(0 if success else 1)
 
@@ -0,0 +1,167 @@
+"""
+Development server with live reload.
+Serves the output directory and pushes a reload event to open tabs after each rebuild.
+Precompressed .zst/.gz siblings are sent as-is to clients that accept them.
+"""
+
+import argparse
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from precompress import SIBLING_SUFFIXES
+
+
+LIVE_RELOAD_PATH = '/__livereload'
+
+# Injected into served HTML only; never written to the built files
+LIVE_RELOAD_SCRIPT = (
+    '<script>(function () {'
+    f'var source = new EventSource("{LIVE_RELOAD_PATH}");'
+    'source.onmessage = function () { window.location.reload(); };'
+    '})();</script>'
+).encode('utf-8')
+
+
+class ReloadNotifier:
+    """Lets request threads wait for the next rebuild."""
+
+    def __init__(self):
+        self.version = 0
+        self.condition = threading.Condition()
+
+    def notify(self):
+        with self.condition:
+            self.version += 1
+            self.condition.notify_all()
+
+    def wait(self, version: int, timeout: float) -> int:
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Static file handler that adds the live-reload endpoint and script."""
+
+    notifier: ReloadNotifier = None
+    live_reload = True
+
+    def log_message(self, format, *args):
+        # Keep the console for build output
+        pass
+
+    def do_GET(self):
+        if self.live_reload and self.path == LIVE_RELOAD_PATH:
+            self.serve_events()
+            return
+
+        path = Path(self.translate_path(self.path))
+        if path.is_dir() and self.path.endswith('/'):
+            path = path / 'index.html'
+        if self.live_reload and path.suffix == '.html' and path.is_file():
+            self.serve_html(path)
+            return
+        if path.is_file() and self.serve_precompressed(path):
+            return
+        super().do_GET()
+
+    def serve_precompressed(self, path: Path) -> bool:
+        """Send a current .zst/.gz sibling if the client accepts it. Returns False if none applies."""
+        accepted = {token.split(';')[0].strip() for token in self.headers.get('Accept-Encoding', '').split(',')}
+        mtime = path.stat().st_mtime_ns
+        # Format names double as the Content-Encoding tokens
+        for fmt, suffix in SIBLING_SUFFIXES.items():
+            sibling = path.with_name(path.name + suffix)
+            if fmt not in accepted or not sibling.is_file():
+                continue
+            # A sibling older than its file is left over from before an edit
+            if sibling.stat().st_mtime_ns < mtime:
+                continue
+            body = sibling.read_bytes()
+            self.send_response(200)
+            self.send_header('Content-Type', self.guess_type(str(path)))
+            self.send_header('Content-Encoding', fmt)
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Last-Modified', self.date_time_string(int(path.stat().st_mtime)))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+        return False
+
+    def serve_html(self, path: Path):
+        body = path.read_bytes()
+        marker = body.rfind(b'</body>')
+        if marker == -1:
+            body += LIVE_RELOAD_SCRIPT
+        else:
+            body = body[:marker] + LIVE_RELOAD_SCRIPT + body[marker:]
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def serve_events(self):
+        """Server-sent events: one message per rebuild, comments as keep-alives."""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        version = self.notifier.version
+        try:
+            while True:
+                new_version = self.notifier.wait(version, timeout=15)
+                if new_version != version:
+                    version = new_version
+                    self.wfile.write(f'data: {version}\n\n'.encode('utf-8'))
+                else:
+                    self.wfile.write(b': keep-alive\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class DevServer:
+    """Serves a directory in a background thread and signals reloads."""
+
+    def __init__(self, directory: Path, port: int = 8000, host: str = '127.0.0.1', live_reload: bool = True):
+        self.notifier = ReloadNotifier()
+        handler = type('BoundDevRequestHandler', (DevRequestHandler,),
+                       {'notifier': self.notifier, 'live_reload': live_reload})
+        self.httpd = ThreadingHTTPServer((host, port), partial(handler, directory=str(directory)))
+        self.httpd.daemon_threads = True
+        self.url = f'http://{host}:{port}/'
+
+    def start(self):
+        thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        thread.start()
+
+    def reload(self):
+        """Tell every open tab to reload."""
+        self.notifier.notify()
+
+    def stop(self):
+        self.httpd.shutdown()
+
+
+def main():
+    """Serve a built site without live reload (make serve)."""
+    parser = argparse.ArgumentParser(description='Serve the built website, using precompressed files')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--directory', type=Path, default=Path('.'), help='Directory to serve')
+    args = parser.parse_args()
+
+    server = DevServer(args.directory, args.port, live_reload=False)
+    print(f"Serving {args.directory.resolve()} at {server.url} (Ctrl+C to stop)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""
+Delta-sync of static files into the output tree.
+Compares size, mtime and content hash so unchanged files are never rewritten.
+"""
+
+import os
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+# Linux FICLONE ioctl: share extents copy-on-write (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+
+def _file_digest(path: Path) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class FileSync:
+    """Copies files into the output tree only when their content differs."""
+
+    def __init__(self, link: bool = True):
+        # Try reflinks, then hardlinks, before falling back to a byte copy
+        self.link = link
+        self._reflink_ok = fcntl is not None
+        self._hardlink_ok = True
+        self.stats: Dict[str, int] = {'copied': 0, 'linked': 0, 'unchanged': 0, 'removed': 0}
+
+    def is_same(self, source_file: Path, output_file: Path) -> bool:
+        """True if output_file already holds exactly source_file's content."""
+        try:
+            src_stat = source_file.stat()
+            dst_stat = output_file.stat()
+        except FileNotFoundError:
+            return False
+
+        if src_stat.st_size != dst_stat.st_size:
+            return False
+        if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+            return True
+        if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+            return True
+        return _file_digest(source_file) == _file_digest(output_file)
+
+    def sync_file(self, source_file: Path, output_file: Path) -> bool:
+        """Bring output_file up to date with source_file. Returns True if it was written."""
+        if self.is_same(source_file, output_file):
+            self.stats['unchanged'] += 1
+            return False
+        self.place_file(source_file, output_file)
+        return True
+
+    def place_file(self, source_file: Path, output_file: Path):
+        """Materialise source_file at output_file via reflink, hardlink or copy.
+
+        The new file is created beside the destination and renamed over it, so an
+        existing hardlink is replaced rather than written through.
+        """
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = output_file.with_name(f'.tmp-{output_file.name}')
+        if tmp_file.exists():
+            tmp_file.unlink()
+
+        if self.link and self._try_reflink(source_file, tmp_file):
+            self.stats['linked'] += 1
+        elif self.link and self._try_hardlink(source_file, tmp_file):
+            self.stats['linked'] += 1
+        else:
+            shutil.copy2(source_file, tmp_file)
+            self.stats['copied'] += 1
+        os.replace(tmp_file, output_file)
+
+    def _try_reflink(self, source_file: Path, tmp_file: Path) -> bool:
+        if not self._reflink_ok:
+            return False
+        try:
+            with open(source_file, 'rb') as src, open(tmp_file, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            shutil.copystat(source_file, tmp_file)
+            return True
+        except OSError:
+            # Not supported on this filesystem; don't try again this build
+            self._reflink_ok = False
+            if tmp_file.exists():
+                tmp_file.unlink()
+            return False
+
+    def _try_hardlink(self, source_file: Path, tmp_file: Path) -> bool:
+        if not self._hardlink_ok:
+            return False
+        try:
+            os.link(source_file, tmp_file)
+            return True
+        except OSError:
+            self._hardlink_ok = False
+            return False
+
+    def sync_tree(self, source_dir: Path, output_dir: Path,
+                  exclude: Optional[Callable[[Path], bool]] = None) -> Set[Path]:
+        """Sync every file under source_dir into output_dir.
+
+        Files for which exclude() is true are skipped so the caller can handle them.
+        Returns the set of output paths that correspond to source files.
+        """
+        outputs = set()
+        for source_file in source_dir.rglob('*'):
+            if not source_file.is_file():
+                continue
+            output_file = output_dir / source_file.relative_to(source_dir)
+            outputs.add(output_file)
+            if exclude is None or not exclude(source_file):
+                self.sync_file(source_file, output_file)
+        return outputs
+
+    def remove_stale(self, output_dir: Path, expected: Iterable[Path],
+                     keep: Optional[Callable[[Path], bool]] = None):
+        """Delete files under output_dir that no source produced, then empty directories."""
+        expected = set(expected)
+        for output_file in sorted(output_dir.rglob('*'), reverse=True):
+            if output_file.is_dir():
+                if not any(output_file.iterdir()):
+                    output_file.rmdir()
+            elif output_file not in expected and not (keep and keep(output_file)):
+                output_file.unlink()
+                self.stats['removed'] += 1
@@ -0,0 +1,54 @@
+"""
+Cache of pre-rendered template fragments.
+Header and footer markup depends only on the page's section and directory depth,
+so each combination is rendered once and reused for every page that shares it.
+A fragment is rendered again when its template or any template it includes,
+extends or imports changes.
+"""
+
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+
+class FragmentCache:
+    """Memoizes rendered fragments keyed by (template, section, depth)."""
+
+    def __init__(self, templates_dir: Path, render: Callable[[str, Dict[str, Any]], str],
+                 dependencies: Callable[[str], Iterable[str]]):
+        self.templates_dir = templates_dir
+        self.render = render
+        # Template name -> the templates it is rendered from, itself included
+        self.dependencies = dependencies
+        self._entries: Dict[Tuple[str, Optional[str], int], Tuple[Tuple, str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _template_stamp(self, template_name: str) -> Tuple:
+        """Cheap change detector for a template and everything it includes."""
+        stamp = []
+        for name in self.dependencies(template_name):
+            try:
+                stat = (self.templates_dir / name).stat()
+                stamp.append((name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                stamp.append((name, None, None))
+        return tuple(stamp)
+
+    def get(self, template_name: str, section: Optional[str], depth: int,
+            context_factory: Callable[[], Dict[str, Any]]) -> str:
+        """Return the rendered fragment, rendering it only on a miss or template change."""
+        key = (template_name, section, depth)
+        stamp = self._template_stamp(template_name)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        html = self.render(template_name, context_factory())
+        self._entries[key] = (stamp, html)
+        return html
+
+    def clear(self):
+        """Drop every cached fragment."""
+        self._entries.clear()
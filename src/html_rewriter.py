@@ -0,0 +1,453 @@
+"""
+Single-pass streaming HTML rewriter.
+Tokenizes a document once and applies every registered rewrite rule as it goes.
+"""
+
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+if TYPE_CHECKING:
+    from output_writer import OutputWriter
+
+
+# Comments, declarations, processing instructions and start/end tags.
+# Attribute values are matched as whole quoted strings so '>' inside them is safe.
+TAG_RE = re.compile(r'''
+    <!--.*?-->
+  | <![^>]*>
+  | <\?[^>]*>
+  | <(/?)([a-zA-Z][a-zA-Z0-9:-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>
+''', re.DOTALL | re.VERBOSE)
+
+ATTR_RE = re.compile(r'''([^\s"'>/=]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+)))?''')
+
+# Elements whose content is raw text and must not be tokenized
+RAW_TEXT_ELEMENTS = {'script', 'style', 'textarea', 'title'}
+
+# Elements that never have an end tag
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'source', 'track', 'wbr'
+}
+
+TAG_START_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ/!?')
+
+Token = Tuple[str, str, Optional[str]]
+
+
+class HtmlTokenizer:
+    """Splits an HTML stream into (kind, raw, tag name) tokens without building a tree."""
+
+    def __init__(self, chunk_size: int = 65536):
+        self.chunk_size = chunk_size
+
+    def tokens(self, stream: TextIO) -> Iterator[Token]:
+        """Yield 'text', 'start', 'end' and 'other' tokens; raw text concatenates to the input."""
+        buf = ''
+        eof = False
+        raw_close = None
+
+        def read_more() -> bool:
+            nonlocal buf, eof
+            chunk = stream.read(self.chunk_size)
+            if chunk:
+                buf += chunk
+            else:
+                eof = True
+            return bool(chunk)
+
+        while True:
+            # Inside <script>/<style>: everything up to the closing tag is text
+            if raw_close is not None:
+                match = raw_close.search(buf)
+                if match is None:
+                    if not eof and read_more():
+                        continue
+                    if buf:
+                        yield 'text', buf, None
+                    return
+                if match.start():
+                    yield 'text', buf[:match.start()], None
+                yield 'end', match.group(0), match.group(1).lower()
+                buf = buf[match.end():]
+                raw_close = None
+                continue
+
+            lt = buf.find('<')
+            if lt == -1:
+                if buf:
+                    yield 'text', buf, None
+                    buf = ''
+                if eof or not read_more():
+                    return
+                continue
+            if lt:
+                yield 'text', buf[:lt], None
+                buf = buf[lt:]
+
+            if len(buf) < 2 and not eof:
+                read_more()
+                continue
+            if len(buf) < 2 or buf[1] not in TAG_START_CHARS:
+                # A bare '<' in text, e.g. "a < b"
+                yield 'text', '<', None
+                buf = buf[1:]
+                continue
+
+            match = TAG_RE.match(buf)
+            if match is None:
+                if not eof and read_more():
+                    continue
+                yield 'text', '<', None
+                buf = buf[1:]
+                continue
+
+            raw = match.group(0)
+            buf = buf[match.end():]
+            name = match.group(2)
+            if name is None:
+                yield 'other', raw, None
+                continue
+
+            name = name.lower()
+            if match.group(1):
+                yield 'end', raw, name
+                continue
+
+            yield 'start', raw, name
+            if name in RAW_TEXT_ELEMENTS and not raw.endswith('/>'):
+                raw_close = re.compile(r'</(%s)\s*>' % name, re.IGNORECASE)
+
+
+class StartTag:
+    """A start tag as seen by rewrite rules. Attribute edits update the raw markup."""
+
+    def __init__(self, name: str, raw: str):
+        self.name = name
+        self.raw = raw
+
+    def _find_attr(self, attr: str) -> Optional[re.Match]:
+        attr = attr.lower()
+        # Skip '<' and the tag name
+        pos = len(self.name) + 1
+        end = len(self.raw) - 1
+        for match in ATTR_RE.finditer(self.raw, pos, end):
+            if match.group(1).lower() == attr:
+                return match
+        return None
+
+    def get_attr(self, attr: str) -> Optional[str]:
+        """Return an attribute value, '' for a bare attribute, or None if absent."""
+        match = self._find_attr(attr)
+        if match is None:
+            return None
+        for group in (2, 3, 4):
+            if match.group(group) is not None:
+                return match.group(group)
+        return ''
+
+    def set_attr(self, attr: str, value: str):
+        """Set an attribute value, appending the attribute if it is absent."""
+        value = value.replace('"', '&quot;')
+        match = self._find_attr(attr)
+        if match is None:
+            close = 2 if self.raw.endswith('/>') else 1
+            self.raw = f'{self.raw[:-close].rstrip()} {attr}="{value}"{self.raw[-close:]}'
+        else:
+            self.raw = f'{self.raw[:match.start()]}{match.group(1)}="{value}"{self.raw[match.end():]}'
+
+
+class ReplaceElement:
+    """Rule result: replace the whole element (start tag to matching end tag) with text.
+
+    With when, the element is held back up to its end tag and only replaced if
+    when(its text content) is true; meant for small raw-text elements like <script>.
+    """
+
+    def __init__(self, text: str = '', when: Optional[Callable[[str], bool]] = None):
+        self.text = text
+        self.when = when
+
+
+class RewriteRule:
+    """Base class for rewrite rules applied during the single pass.
+
+    Rules declare the tag names they care about and are only called for those tags.
+    """
+    tags: Tuple[str, ...] = ()
+
+    def reset(self):
+        """Clear per-document state before a rewrite starts."""
+        pass
+
+    def start_tag(self, tag: StartTag, rewriter: 'HtmlRewriter') -> Union[None, str, ReplaceElement]:
+        """Handle a start tag: edit it in place, return replacement text, or a ReplaceElement."""
+        return None
+
+    def end_tag(self, name: str, rewriter: 'HtmlRewriter') -> Optional[str]:
+        """Handle an end tag, returning text to insert before it."""
+        return None
+
+
+class ReplaceElementRule(RewriteRule):
+    """Replace every occurrence of an element with fixed markup."""
+
+    def __init__(self, tag_name: str, replacement: str):
+        self.tags = (tag_name,)
+        self.replacement = replacement
+
+    def start_tag(self, tag, rewriter):
+        return ReplaceElement(self.replacement)
+
+
+class DropElementRule(ReplaceElementRule):
+    """Remove every occurrence of an element and its content."""
+
+    def __init__(self, tag_name: str):
+        super().__init__(tag_name, '')
+
+
+class ReplaceScriptRule(RewriteRule):
+    """Replace <script> elements whose src starts with a prefix with fixed markup.
+
+    replaced tells afterwards the src of the last one replaced in the last document.
+    """
+    tags = ('script',)
+
+    def __init__(self, src_prefix: str, replacement: str):
+        self.src_prefix = src_prefix
+        self.replacement = replacement
+        self.replaced: Optional[str] = None
+
+    def reset(self):
+        self.replaced = None
+
+    def start_tag(self, tag, rewriter):
+        src = tag.get_attr('src') or ''
+        if src.startswith(self.src_prefix):
+            self.replaced = src
+            return ReplaceElement(self.replacement)
+        return None
+
+
+class DropInlineScriptRule(RewriteRule):
+    """Remove inline <script> elements whose whole code matches a pattern."""
+    tags = ('script',)
+
+    def __init__(self, pattern: str):
+        self.pattern = re.compile(pattern, re.DOTALL)
+
+    def start_tag(self, tag, rewriter):
+        if tag.get_attr('src') is not None:
+            return None
+        return ReplaceElement('', when=lambda code: self.pattern.fullmatch(code.strip()) is not None)
+
+
+class AppendToHeadRule(RewriteRule):
+    """Insert markup before </head> unless a <link> already references the marker."""
+    tags = ('link', 'head')
+
+    def __init__(self, markup: str, unless_present: Optional[str] = None):
+        self.markup = markup
+        self.unless_present = unless_present
+        self.present = False
+
+    def reset(self):
+        self.present = False
+
+    def start_tag(self, tag, rewriter):
+        if self.unless_present and tag.name == 'link' and self.unless_present in (tag.get_attr('href') or ''):
+            self.present = True
+        return None
+
+    def end_tag(self, name, rewriter):
+        if name != 'head' or self.present:
+            return None
+        # Match the indentation of the closing tag
+        indent = rewriter.trailing_whitespace
+        return f'    {self.markup}{indent}'
+
+
+class InsertBeforeEndTagRule(RewriteRule):
+    """Insert markup before the first end tag of an element, e.g. at the end of <main>."""
+
+    def __init__(self, tag_name: str, markup: str):
+        self.tags = (tag_name,)
+        self.markup = markup
+        self.done = False
+
+    def reset(self):
+        self.done = False
+
+    def end_tag(self, name, rewriter):
+        if self.done:
+            return None
+        self.done = True
+        indent = rewriter.trailing_whitespace
+        return f'    {self.markup}{indent}'
+
+
+class AppendToBodyIfClassRule(RewriteRule):
+    """Insert markup before </body> if the page has an element with a class.
+
+    markup may be a callable, called at </body> so it can depend on what
+    other rules saw in the document. found tells afterwards whether the last
+    document had one.
+    """
+
+    def __init__(self, class_name: str, markup: Union[str, Callable[[], str]],
+                 tag_names: Iterable[str] = ('div', 'pre', 'code')):
+        self.tags = tuple(tag_names) + ('body',)
+        self.class_name = class_name
+        self.markup = markup
+        self.found = False
+
+    def reset(self):
+        self.found = False
+
+    def start_tag(self, tag, rewriter):
+        if tag.name != 'body' and self.class_name in (tag.get_attr('class') or '').split():
+            self.found = True
+        return None
+
+    def end_tag(self, name, rewriter):
+        if name != 'body' or not self.found:
+            return None
+        markup = self.markup() if callable(self.markup) else self.markup
+        indent = rewriter.trailing_whitespace
+        return f'    {markup}{indent}'
+
+
+class AddClassRule(RewriteRule):
+    """Append missing classes to an element's existing class attribute."""
+
+    def __init__(self, tag_name: str, classes: List[str], unless_any: Iterable[str] = ()):
+        self.tags = (tag_name,)
+        self.classes = classes
+        self.unless_any = set(unless_any)
+
+    def start_tag(self, tag, rewriter):
+        value = tag.get_attr('class')
+        if value is None:
+            return None
+        present = set(value.split())
+        if present & self.unless_any:
+            return None
+        missing = [cls for cls in self.classes if cls not in present]
+        if missing:
+            tag.set_attr('class', value + ''.join(f' {cls}' for cls in missing))
+        return None
+
+
+class RewriteUrlRule(RewriteRule):
+    """Pass URL attributes (e.g. link href, script src) through a rewrite function."""
+
+    def __init__(self, attributes: Dict[str, str], rewrite: Callable[[str], str]):
+        self.tags = tuple(attributes)
+        self.attributes = attributes
+        self.rewrite = rewrite
+
+    def start_tag(self, tag, rewriter):
+        attr = self.attributes[tag.name]
+        value = tag.get_attr(attr)
+        if value:
+            new_value = self.rewrite(value)
+            if new_value != value:
+                tag.set_attr(attr, new_value)
+        return None
+
+
+class HtmlRewriter:
+    """Applies a set of rewrite rules to a document in one forward pass."""
+
+    def __init__(self, rules: List[RewriteRule], tokenizer: Optional[HtmlTokenizer] = None):
+        self.rules = rules
+        self.tokenizer = tokenizer or HtmlTokenizer()
+        self.trailing_whitespace = ''
+        self._rules_by_tag: Dict[str, List[RewriteRule]] = {}
+        for rule in rules:
+            for tag_name in rule.tags:
+                self._rules_by_tag.setdefault(tag_name, []).append(rule)
+
+    def rewrite(self, stream: TextIO) -> Iterator[str]:
+        """Yield the rewritten document in chunks."""
+        for rule in self.rules:
+            rule.reset()
+        self.trailing_whitespace = ''
+        skip_name = None
+        skip_depth = 0
+        # Element held back until its end tag decides a conditional replacement
+        held: Optional[ReplaceElement] = None
+        held_raw: List[str] = []
+        held_text: List[str] = []
+
+        for kind, raw, name in self.tokenizer.tokens(stream):
+            if held is not None:
+                held_raw.append(raw)
+                if kind == 'text':
+                    held_text.append(raw)
+                elif name == skip_name:
+                    if kind == 'start' and name not in VOID_ELEMENTS:
+                        skip_depth += 1
+                    elif kind == 'end':
+                        skip_depth -= 1
+                if skip_depth == 0:
+                    yield held.text if held.when(''.join(held_text)) else ''.join(held_raw)
+                    held, skip_name = None, None
+                    self.trailing_whitespace = ''
+                continue
+
+            if skip_name is not None:
+                if name == skip_name:
+                    if kind == 'start' and name not in VOID_ELEMENTS:
+                        skip_depth += 1
+                    elif kind == 'end':
+                        skip_depth -= 1
+                        if skip_depth == 0:
+                            skip_name = None
+                self.trailing_whitespace = ''
+                continue
+
+            if kind == 'text':
+                stripped = raw.rstrip()
+                self.trailing_whitespace = raw[len(stripped):] if stripped else self.trailing_whitespace + raw
+                yield raw
+                continue
+
+            rules = self._rules_by_tag.get(name) if name else None
+            if kind == 'start' and rules:
+                tag = StartTag(name, raw)
+                output = None
+                for rule in rules:
+                    result = rule.start_tag(tag, self)
+                    if isinstance(result, ReplaceElement):
+                        if name not in VOID_ELEMENTS and not raw.endswith('/>'):
+                            skip_name = name
+                            skip_depth = 1
+                            if result.when is not None:
+                                held, held_raw, held_text = result, [tag.raw], []
+                                break
+                        output = result.text
+                        break
+                    if result is not None:
+                        output = result
+                        break
+                if held is not None:
+                    continue
+                raw = tag.raw if output is None else output
+            elif kind == 'end' and rules:
+                inserted = ''.join(rule.end_tag(name, self) or '' for rule in rules)
+                raw = inserted + raw
+
+            self.trailing_whitespace = ''
+            if raw:
+                yield raw
+
+    def rewrite_file(self, source_file: Path, output_file: Path, writer: 'OutputWriter'):
+        """Stream a rewritten copy of source_file into output_file through the output writer.
+
+        Returns True if output_file changed.
+        """
+        with open(source_file, 'r', encoding='utf-8') as src:
+            return writer.write_chunks(output_file, self.rewrite(src))
@@ -0,0 +1,120 @@
+"""
+Internal link checker.
+Resolves every href/src of the built pages against the output tree, the way a
+static host would (directory index pages, extensionless .html, #fragment
+anchors). The link graph is kept between builds so only changed pages, and
+pages linking to something that changed, are checked again.
+"""
+
+import io
+import re
+import html
+import posixpath
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import unquote
+
+from html_rewriter import HtmlTokenizer, StartTag
+
+
+# URL attribute of every element that links to another file
+LINK_ATTRIBUTES = {
+    'a': 'href', 'area': 'href', 'link': 'href',
+    'script': 'src', 'img': 'src', 'iframe': 'src', 'source': 'src',
+    'video': 'src', 'audio': 'src', 'embed': 'src', 'track': 'src',
+}
+
+# A scheme (https:, mailto:, data:, javascript:, ...) or a protocol-relative URL
+EXTERNAL_RE = re.compile(r'^(?:[a-zA-Z][a-zA-Z0-9+.-]*:|//)')
+
+# Fragments browsers resolve without a matching id
+IMPLICIT_ANCHORS = {'', 'top'}
+
+
+def extract_links(markup: str) -> Tuple[List[str], List[str]]:
+    """Internal URLs a page links to, and the anchors (id, <a name>) it defines."""
+    links: Set[str] = set()
+    anchors: Set[str] = set()
+    for kind, raw, name in HtmlTokenizer().tokens(io.StringIO(markup)):
+        if kind != 'start':
+            continue
+        tag = StartTag(name, raw)
+        anchor = tag.get_attr('id') or (tag.get_attr('name') if name == 'a' else None)
+        if anchor:
+            anchors.add(html.unescape(anchor))
+        attr = LINK_ATTRIBUTES.get(name)
+        url = tag.get_attr(attr) if attr else None
+        if url:
+            url = html.unescape(url).strip()
+            if url and not EXTERNAL_RE.match(url):
+                links.add(url)
+    return sorted(links), sorted(anchors)
+
+
+def resolve(page_key: str, url: str) -> Tuple[Optional[str], bool, str]:
+    """Resolve a URL found in the page at page_key.
+
+    Returns (target path relative to the output root, or None if it leaves the
+    site; whether it names a directory; fragment).
+    """
+    path, _, fragment = url.partition('#')
+    path = path.split('?', 1)[0]
+    fragment = unquote(fragment)
+    if not path:
+        return page_key, False, fragment
+
+    path = unquote(path)
+    if path.startswith('/'):
+        key = posixpath.normpath(path.lstrip('/') or '.')
+    else:
+        key = posixpath.normpath(posixpath.join(posixpath.dirname(page_key), path))
+    if key == '..' or key.startswith('../'):
+        return None, False, fragment
+    return key, path.endswith('/') or key == '.', fragment
+
+
+class LinkChecker:
+    """Checks resolved links against the files in an output directory."""
+
+    def __init__(self, output_dir: Path, anchors: Callable[[str], Optional[List[str]]]):
+        self.output_dir = output_dir
+        # Anchors of an HTML file by output key (None if it can't be read)
+        self.anchors = anchors
+        self.exists: Dict[str, bool] = {}
+
+    def is_file(self, key: str) -> bool:
+        if key not in self.exists:
+            self.exists[key] = (self.output_dir / key).is_file()
+        return self.exists[key]
+
+    def find(self, key: str, directory: bool) -> Tuple[Optional[str], List[str]]:
+        """The file a static host would serve for a target, and the paths it looked at.
+
+        Like GitHub Pages: directories serve index.html and extensionless
+        paths fall back to .html.
+        """
+        index = 'index.html' if key == '.' else f'{key}/index.html'
+        candidates = [index] if directory else [key, index, f'{key}.html']
+        for i, candidate in enumerate(candidates):
+            if self.is_file(candidate):
+                return candidate, candidates[:i + 1]
+        return None, candidates
+
+    def check_page(self, page_key: str, links: List[str]) -> Tuple[List[Dict[str, str]], List[str]]:
+        """Broken links of one page, and the output paths its links depend on."""
+        broken = []
+        depends: Set[str] = set()
+        for url in links:
+            target, directory, fragment = resolve(page_key, url)
+            if target is None:
+                broken.append({'page': page_key, 'url': url, 'reason': 'outside the site'})
+                continue
+            found, candidates = self.find(target, directory)
+            depends.update(candidates)
+            if found is None:
+                broken.append({'page': page_key, 'url': url, 'reason': 'missing file'})
+            elif fragment not in IMPLICIT_ANCHORS and found.endswith('.html'):
+                anchors = self.anchors(found)
+                if anchors is not None and fragment not in anchors:
+                    broken.append({'page': page_key, 'url': url, 'reason': 'missing anchor'})
+        return broken, sorted(depends)
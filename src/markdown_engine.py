@@ -0,0 +1,110 @@
+"""
+Reusable Markdown converter with a persistent rendered-fragment cache.
+One configured Markdown instance is built per process and reset between
+documents; rendered HTML is cached on disk keyed by source and extension config,
+and fragments no page refers to any more are pruned after a full build.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from build_manifest import hash_bytes, hash_data
+
+
+class MarkdownEngine:
+    """Converts Markdown text to HTML, reusing one Markdown instance and cached fragments."""
+
+    def __init__(self, extensions: List[str], extension_configs: Dict[str, Dict[str, Any]],
+                 cache_dir: Optional[Path] = None):
+        self.extensions = extensions
+        self.extension_configs = extension_configs
+        self.cache_dir = cache_dir
+        # The markdown package is only imported once a document needs converting
+        self._markdown = None
+        self._config_key: Optional[str] = None
+        self.stats: Dict[str, int] = {'converted': 0, 'cached': 0}
+
+    @property
+    def config_key(self) -> str:
+        """Any change to the extension setup or the library invalidates every fragment."""
+        if self._config_key is None:
+            import markdown
+            self._config_key = hash_data({
+                'extensions': self.extensions,
+                'extension_configs': self.extension_configs,
+                'markdown': markdown.__version__,
+            })
+        return self._config_key
+
+    @property
+    def instance(self):
+        """The process-wide Markdown instance, created on first use."""
+        if self._markdown is None:
+            import markdown
+            self._markdown = markdown.Markdown(
+                extensions=self.extensions,
+                extension_configs=self.extension_configs
+            )
+        return self._markdown
+
+    def fragment_key(self, text: str) -> str:
+        """Key of the cached fragment of this text."""
+        return hash_bytes(f'{self.config_key}\0{text}'.encode('utf-8'))
+
+    def _cache_path(self, text: str) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        key = self.fragment_key(text)
+        return self.cache_dir / key[:2] / f'{key}.html'
+
+    def convert(self, text: str) -> str:
+        """Convert Markdown to HTML, skipping conversion if this exact text was rendered before."""
+        cache_path = self._cache_path(text)
+        if cache_path is not None:
+            try:
+                html = cache_path.read_text(encoding='utf-8')
+                self.stats['cached'] += 1
+                return html
+            except FileNotFoundError:
+                pass
+
+        html = self.instance.reset().convert(text)
+        self.stats['converted'] += 1
+
+        if cache_path is not None:
+            self._store(cache_path, html)
+        return html
+
+    def _store(self, cache_path: Path, html: str):
+        """Write a fragment atomically; worker processes may share the cache directory."""
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(html)
+            os.replace(tmp_name, cache_path)
+        except OSError:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """Delete every cached fragment whose key is not in keep; returns how many were deleted."""
+        if self.cache_dir is None or not self.cache_dir.is_dir():
+            return 0
+        keep = set(keep)
+        removed = 0
+        for bucket in self.cache_dir.iterdir():
+            if not bucket.is_dir():
+                continue
+            for path in bucket.iterdir():
+                if path.suffix == '.html' and path.stem not in keep:
+                    path.unlink()
+                    removed += 1
+            try:
+                bucket.rmdir()
+            except OSError:
+                # Still holds fragments
+                pass
+        return removed
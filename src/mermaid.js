@@ -0,0 +1,80 @@
+/*
+ * On-demand Mermaid loader (see src/build_system.py). The build only adds this
+ * script to pages that contain diagrams; the Mermaid library itself, given in
+ * data-mermaid-src (the version a copied page pinned, or mermaid_url), is
+ * fetched when the first diagram is about to scroll into view, and each
+ * diagram is rendered as it gets close.
+ */
+(function () {
+    'use strict';
+
+    var script = document.currentScript;
+    var src = script && script.getAttribute('data-mermaid-src');
+    var loading = null;
+
+    function load() {
+        if (!loading) {
+            loading = new Promise(function (resolve, reject) {
+                if (window.mermaid) {
+                    resolve(window.mermaid);
+                    return;
+                }
+                var tag = document.createElement('script');
+                tag.src = src;
+                tag.async = true;
+                tag.onload = function () {
+                    window.mermaid.initialize({ startOnLoad: false, theme: 'default' });
+                    resolve(window.mermaid);
+                };
+                tag.onerror = reject;
+                document.head.appendChild(tag);
+            });
+        }
+        return loading;
+    }
+
+    function render(nodes) {
+        load().then(function (mermaid) {
+            if (mermaid.run) {
+                mermaid.run({ nodes: nodes });
+            } else {
+                // Mermaid 8/9, still pinned by some copied pages
+                mermaid.init(undefined, nodes);
+            }
+        }).catch(function () {
+            // Leave the diagram source visible if the library can't be fetched
+        });
+    }
+
+    function start() {
+        var nodes = Array.prototype.slice.call(document.querySelectorAll('.mermaid'));
+        if (!nodes.length || !src) {
+            return;
+        }
+        if (!('IntersectionObserver' in window)) {
+            render(nodes);
+            return;
+        }
+        var observer = new IntersectionObserver(function (entries) {
+            var visible = [];
+            entries.forEach(function (entry) {
+                if (entry.isIntersecting) {
+                    observer.unobserve(entry.target);
+                    visible.push(entry.target);
+                }
+            });
+            if (visible.length) {
+                render(visible);
+            }
+        }, { rootMargin: '200px 0px' });
+        nodes.forEach(function (node) {
+            observer.observe(node);
+        });
+    }
+
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', start);
+    } else {
+        start();
+    }
+})();
@@ -0,0 +1,81 @@
+"""
+Write-if-changed output layer.
+Every build output is written to a temp file and only renamed over the existing
+file when its content really changed, so unchanged pages keep their bytes and mtimes.
+"""
+
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+
+class OutputWriter:
+    """Atomically writes outputs, skipping writes that would not change anything."""
+
+    def __init__(self, volatile_patterns: Iterable[str] = ()):
+        # Regions that legitimately differ on every build (timestamps) and
+        # should not count as a change on their own
+        self.volatile: List[re.Pattern] = [re.compile(pattern) for pattern in volatile_patterns]
+        self.file_mode = 0o666 & ~_current_umask()
+        self.stats: Dict[str, int] = {'written': 0, 'unchanged': 0, 'bytes_written': 0}
+
+    def normalize(self, text: str) -> str:
+        """Blank out volatile regions so two builds of the same page compare equal."""
+        for pattern in self.volatile:
+            text = pattern.sub('', text)
+        return text
+
+    def write_text(self, output_file: Path, content: str) -> bool:
+        """Write content to output_file if it differs. Returns True if the file was written."""
+        return self.write_chunks(output_file, [content])
+
+    def write_chunks(self, output_file: Path, chunks: Iterable[str]) -> bool:
+        """Stream chunks into a temp file and atomically replace output_file if it changed."""
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=output_file.parent, prefix='.tmp-', suffix=output_file.suffix)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for chunk in chunks:
+                    f.write(chunk)
+
+            if self.is_unchanged(Path(tmp_name), output_file):
+                os.unlink(tmp_name)
+                self.stats['unchanged'] += 1
+                return False
+
+            os.chmod(tmp_name, self.file_mode)
+            os.replace(tmp_name, output_file)
+            self.stats['written'] += 1
+            self.stats['bytes_written'] += output_file.stat().st_size
+            return True
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def is_unchanged(self, new_file: Path, output_file: Path) -> bool:
+        """Compare a freshly written file with the existing output."""
+        try:
+            old_size = output_file.stat().st_size
+        except FileNotFoundError:
+            return False
+
+        new_bytes = new_file.read_bytes()
+        if old_size == len(new_bytes) and output_file.read_bytes() == new_bytes:
+            return True
+        if not self.volatile:
+            return False
+
+        try:
+            old_text = output_file.read_bytes().decode('utf-8')
+            return self.normalize(old_text) == self.normalize(new_bytes.decode('utf-8'))
+        except UnicodeDecodeError:
+            return False
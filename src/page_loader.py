@@ -0,0 +1,116 @@
+"""
+Page source loader.
+Reads every Markdown/YAML page once per build and splits it into metadata and
+raw body: YAML pages keep their body in `content`, Markdown pages may start
+with a front matter block and/or have a YAML file of the same name next to
+them. YAML is parsed with libyaml when it is available; PyYAML is only
+imported once a page is actually read.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+
+# A leading "---" line, the YAML metadata, then a closing "---" or "..." line
+FRONT_MATTER_RE = re.compile(r'\A---[ \t]*\r?\n(.*?)^(?:---|\.\.\.)[ \t]*(?:\r?\n|\Z)', re.DOTALL | re.MULTILINE)
+
+# Metadata of a page that has none of its own
+DEFAULT_DESCRIPTION = 'Data engineering concepts and guides'
+DEFAULT_KEYWORDS = ['data engineering', 'cloud', 'distributed systems']
+
+BODY_FORMATS = {'markdown', 'html'}
+
+
+class Page(NamedTuple):
+    source: Path
+    metadata: Dict[str, Any]
+    body: str
+    # 'markdown' or 'html'
+    format: str
+
+
+def parse_yaml(text: str) -> Any:
+    import yaml
+    try:
+        loader = yaml.CSafeLoader
+    except AttributeError:
+        # PyYAML built without libyaml
+        loader = yaml.SafeLoader
+    return yaml.load(text, Loader=loader)
+
+
+def split_front_matter(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """(metadata, body) of a Markdown document; metadata is None without front matter.
+
+    A leading block that isn't a YAML mapping (e.g. a horizontal rule) is left
+    in the body.
+    """
+    match = FRONT_MATTER_RE.match(text)
+    if match:
+        import yaml
+        try:
+            metadata = parse_yaml(match.group(1))
+        except yaml.YAMLError:
+            metadata = None
+        if isinstance(metadata, dict):
+            return metadata, text[match.end():]
+    return None, text
+
+
+def detect_format(body: str) -> str:
+    """Format of a YAML page body: HTML if it opens with a tag, Markdown otherwise."""
+    return 'html' if body.lstrip().startswith('<') else 'markdown'
+
+
+class PageLoader:
+    """Parses page sources, each at most once until clear() is called."""
+
+    def __init__(self):
+        self._pages: Dict[Path, Page] = {}
+
+    def clear(self):
+        """Forget parsed pages, so sources edited since are read again."""
+        self._pages = {}
+
+    def load(self, source: Path, sidecar: Optional[Path] = None) -> Page:
+        """Parse a page source; sidecar is the YAML config next to a Markdown page, if any."""
+        page = self._pages.get(source)
+        if page is None:
+            page = self._pages[source] = self.parse(source, sidecar)
+        return page
+
+    def parse(self, source: Path, sidecar: Optional[Path] = None) -> Page:
+        text = source.read_text(encoding='utf-8')
+
+        if source.suffix == '.yaml':
+            data = parse_yaml(text) or {}
+            if not isinstance(data, dict):
+                raise ValueError(f"{source} must hold a YAML mapping")
+            metadata = dict(data)
+            body = metadata.pop('content', None) or ''
+            body_format = metadata.pop('format', None) or detect_format(body)
+            if body_format not in BODY_FORMATS:
+                raise ValueError(f"{source}: unknown format {body_format!r}")
+            return Page(source, metadata, body, body_format)
+
+        if source.suffix == '.html':
+            metadata, body, body_format = None, text, 'html'
+        else:
+            metadata, body = split_front_matter(text)
+            body_format = 'markdown'
+
+        if sidecar is not None:
+            # The YAML file next to the page wins over its front matter
+            config = parse_yaml(sidecar.read_text(encoding='utf-8')) or {}
+            if not isinstance(config, dict):
+                raise ValueError(f"{sidecar} must hold a YAML mapping")
+            metadata = {**(metadata or {}), **config}
+
+        if metadata is None:
+            metadata = {
+                'title': source.stem.replace('-', ' ').title(),
+                'description': DEFAULT_DESCRIPTION,
+                'keywords': list(DEFAULT_KEYWORDS),
+            }
+        return Page(source, metadata, body, body_format)
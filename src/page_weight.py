@@ -0,0 +1,148 @@
+"""
+Page weight budgets.
+Measures what every built page costs to load: HTML bytes, gzip-compressed
+bytes, the bytes of its inline <script> and <style> blocks, and the
+third-party scripts and stylesheets it pulls in. Budgets from config.py set
+limits by section or output path glob, and pages over a limit fail the build.
+"""
+
+import io
+import gzip
+import html
+from fnmatch import fnmatchcase
+from typing import Any, Dict, List, Optional
+
+from html_rewriter import HtmlTokenizer, StartTag
+from link_checker import EXTERNAL_RE
+from precompress import GZIP_LEVEL
+
+
+STATE_VERSION = 1
+
+# What a budget can limit; external_* limit the number of URLs
+METRICS = ['html_bytes', 'gzip_bytes', 'inline_script_bytes', 'inline_style_bytes',
+           'external_scripts', 'external_stylesheets']
+
+Measurement = Dict[str, Any]
+
+
+def measure_page(data: bytes) -> Measurement:
+    """Weight of a built page, from its bytes."""
+    inline = {'script': 0, 'style': 0}
+    scripts: List[str] = []
+    stylesheets: List[str] = []
+    open_inline = None
+    markup = data.decode('utf-8', errors='replace')
+    for kind, raw, name in HtmlTokenizer().tokens(io.StringIO(markup)):
+        if kind == 'start':
+            tag = StartTag(name, raw)
+            if name == 'script':
+                src = html.unescape(tag.get_attr('src') or '').strip()
+                if src:
+                    if EXTERNAL_RE.match(src):
+                        scripts.append(src)
+                else:
+                    open_inline = 'script'
+            elif name == 'style':
+                open_inline = 'style'
+            elif name == 'link' and 'stylesheet' in (tag.get_attr('rel') or '').lower().split():
+                href = html.unescape(tag.get_attr('href') or '').strip()
+                if EXTERNAL_RE.match(href):
+                    stylesheets.append(href)
+        elif kind == 'text' and open_inline:
+            inline[open_inline] += len(raw.encode('utf-8'))
+        elif kind == 'end' and name == open_inline:
+            open_inline = None
+    return {
+        'html_bytes': len(data),
+        'gzip_bytes': len(gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)),
+        'inline_script_bytes': inline['script'],
+        'inline_style_bytes': inline['style'],
+        'external_scripts': scripts,
+        'external_stylesheets': stylesheets,
+    }
+
+
+def matches(key: str, pattern: str) -> bool:
+    """Whether an output key falls under a budget pattern: a top-level section
+    (e.g. 'aws') or a glob over output paths (e.g. 'learn_concepts/*.html')."""
+    return key.startswith(pattern.rstrip('/') + '/') or fnmatchcase(key, pattern)
+
+
+class PageBudgets:
+    """Limits of every page, by section or output path glob.
+
+    Every matching entry applies, later entries overriding the limits of
+    earlier ones; a limit of None lifts it.
+    """
+
+    def __init__(self, budgets: Dict[str, Dict[str, Optional[int]]]):
+        unknown = {metric for limits in budgets.values() for metric in limits} - set(METRICS)
+        if unknown:
+            raise ValueError(f"Unknown page budget metrics: {', '.join(sorted(unknown))}")
+        self.budgets = budgets
+
+    def limits(self, key: str) -> Dict[str, int]:
+        limits: Dict[str, Optional[int]] = {}
+        for pattern, values in self.budgets.items():
+            if matches(key, pattern):
+                limits.update(values)
+        return {metric: limit for metric, limit in limits.items() if limit is not None}
+
+    def check(self, key: str, measurement: Measurement) -> List[Dict[str, Any]]:
+        """The limits a page exceeds, as {metric, value, limit}."""
+        limits = self.limits(key)
+        over = []
+        for metric in METRICS:
+            limit = limits.get(metric)
+            value = measurement[metric]
+            value = len(value) if isinstance(value, list) else value
+            if limit is not None and value > limit:
+                over.append({'metric': metric, 'value': value, 'limit': limit})
+        return over
+
+
+def weight_report(measurements: Dict[str, Measurement], budgets: PageBudgets, measured: int) -> Dict[str, Any]:
+    """Every page with its weight and exceeded limits, heaviest (gzip) first."""
+    pages = []
+    for key, measurement in measurements.items():
+        pages.append({'page': key, **measurement, 'over': budgets.check(key, measurement)})
+    pages.sort(key=lambda page: (-page['gzip_bytes'], page['page']))
+    return {
+        'pages': len(pages),
+        'measured': measured,
+        'over_budget': sum(1 for page in pages if page['over']),
+        'html_bytes': sum(page['html_bytes'] for page in pages),
+        'gzip_bytes': sum(page['gzip_bytes'] for page in pages),
+        'results': pages,
+    }
+
+
+def format_report(report: Dict[str, Any], top_n: Optional[int] = None) -> str:
+    """Render the report as a text table: pages over budget, then the heaviest
+    top_n pages (all of them if None)."""
+    header = (f"{'page':<60}{'html B':>10}{'gzip B':>9}{'script B':>10}{'style B':>9}"
+              f"{'ext js':>8}{'ext css':>8}")
+
+    def row(page: Dict[str, Any]) -> str:
+        return (f"{page['page'][-60:]:<60}{page['html_bytes']:>10}{page['gzip_bytes']:>9}"
+                f"{page['inline_script_bytes']:>10}{page['inline_style_bytes']:>9}"
+                f"{len(page['external_scripts']):>8}{len(page['external_stylesheets']):>8}")
+
+    lines = []
+    over = [page for page in report['results'] if page['over']]
+    if over:
+        lines.append('over budget')
+        lines.append(header)
+        for page in over:
+            lines.append(row(page))
+            for limit in page['over']:
+                lines.append(f"    {limit['metric']}: {limit['value']} > {limit['limit']}")
+        lines.append('')
+    lines.append('heaviest pages' if top_n is not None else 'pages')
+    lines.append(header)
+    lines.extend(row(page) for page in report['results'][:top_n])
+    lines.append('')
+    lines.append(f"{report['pages']} pages, {report['html_bytes']} B HTML, {report['gzip_bytes']} B gzip; "
+                 f"{report['over_budget']} over budget")
+    return '\n'.join(lines)
@@ -0,0 +1,73 @@
+"""
+Precache manifest for the offline service worker.
+Lists every cacheable output under its site URL with a hash of its content,
+split into the core shell (root pages and shared assets), cached when the
+service worker installs, and one group per top-level section, cached the first
+time a page of that section is opened. Hashes are kept in the build cache by
+file size and mtime, so only outputs written since the last build are read
+again; a deploy invalidates exactly the entries whose bytes changed.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Tuple
+
+from build_manifest import hash_bytes, hash_data
+
+
+# Hex digits of SHA-256 kept per entry; the service worker checks downloads against them
+HASH_LENGTH = 16
+
+CORE_GROUP = 'core'
+
+# Top-level directories whose files belong to the core shell, not to a section
+SHARED_DIRS = {'assets'}
+
+
+def precache_group(key: str) -> str:
+    """Group of an output key: its top-level section, or the core shell."""
+    head, slash, _ = key.partition('/')
+    return head if slash and head not in SHARED_DIRS else CORE_GROUP
+
+
+class PrecacheManifest:
+    """Content hashes of the outputs a service worker caches, grouped for lazy caching."""
+
+    def __init__(self, output_dir: Path, state_path: Path):
+        self.output_dir = output_dir
+        self.state_path = state_path
+
+    def build(self, keys: Iterable[str]) -> Tuple[Dict[str, Any], int]:
+        """The manifest of these output keys, and how many of them were read to hash."""
+        previous = {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        state = {}
+        groups: Dict[str, Dict[str, str]] = {}
+        hashed = 0
+        for key in sorted(keys):
+            output_file = self.output_dir / key
+            stat = output_file.stat()
+            entry = previous.get(key)
+            if not entry or entry[:2] != [stat.st_size, stat.st_mtime_ns]:
+                entry = [stat.st_size, stat.st_mtime_ns, hash_bytes(output_file.read_bytes())[:HASH_LENGTH]]
+                hashed += 1
+            state[key] = entry
+            groups.setdefault(precache_group(key), {})['/' + key] = entry[2]
+
+        if state != previous:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(state, separators=(',', ':'), sort_keys=True))
+
+        core = groups.pop(CORE_GROUP, {})
+        manifest = {
+            'version': hash_data([core, groups])[:HASH_LENGTH],
+            'core': core,
+            'groups': groups,
+        }
+        return manifest, hashed
@@ -0,0 +1,103 @@
+"""
+Precompressed siblings for text outputs.
+Writes page.html.gz (and page.html.zst when the zstandard package is installed)
+next to each output, so static servers and CDNs can send compressed bytes
+without compressing on every request.
+"""
+
+import os
+import gzip
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Sibling suffix per format, in the order servers should prefer them
+SIBLING_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+
+GZIP_LEVEL = 9
+ZSTD_LEVEL = 19
+
+
+def is_sibling(path: Path, originals: Iterable[Path]) -> bool:
+    """True if path is a compressed sibling of one of the original files."""
+    return path.suffix in SIBLING_SUFFIXES.values() and path.with_suffix('') in originals
+
+
+class Precompressor:
+    """Writes or removes the compressed siblings of one output file."""
+
+    def __init__(self, formats: Iterable[str], extensions: Iterable[str], min_size: int, max_ratio: float):
+        # zstd is optional: without the zstandard package only .gz files are written
+        self.formats = [fmt for fmt in SIBLING_SUFFIXES if fmt in formats and (fmt != 'zstd' or zstandard)]
+        self.extensions = set(extensions)
+        self.min_size = min_size
+        self.max_ratio = max_ratio
+        self.settings = {
+            'formats': self.formats,
+            'min_size': min_size,
+            'max_ratio': max_ratio,
+            'levels': {'gzip': GZIP_LEVEL, 'zstd': ZSTD_LEVEL},
+        }
+
+    def wants(self, output_file: Path) -> bool:
+        """True for text outputs that are worth precompressing."""
+        return output_file.suffix in self.extensions
+
+    def siblings(self, output_file: Path) -> Dict[str, Path]:
+        """Every possible compressed sibling of an output, by format."""
+        return {fmt: output_file.with_name(output_file.name + suffix) for fmt, suffix in SIBLING_SUFFIXES.items()}
+
+    def compress(self, data: bytes, fmt: str) -> bytes:
+        if fmt == 'zstd':
+            return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        # mtime=0 keeps the .gz bytes identical across builds
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+    def compress_file(self, output_file: Path) -> List[str]:
+        """Bring the siblings of output_file up to date. Returns the formats written.
+
+        Small files, and files that do not shrink below max_ratio, get no
+        sibling; an outdated one is removed.
+        """
+        data = output_file.read_bytes()
+        written = []
+        for fmt, sibling in self.siblings(output_file).items():
+            compressed = None
+            if fmt in self.formats and len(data) >= self.min_size:
+                compressed = self.compress(data, fmt)
+                if len(compressed) > len(data) * self.max_ratio:
+                    compressed = None
+
+            if compressed is None:
+                if sibling.exists():
+                    sibling.unlink()
+                continue
+
+            self._write(sibling, compressed, output_file)
+            written.append(fmt)
+        return written
+
+    def remove_siblings(self, output_file: Path):
+        """Delete the siblings of an output that no longer exists."""
+        for sibling in self.siblings(output_file).values():
+            if sibling.exists():
+                sibling.unlink()
+
+    def _write(self, sibling: Path, data: bytes, output_file: Path):
+        fd, tmp_name = tempfile.mkstemp(dir=sibling.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            shutil.copymode(output_file, tmp_name)
+            os.replace(tmp_name, sibling)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
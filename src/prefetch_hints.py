@@ -0,0 +1,163 @@
+"""
+Prefetch hints.
+Builds the site's link graph from the pages as they will be built (before any
+is rendered, so each page is written once) and ranks, for every page,
+the pages a reader is most likely to open next: a link counts for more in the
+main content than in the navigation or footer, and for more near the top of
+its region; a page many others link to ranks higher. The best targets become
+<link rel="prefetch"> hints (plus modulepreload for their module scripts),
+as long as they fit in a per-page budget of compressed bytes.
+"""
+
+import io
+import html
+import math
+import zlib
+import posixpath
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Set
+
+from html_rewriter import HtmlTokenizer, StartTag
+from link_checker import EXTERNAL_RE, resolve
+
+
+STATE_VERSION = 2
+
+# How much a link says about where the reader goes next, by the innermost
+# landmark it sits in; links outside any landmark count as 'body'
+REGION_WEIGHTS = {'main': 1.0, 'aside': 0.8, 'nav': 0.5, 'header': 0.5, 'body': 0.3, 'footer': 0.2}
+# A link's weight halves after this many earlier links in the same region
+POSITION_DECAY = 8
+
+HINT_RELS = {'prefetch', 'modulepreload'}
+
+Hint = Dict[str, str]
+
+
+def compressed_size(data: bytes) -> int:
+    """About what a gzip-serving host transfers for data."""
+    return len(zlib.compress(data, 6))
+
+
+def extract_page(markup: str) -> Dict[str, object]:
+    """Links, module scripts and compressed size of a page.
+
+    links maps each internal href (without fragment) to its summed
+    prominence, in document order. Hint tags and blank text are left out of
+    the size, which estimates what fetching the page costs.
+    """
+    links: Dict[str, float] = {}
+    modules: List[str] = []
+    counts: Dict[str, int] = defaultdict(int)
+    landmarks: List[str] = []
+    kept: List[str] = []
+    for kind, raw, name in HtmlTokenizer().tokens(io.StringIO(markup)):
+        if kind == 'start':
+            tag = StartTag(name, raw)
+            if name == 'link' and (tag.get_attr('rel') or '').strip().lower() in HINT_RELS:
+                continue
+            if name in REGION_WEIGHTS and name != 'body':
+                landmarks.append(name)
+            elif name in ('a', 'area'):
+                href = html.unescape(tag.get_attr('href') or '').strip().split('#', 1)[0]
+                if href and not EXTERNAL_RE.match(href) and tag.get_attr('download') is None:
+                    region = landmarks[-1] if landmarks else 'body'
+                    weight = REGION_WEIGHTS[region] / (1 + counts[region] / POSITION_DECAY)
+                    counts[region] += 1
+                    links[href] = links.get(href, 0) + weight
+            elif name == 'script' and (tag.get_attr('type') or '').strip().lower() == 'module':
+                src = html.unescape(tag.get_attr('src') or '').strip()
+                if src and not EXTERNAL_RE.match(src):
+                    modules.append(src)
+        elif kind == 'end' and name in landmarks:
+            while landmarks.pop() != name:
+                pass
+        elif kind == 'text' and not raw.strip():
+            # Including the whitespace around the hints
+            continue
+        kept.append(raw)
+    size = compressed_size(''.join(kept).encode('utf-8'))
+    return {'links': [[href, round(weight, 6)] for href, weight in links.items()], 'modules': modules, 'size': size}
+
+
+def page_target(page_key: str, href: str, pages: Set[str]) -> Optional[str]:
+    """The page an href leads to, the way a static host would serve it, if it is a built page."""
+    key, directory, _ = resolve(page_key, href)
+    if key is None:
+        return None
+    index = 'index.html' if key == '.' else f'{key}/index.html'
+    for candidate in [index] if directory else [key, index, f'{key}.html']:
+        if candidate in pages:
+            return candidate
+    return None
+
+
+class PrefetchPlanner:
+    """Picks the prefetch hints of every page from the site's link graph."""
+
+    def __init__(self, max_hints: int, budget: int):
+        self.max_hints = max_hints
+        self.budget = budget
+        self.settings = {'max_hints': max_hints, 'budget': budget}
+
+    def plan(self, pages: Dict[str, Dict[str, object]], targets: Set[str],
+             asset_size: Callable[[str], Optional[int]]) -> Dict[str, List[Hint]]:
+        """Hints of every page in targets.
+
+        pages holds the extract_page() result of every page, which are
+        all part of the graph; asset_size gives the compressed size of a
+        module script by output key (None if it doesn't exist).
+        """
+        keys = set(pages)
+        # Resolved targets of every page: {target: [prominence, href, weight of that href]}
+        graph: Dict[str, Dict[str, List]] = {}
+        in_degree: Dict[str, int] = defaultdict(int)
+        for key in sorted(pages):
+            edges: Dict[str, List] = {}
+            for href, weight in pages[key]['links']:
+                target = page_target(key, href, keys)
+                if target is None or target == key:
+                    continue
+                edge = edges.get(target)
+                if edge is None:
+                    edges[target] = [weight, href, weight]
+                    continue
+                edge[0] += weight
+                # Hint the href readers most likely follow, so the prefetched URL is the one they open
+                if weight > edge[2]:
+                    edge[1:] = [href, weight]
+            graph[key] = edges
+            for target in edges:
+                in_degree[target] += 1
+
+        top = math.log1p(max(in_degree.values(), default=0)) or 1.0
+        hints = {}
+        for key in sorted(targets & keys):
+            directory = posixpath.dirname(key)
+            loaded = {self.module_key(key, src) for src in pages[key]['modules']}
+            ranked = sorted(graph[key].items(),
+                            key=lambda item: (-item[1][0] * (1 + math.log1p(in_degree[item[0]]) / top), item[0]))
+            chosen: List[Hint] = []
+            spent = 0
+            for target, (_, href, _) in ranked:
+                if sum(hint['rel'] == 'prefetch' for hint in chosen) >= self.max_hints:
+                    break
+                modules = [module for module in (self.module_key(target, src) for src in pages[target]['modules'])
+                           if module is not None and module not in loaded]
+                sizes = [asset_size(module) for module in modules]
+                cost = pages[target]['size'] + sum(size for size in sizes if size is not None)
+                if spent + cost > self.budget:
+                    continue
+                spent += cost
+                chosen.append({'rel': 'prefetch', 'href': href})
+                for module, size in zip(modules, sizes):
+                    if size is not None:
+                        loaded.add(module)
+                        chosen.append({'rel': 'modulepreload', 'href': posixpath.relpath(module, directory or '.')})
+            hints[key] = chosen
+        return hints
+
+    @staticmethod
+    def module_key(page_key: str, src: str) -> Optional[str]:
+        """Output key of a module script as loaded by a page."""
+        return resolve(page_key, src)[0]
@@ -0,0 +1,225 @@
+"""
+Related pages.
+Every page becomes a TF-IDF vector of its most characteristic terms, using the
+search index's tokenization and saturated term weights, and its most similar
+pages are found with a sparse product of the vectors against all others, one
+batch of rows at a time. NumPy/SciPy do the product when they are installed;
+otherwise an inverted index computes the same scores in Python.
+
+Results are cached with the extracted terms of each source. When a few pages
+change, only their rows and the lists that pointed at them are recomputed; the
+lists of the other pages are patched with the changed pages' scores.
+"""
+
+import math
+from collections import Counter, defaultdict
+from itertools import chain
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+STATE_VERSION = 1
+
+# Terms kept per page in the cache; vectors use the best max_terms of these
+STORED_TERMS = 256
+# Terms on more than this share of pages say little and make the product dense
+MAX_DF_RATIO = 0.25
+# Pages a term can match, heaviest first; bounds the work per row on large sites
+MAX_POSTINGS = 128
+# Share of pages that may change before every list is recomputed, since
+# patched lists keep scores from before the document frequencies moved
+MAX_DRIFT = 0.1
+SCORE_DIGITS = 4
+# Sites above this size are slow to score without NumPy/SciPy
+PYTHON_SCORER_PAGES = 5000
+
+# Scorer named in the build log, by backend
+SCORER_NAMES = {'scipy': 'SciPy sparse scorer', 'python': 'pure-Python scorer'}
+
+Scores = List[Tuple[str, float]]
+
+
+def scipy_modules():
+    """(numpy, scipy.sparse), or (None, None) when they are not installed."""
+    try:
+        import numpy
+        from scipy import sparse
+    except ImportError:
+        return None, None
+    return numpy, sparse
+
+
+def stored_terms(terms: Dict[str, float]) -> Dict[str, float]:
+    """The heaviest terms of a page, which are all its vector can use, in term
+    order (the order they come back from the cache in, which breaks ties)."""
+    if len(terms) > STORED_TERMS:
+        ranked = sorted(terms.items(), key=lambda item: (-item[1], item[0]))
+        terms = dict(ranked[:STORED_TERMS])
+    return dict(sorted(terms.items()))
+
+
+class PythonScorer:
+    """Vectors as dicts and an inverted index of them, summed row by row."""
+
+    def __init__(self, documents: Dict[str, Dict[str, float]], max_terms: int):
+        count = len(documents)
+        df = Counter(term for terms in documents.values() for term in terms)
+        max_df = max(2, MAX_DF_RATIO * count)
+        idf = {term: math.log((1 + count) / (1 + n)) for term, n in df.items() if n <= max_df}
+
+        self.vectors: Dict[str, Dict[str, float]] = {}
+        postings: Dict[str, List[Tuple[float, str]]] = defaultdict(list)
+        for key in sorted(documents):
+            # Heaviest terms first; sorts are stable, so ties keep the page's term order
+            weights = sorted(((term, tf * idf[term]) for term, tf in documents[key].items()
+                              if term in idf and idf[term] > 0), key=lambda item: -item[1])[:max_terms]
+            norm = math.sqrt(sum(weight * weight for _, weight in weights))
+            vector = {term: weight / norm for term, weight in weights} if norm else {}
+            self.vectors[key] = vector
+            for term, weight in vector.items():
+                postings[term].append((key, weight))
+        # Pages are added in key order, so ties keep it
+        self.postings = {term: sorted(entries, key=lambda item: -item[1])[:MAX_POSTINGS]
+                         for term, entries in postings.items()}
+
+    def similar(self, rows: List[str], top_k: Optional[int], min_score: float) -> Dict[str, Scores]:
+        results = {}
+        for key in rows:
+            totals: Dict[str, float] = defaultdict(float)
+            for term, weight in self.vectors[key].items():
+                for other, other_weight in self.postings[term]:
+                    totals[other] += weight * other_weight
+            totals.pop(key, None)
+            ranked = sorted((-round(score, SCORE_DIGITS), other) for other, score in totals.items()
+                            if score >= min_score)
+            results[key] = [(other, -score) for score, other in ranked[:top_k]]
+        return results
+
+
+class SparseScorer:
+    """The same vectors as a CSR matrix, multiplied by its transpose in row batches."""
+
+    def __init__(self, documents: Dict[str, Dict[str, float]], max_terms: int, batch_size: int):
+        numpy, sparse = scipy_modules()
+        self.numpy = numpy
+        self.batch_size = batch_size
+        self.keys = sorted(documents)
+        self.position = {key: i for i, key in enumerate(self.keys)}
+        count = len(self.keys)
+
+        # Entries in page order, then each page's term order
+        terms = [documents[key] for key in self.keys]
+        vocabulary = {term: i for i, term in enumerate(set(chain.from_iterable(terms)))}
+        lengths = numpy.fromiter(map(len, terms), numpy.int64, count)
+        total = int(lengths.sum())
+        rows = numpy.repeat(numpy.arange(count), lengths)
+        columns = numpy.fromiter(map(vocabulary.__getitem__, chain.from_iterable(terms)), numpy.int64, total)
+        tf = numpy.fromiter(chain.from_iterable(page.values() for page in terms), numpy.float64, total)
+
+        df = numpy.bincount(columns, minlength=len(vocabulary))
+        idf = numpy.log((1 + count) / (1 + df))
+        idf[df > max(2, MAX_DF_RATIO * count)] = 0
+        weights = tf * idf[columns]
+        rows, columns, weights = self.top_per_group(rows, columns, weights, count, max_terms)
+        norms = numpy.sqrt(numpy.bincount(rows, weights * weights, minlength=count))
+        weights = weights / norms[rows]
+        shape = (count, max(1, len(vocabulary)))
+        self.matrix = sparse.csr_matrix((weights, (rows, columns)), shape=shape)
+
+        # Each term only matches its MAX_POSTINGS heaviest pages; entries are
+        # in page order here, so ties keep it
+        order = numpy.argsort(columns, kind='stable')
+        columns, rows, weights = self.top_per_group(columns[order], rows[order], weights[order],
+                                                    shape[1], MAX_POSTINGS)
+        self.transposed = sparse.csr_matrix((weights, (columns, rows)), shape=shape[::-1])
+
+    def top_per_group(self, groups, members, weights, group_count: int, limit: Optional[int]):
+        """Entries sorted by group, then weight (descending), keeping the first
+        limit of each group. Groups must already be contiguous; ties keep the
+        order entries came in."""
+        numpy = self.numpy
+        keep = weights > 0
+        groups, members, weights = groups[keep], members[keep], weights[keep]
+        # One stable sort on group and dense weight rank is much faster than lexsort
+        order = numpy.argsort(weights)
+        ranks = numpy.empty(len(weights), numpy.int64)
+        ranks[order] = numpy.concatenate(([0], numpy.cumsum(numpy.diff(weights[order]) != 0)))
+        levels = int(ranks.max(initial=0)) + 1
+        order = numpy.argsort(groups * levels + (levels - 1 - ranks), kind='stable')
+        groups, members, weights = groups[order], members[order], weights[order]
+        if limit is not None:
+            starts = numpy.searchsorted(groups, numpy.arange(group_count))
+            keep = numpy.arange(len(groups)) - starts[groups] < limit
+            groups, members, weights = groups[keep], members[keep], weights[keep]
+        return groups, members, weights
+
+    def similar(self, rows: List[str], top_k: Optional[int], min_score: float) -> Dict[str, Scores]:
+        numpy = self.numpy
+        results = {key: [] for key in rows}
+        for start in range(0, len(rows), self.batch_size):
+            batch = numpy.array([self.position[key] for key in rows[start:start + self.batch_size]], numpy.int64)
+            product = (self.matrix[batch] @ self.transposed).tocsr()
+            owners = numpy.repeat(numpy.arange(len(batch)), numpy.diff(product.indptr))
+            columns, scores = product.indices.astype(numpy.int64), product.data
+            keep = (columns != batch[owners]) & (scores >= min_score)
+            owners, columns = owners[keep], columns[keep]
+            scores = numpy.round(scores[keep], SCORE_DIGITS)
+            # Ties by page, as in PythonScorer
+            order = numpy.lexsort((columns, owners))
+            owners, columns, scores = self.top_per_group(owners[order], columns[order], scores[order],
+                                                         len(batch), top_k)
+            for owner, column, score in zip(owners.tolist(), columns.tolist(), scores.tolist()):
+                results[self.keys[batch[owner]]].append((self.keys[column], score))
+        return results
+
+
+class RelatedPages:
+    """Top-k similar pages of every page, updated incrementally between builds."""
+
+    def __init__(self, top_k: int, max_terms: int, min_score: float, batch_size: int = 512):
+        self.top_k = top_k
+        self.max_terms = max_terms
+        self.min_score = min_score
+        self.batch_size = batch_size
+        self.settings = {'top_k': top_k, 'max_terms': max_terms, 'min_score': min_score}
+        self.backend = 'scipy' if scipy_modules()[1] is not None else 'python'
+
+    def scorer(self, documents: Dict[str, Dict[str, float]]):
+        if self.backend == 'scipy':
+            return SparseScorer(documents, self.max_terms, self.batch_size)
+        return PythonScorer(documents, self.max_terms)
+
+    def update(self, documents: Dict[str, Dict[str, float]], changed: Set[str],
+               previous: Optional[Dict[str, Any]]) -> Tuple[Dict[str, Scores], int, int]:
+        """Related pages of every document, given the previous results.
+
+        documents maps page keys to their stored terms and changed holds the
+        pages whose terms differ from the previous build (new pages included).
+        Returns the results, how many rows were recomputed and the drift to
+        keep for the next build.
+        """
+        keys = sorted(documents)
+        cached = (previous or {}).get('related', {})
+        removed = set(cached) - set(documents)
+        drift = (previous or {}).get('drift', 0) + len(changed) + len(removed)
+        if previous is not None and not changed and not removed:
+            return {key: [tuple(entry) for entry in cached[key]] for key in keys}, 0, drift
+
+        scorer = self.scorer(documents)
+        if previous is None or drift > MAX_DRIFT * len(keys):
+            return scorer.similar(keys, self.top_k, self.min_score), len(keys), 0
+
+        # Lists that lost an entry are recomputed, the others gain the changed
+        # pages' scores, which come from those pages' own (untruncated) rows
+        touched = changed | removed
+        stale = [key for key in keys if key in changed or key not in cached
+                 or any(other in touched for other, _ in cached[key])]
+        results = scorer.similar(stale, self.top_k, self.min_score)
+        extra: Dict[str, Scores] = defaultdict(list)
+        for key, scores in scorer.similar(sorted(changed), None, self.min_score).items():
+            for other, score in scores:
+                extra[other].append((key, score))
+        for key in keys:
+            if key not in results:
+                candidates = [tuple(entry) for entry in cached[key]] + extra.get(key, [])
+                results[key] = sorted(candidates, key=lambda item: (-item[1], item[0]))[:self.top_k]
+        return results, len(stale), drift
@@ -0,0 +1,205 @@
+/*
+ * Client-side search over the prebuilt index in /search/ (see src/search_index.py).
+ * Fetches index.json once, then only the term shards and document tables a
+ * query touches. Binds to any [data-search] element holding an input and a list.
+ */
+(function () {
+    'use strict';
+
+    // Must match search_index.py
+    var TERM_RE = /[a-z0-9]+/g;
+    var MIN_TERM_LENGTH = 2;
+    var MAX_TERM_LENGTH = 24;
+    var STOP_WORDS = {};
+    ('a an and are as at be been but by can do does for from had has have how if in into is it its ' +
+     'may more most not of on or our so such than that the their them then there these they this ' +
+     'to was we were what when where which while who why will with you your').split(' ').forEach(function (word) {
+        STOP_WORDS[word] = true;
+    });
+
+    // Prefix matching for the word being typed, limited to keep payloads small
+    var MIN_PREFIX_LENGTH = 3;
+    var MAX_PREFIX_SHARDS = 4;
+    var MAX_RESULTS = 10;
+
+    var script = document.currentScript;
+    var base = new URL('../search/', script ? script.src : window.location.href);
+    var cache = {};
+
+    function fetchJson(name) {
+        if (!cache[name]) {
+            cache[name] = fetch(new URL(name, base)).then(function (response) {
+                if (!response.ok) {
+                    throw new Error('Search index unavailable: ' + name);
+                }
+                return response.json();
+            });
+        }
+        return cache[name];
+    }
+
+    function tokenize(text) {
+        return (text.toLowerCase().match(TERM_RE) || []).filter(function (term) {
+            return term.length >= MIN_TERM_LENGTH && term.length <= MAX_TERM_LENGTH && !STOP_WORDS[term];
+        });
+    }
+
+    // Shards are [boundary, hash] sorted by boundary; a term lives in the last
+    // shard whose boundary sorts at or before it
+    function shardIndex(index, term) {
+        var low = 0;
+        var high = index.shards.length - 1;
+        var found = -1;
+        while (low <= high) {
+            var mid = (low + high) >> 1;
+            if (index.shards[mid][0] <= term) {
+                found = mid;
+                low = mid + 1;
+            } else {
+                high = mid - 1;
+            }
+        }
+        return found;
+    }
+
+    function shardFile(index, i) {
+        var shard = index.shards[i];
+        return 'terms-' + (shard[0] || '_') + '.' + shard[1] + '.json';
+    }
+
+    // Shards needed for a term; a prefix term may continue into the following shards
+    function shardsFor(index, term, prefix) {
+        var first = shardIndex(index, term);
+        var shards = first >= 0 ? [first] : [];
+        if (prefix) {
+            for (var i = first + 1; i < index.shards.length && shards.length < MAX_PREFIX_SHARDS; i++) {
+                if (index.shards[i][0].indexOf(term) !== 0) {
+                    break;
+                }
+                shards.push(i);
+            }
+        }
+        return shards;
+    }
+
+    function idf(count, df) {
+        return Math.log(1 + (count - df + 0.5) / (df + 0.5));
+    }
+
+    // Add one posting list ([df, gap, weight, gap, weight, ...]) to the scores
+    function addPostings(index, postings, termIndex, scores) {
+        var weight = idf(index.count, postings[0]);
+        var id = 0;
+        for (var i = 1; i < postings.length; i += 2) {
+            id += postings[i];
+            var entry = scores[id] || (scores[id] = {score: 0, matched: {}});
+            entry.score += postings[i + 1] * weight;
+            entry.matched[termIndex] = true;
+        }
+    }
+
+    function search(query) {
+        var terms = tokenize(query);
+        if (!terms.length) {
+            return Promise.resolve([]);
+        }
+        var typing = !/\s$/.test(query);
+
+        return fetchJson('index.json').then(function (index) {
+            var needed = {};
+            terms.forEach(function (term, i) {
+                var prefix = typing && i === terms.length - 1 && term.length >= MIN_PREFIX_LENGTH;
+                shardsFor(index, term, prefix).forEach(function (key) { needed[key] = true; });
+            });
+            var keys = Object.keys(needed);
+            return Promise.all(keys.map(function (key) { return fetchJson(shardFile(index, key)); }))
+                .then(function (shards) {
+                    var scores = {};
+                    terms.forEach(function (term, i) {
+                        var prefix = typing && i === terms.length - 1 && term.length >= MIN_PREFIX_LENGTH;
+                        shards.forEach(function (shard) {
+                            Object.keys(shard).forEach(function (candidate) {
+                                if (candidate === term || (prefix && candidate.indexOf(term) === 0)) {
+                                    addPostings(index, shard[candidate], i, scores);
+                                }
+                            });
+                        });
+                    });
+                    return rank(index, scores, terms.length);
+                });
+        });
+    }
+
+    // Pages matching every term first, then by score; titles come from the doc tables
+    function rank(index, scores, termCount) {
+        var ids = Object.keys(scores).map(Number).sort(function (a, b) {
+            var matchedA = Object.keys(scores[a].matched).length;
+            var matchedB = Object.keys(scores[b].matched).length;
+            return (matchedB - matchedA) || (scores[b].score - scores[a].score) || (a - b);
+        }).slice(0, MAX_RESULTS);
+
+        var tables = {};
+        ids.forEach(function (id) { tables[Math.floor(id / index.chunk)] = true; });
+        var chunks = Object.keys(tables).map(Number);
+        return Promise.all(chunks.map(function (chunk) {
+            return fetchJson('docs-' + chunk + '.' + index.docs[chunk] + '.json');
+        })).then(function (loaded) {
+            var rows = {};
+            chunks.forEach(function (chunk, i) { rows[chunk] = loaded[i]; });
+            return ids.map(function (id) {
+                var row = rows[Math.floor(id / index.chunk)][id % index.chunk];
+                return row && {
+                    url: new URL('../' + row[0], base).pathname,
+                    title: row[1] || row[0],
+                    complete: Object.keys(scores[id].matched).length === termCount
+                };
+            }).filter(Boolean);
+        });
+    }
+
+    function bind(container) {
+        var input = container.querySelector('input');
+        var list = container.querySelector('[data-search-results]');
+        if (!input || !list) {
+            return;
+        }
+        var latest = 0;
+
+        function render(results) {
+            list.textContent = '';
+            results.forEach(function (result) {
+                var item = document.createElement('li');
+                var link = document.createElement('a');
+                link.href = result.url;
+                link.className = 'block px-3 py-2 text-gray-700 hover:bg-slate-100';
+                link.textContent = result.title;
+                item.appendChild(link);
+                list.appendChild(item);
+            });
+            list.hidden = results.length === 0;
+        }
+
+        input.addEventListener('input', function () {
+            var request = ++latest;
+            search(input.value).then(function (results) {
+                // Ignore answers to queries the user has already typed past
+                if (request === latest) {
+                    render(results);
+                }
+            }).catch(function () {
+                render([]);
+            });
+        });
+        input.addEventListener('keydown', function (event) {
+            if (event.key === 'Escape') {
+                input.value = '';
+                render([]);
+            }
+        });
+    }
+
+    window.SiteSearch = {search: search};
+    document.addEventListener('DOMContentLoaded', function () {
+        Array.prototype.forEach.call(document.querySelectorAll('[data-search]'), bind);
+    });
+})();
@@ -0,0 +1,244 @@
+"""
+Prebuilt client-side search index.
+Extracts the title, headings and body text of every built page and writes a
+compact inverted index under search/: posting lists are delta-encoded and
+split into term shards by prefix, and document titles live in small fixed-size
+tables, so the browser only downloads the pieces a query needs (see search.js).
+"""
+
+import io
+import re
+import json
+import html
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from html_rewriter import HtmlTokenizer
+from build_manifest import hash_bytes
+
+
+SEARCH_DIR = 'search'
+INDEX_VERSION = 1
+
+# Must match tokenize() in search.js
+TERM_RE = re.compile(r'[a-z0-9]+')
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 24
+
+STOP_WORDS = frozenset('''
+    a an and are as at be been but by can do does for from had has have how if in into is it its
+    may more most not of on or our so such than that the their them then there these they this
+    to was we were what when where which while who why will with you your
+'''.split())
+
+# Text in these elements is site chrome or code, not page content
+SKIPPED_ELEMENTS = {'script', 'style', 'noscript', 'template', 'svg', 'header', 'footer', 'nav', 'aside'}
+HEADING_ELEMENTS = {'h1', 'h2', 'h3'}
+
+# Term frequency multiplier per field
+FIELD_WEIGHTS = {'title': 8, 'heading': 3, 'body': 1}
+
+# BM25-style saturation, normalized against a fixed document length so a
+# page's weights never depend on the rest of the site
+K1 = 1.2
+B = 0.5
+REFERENCE_LENGTH = 800
+MAX_WEIGHT = 99
+
+MAX_TITLE_LENGTH = 120
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase index terms in text, without stop words."""
+    return [term for term in TERM_RE.findall(text.lower())
+            if MIN_TERM_LENGTH <= len(term) <= MAX_TERM_LENGTH and term not in STOP_WORDS]
+
+
+def extract_document(markup: str) -> Optional[Dict[str, Any]]:
+    """Title and weighted terms of a page, or None if it asks not to be indexed."""
+    title_parts: List[str] = []
+    heading_parts: List[str] = []
+    body_parts: List[str] = []
+    skip_depth = 0
+    in_title = False
+    heading_depth = 0
+    in_main = False
+    saw_main = False
+    main_parts: List[str] = []
+
+    for kind, raw, name in HtmlTokenizer().tokens(io.StringIO(markup)):
+        if kind == 'start':
+            if name == 'meta' and re.search(r'name\s*=\s*["\']?robots', raw, re.IGNORECASE) and 'noindex' in raw.lower():
+                return None
+            if raw.endswith('/>'):
+                continue
+            if name in SKIPPED_ELEMENTS:
+                skip_depth += 1
+            elif name == 'title':
+                in_title = True
+            elif name in HEADING_ELEMENTS:
+                heading_depth += 1
+            elif name == 'main':
+                in_main = saw_main = True
+        elif kind == 'end':
+            if name in SKIPPED_ELEMENTS:
+                skip_depth = max(0, skip_depth - 1)
+            elif name == 'title':
+                in_title = False
+            elif name in HEADING_ELEMENTS:
+                heading_depth = max(0, heading_depth - 1)
+            elif name == 'main':
+                in_main = False
+        elif kind == 'text':
+            text = html.unescape(raw)
+            if in_title:
+                title_parts.append(text)
+            elif skip_depth:
+                continue
+            elif heading_depth:
+                heading_parts.append(text)
+            else:
+                (main_parts if in_main else body_parts).append(text)
+
+    # Prefer <main> when the page has one; the rest is usually navigation.
+    # Parts are joined with spaces, so every tag boundary also ends a word
+    if saw_main:
+        body_parts = main_parts
+    title = ' '.join(''.join(title_parts).split())
+    counts: Dict[str, float] = defaultdict(float)
+    length = 0
+    for field, parts in [('title', title_parts), ('heading', heading_parts), ('body', body_parts)]:
+        terms = tokenize(' '.join(parts))
+        length += len(terms)
+        for term in terms:
+            counts[term] += FIELD_WEIGHTS[field]
+
+    norm = 1 - B + B * length / REFERENCE_LENGTH
+    terms = {}
+    for term, tf in counts.items():
+        saturated = tf * (K1 + 1) / (tf + K1 * norm)
+        terms[term] = max(1, min(MAX_WEIGHT, round(saturated / (K1 + 1) * MAX_WEIGHT)))
+    return {'title': title[:MAX_TITLE_LENGTH], 'terms': terms}
+
+
+def assign_ids(urls: List[str], previous: Dict[str, int]) -> Dict[str, int]:
+    """Document ids that stay put across builds; new pages reuse freed ids first.
+
+    Stable ids keep unrelated shards byte-identical when one page changes.
+    """
+    ids = {url: previous[url] for url in urls if url in previous}
+    used = set(ids.values())
+    free = (candidate for candidate in range(len(urls) + len(used) + 1) if candidate not in used)
+    for url in sorted(urls):
+        if url not in ids:
+            ids[url] = next(free)
+    return ids
+
+
+class SearchIndex:
+    """Builds the sharded index files from extracted documents."""
+
+    def __init__(self, shard_bytes: int = 16384, doc_chunk: int = 64, max_postings: int = 2000):
+        self.shard_bytes = shard_bytes
+        self.doc_chunk = doc_chunk
+        self.max_postings = max_postings
+        self.settings = {
+            'version': INDEX_VERSION,
+            'shard_bytes': shard_bytes,
+            'doc_chunk': doc_chunk,
+            'max_postings': max_postings,
+        }
+
+    def postings(self, documents: Dict[int, Dict[str, Any]]) -> Dict[str, List[int]]:
+        """term -> [document frequency, id gap, weight, id gap, weight, ...].
+
+        Very common terms keep only their max_postings best-weighted documents;
+        the frequency still counts all of them, for ranking.
+        """
+        by_term: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        for doc_id in sorted(documents):
+            for term, weight in documents[doc_id]['terms'].items():
+                by_term[term].append((doc_id, weight))
+
+        encoded = {}
+        for term, entries in by_term.items():
+            df = len(entries)
+            if df > self.max_postings:
+                entries = sorted(sorted(entries, key=lambda entry: -entry[1])[:self.max_postings])
+            values = [df]
+            previous_id = 0
+            for doc_id, weight in entries:
+                values += [doc_id - previous_id, weight]
+                previous_id = doc_id
+            encoded[term] = values
+        return encoded
+
+    def shard(self, encoded: Dict[str, List[int]]) -> List[Tuple[str, List[str]]]:
+        """Split the sorted terms into shards of about shard_bytes each.
+
+        An oversized prefix is split by its next character, then neighbouring
+        small pieces of that prefix are packed back together, so a shard covers
+        a contiguous run of terms starting at its boundary (its first prefix).
+        Boundaries only move where the terms under one prefix changed.
+        """
+        sizes = {term: len(term) + len(json.dumps(values, separators=(',', ':'))) + 4
+                 for term, values in encoded.items()}
+
+        def split(prefix: str, terms: List[str]) -> List[Tuple[str, List[str], int]]:
+            size = sum(sizes[term] for term in terms)
+            if size <= self.shard_bytes or all(len(term) <= len(prefix) for term in terms):
+                return [(prefix, terms, size)]
+            groups: Dict[str, List[str]] = defaultdict(list)
+            for term in terms:
+                groups[term[:len(prefix) + 1]].append(term)
+            pieces = []
+            # The term equal to prefix, if any, sorts first and stays in its own group
+            for key in sorted(groups):
+                if key == prefix:
+                    pieces.append((prefix, groups[key], sum(sizes[term] for term in groups[key])))
+                else:
+                    pieces.extend(split(key, groups[key]))
+            packed = []
+            for piece in pieces:
+                if packed and packed[-1][2] + piece[2] <= self.shard_bytes:
+                    boundary, packed_terms, packed_size = packed[-1]
+                    packed[-1] = (boundary, packed_terms + piece[1], packed_size + piece[2])
+                else:
+                    packed.append(piece)
+            return packed
+
+        return [(boundary, terms) for boundary, terms, _ in split('', sorted(encoded))]
+
+    def build(self, documents: Dict[str, Dict[str, Any]], ids: Dict[str, int]) -> Dict[str, str]:
+        """Index files keyed by path under search/. Shard and table names carry a
+        content hash; index.json, which lists them, is the only unhashed file."""
+        by_id = {ids[url]: doc for url, doc in documents.items()}
+        files = {}
+
+        def add(stem: str, data: Any) -> str:
+            text = json.dumps(data, separators=(',', ':'), ensure_ascii=False)
+            digest = hash_bytes(text.encode('utf-8'))[:8]
+            files[f'{stem}.{digest}.json'] = text
+            return digest
+
+        encoded = self.postings(by_id)
+        shards = [[boundary, add(f'terms-{boundary or "_"}', {term: encoded[term] for term in terms})]
+                  for boundary, terms in self.shard(encoded)]
+
+        # [url, title] per id; freed ids are 0
+        id_count = max(ids.values(), default=-1) + 1
+        urls = {doc_id: url for url, doc_id in ids.items()}
+        tables = []
+        for start in range(0, id_count, self.doc_chunk):
+            rows = [[urls[doc_id], by_id[doc_id]['title']] if doc_id in by_id else 0
+                    for doc_id in range(start, min(start + self.doc_chunk, id_count))]
+            tables.append(add(f'docs-{start // self.doc_chunk}', rows))
+
+        files['index.json'] = json.dumps({
+            'version': INDEX_VERSION,
+            'count': len(documents),
+            'chunk': self.doc_chunk,
+            'docs': tables,
+            'shards': shards,
+        }, separators=(',', ':'), sort_keys=True)
+        return files
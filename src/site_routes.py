@@ -0,0 +1,232 @@
+"""
+Site route table.
+One pass over the source tree maps every page source to its output path,
+canonical URL, directory depth, section and breadcrumbs. Rendered and
+post-processed pages both take their navigation links and branding from here,
+so the two can't drift apart.
+"""
+
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Top-level sections and their branding; anything else is branded as the root
+SECTIONS = {
+    'aws': {'brand_text': 'AWS', 'brand_gradient': 'gradient-aws', 'section_color': '#FF9900'},
+    'gcp': {'brand_text': 'GCP', 'brand_gradient': 'gradient-gcp', 'section_color': '#4285F4'},
+    'azure': {'brand_text': 'Azure', 'brand_gradient': 'gradient-azure', 'section_color': '#0078D4'},
+    'databricks': {'brand_text': 'Databricks', 'brand_gradient': 'gradient-databricks', 'section_color': '#FF3621'},
+    'sql': {'brand_text': 'SQL', 'brand_gradient': 'gradient-sql', 'section_color': '#336791'},
+    'learn_concepts': {'brand_text': 'Learn', 'brand_gradient': 'gradient-learn', 'section_color': '#10B981'},
+}
+ROOT_BRANDING = {'brand_text': 'Home', 'brand_gradient': 'gradient-text', 'section_color': '#58508d'}
+
+# Header navigation, relative to the site root
+NAV_LINKS = {
+    'aws_link': 'aws/',
+    'gcp_link': 'gcp/',
+    'azure_link': 'azure/',
+    'databricks_link': 'databricks/',
+    'sql_link': 'sql/',
+    'case_studies_link': 'case_studies.html',
+    'learn_concepts_link': 'learn_concepts/',
+    'about_link': 'aboutme.html',
+}
+
+# Source directory of the pages at the site root
+ROOT_SECTION = 'pages'
+
+# Source directories that hold build inputs rather than pages
+EXCLUDED_PARTS = {'templates', 'components', 'src', 'venv'}
+
+# Copied verbatim with its own static files, HTML post-processed
+COPIED_SECTION = 'learn_concepts'
+
+PAGE_SUFFIXES = {'.md', '.yaml', '.html'}
+
+
+def canonical_url(key: str) -> str:
+    """Site-root URL of an output: directory URLs for index pages, the file otherwise."""
+    if key == 'index.html':
+        return '/'
+    if key.endswith('/index.html'):
+        return '/' + key[:-len('index.html')]
+    return '/' + key
+
+
+class Route(NamedTuple):
+    source: Path
+    output: Path
+    # Output path relative to the output directory
+    key: str
+    # 'page' (rendered from Markdown/YAML), 'post_process' (copied HTML with the
+    # site's header and footer) or 'copy' (copied verbatim)
+    kind: str
+    section: Optional[str]
+    depth: int
+    canonical_url: str
+    breadcrumbs: List[Dict[str, str]]
+
+
+class SiteRoutes:
+    """Route of every page source, built once per build and looked up by source or output."""
+
+    def __init__(self, source_dir: Path, output_dir: Path):
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.routes: Dict[Path, Optional[Route]] = {}
+        self.by_output: Dict[str, Route] = {}
+        self._navigation: Dict[Tuple[Optional[str], int], Dict[str, str]] = {}
+
+    def scan(self):
+        """Route every page source under the source directory."""
+        self.routes = {}
+        self.by_output = {}
+        for path in sorted(self.source_dir.rglob('*')):
+            if path.suffix in PAGE_SUFFIXES and path.is_file():
+                self.route(path)
+
+    def route(self, source: Path) -> Optional[Route]:
+        """Route of a source file, or None if it isn't a page.
+
+        A route depends only on the path, so files added after the scan are
+        resolved on first use and never go stale.
+        """
+        if source not in self.routes:
+            route = self.routes[source] = self.resolve(source)
+            if route is not None:
+                self.by_output[route.key] = route
+        return self.routes[source]
+
+    def resolve(self, source: Path) -> Optional[Route]:
+        rel_path = source.relative_to(self.source_dir)
+        parts = rel_path.parts
+        if source.suffix not in PAGE_SUFFIXES or EXCLUDED_PARTS.intersection(parts):
+            return None
+
+        if parts[0] == COPIED_SECTION:
+            if source.suffix != '.html':
+                # Markdown notes in learn_concepts are copied as static files
+                return None
+            key, kind = rel_path.as_posix(), 'post_process'
+        elif source.suffix == '.html':
+            if parts[0] == ROOT_SECTION:
+                if source.name == 'index.html':
+                    # The root index page is rendered from pages/index.yaml
+                    return None
+                rel_path = rel_path.relative_to(ROOT_SECTION)
+            key = rel_path.as_posix()
+            # The root index page is copied as-is
+            kind = 'copy' if key == 'index.html' else 'post_process'
+        elif parts[0] == ROOT_SECTION and source.stem == 'index':
+            key, kind = 'index.html', 'page'
+        else:
+            key, kind = rel_path.with_suffix('.html').as_posix(), 'page'
+
+        section, depth = self.placement(key)
+        return Route(
+            source=source,
+            output=self.output_dir / key,
+            key=key,
+            kind=kind,
+            section=section,
+            depth=depth,
+            canonical_url=canonical_url(key),
+            breadcrumbs=self.breadcrumbs(key),
+        )
+
+    def placement(self, key: str) -> Tuple[Optional[str], int]:
+        """Section and directory depth of an output path."""
+        output_parts = key.split('/')
+        return (output_parts[0] if output_parts[0] in SECTIONS else None), len(output_parts) - 1
+
+    def breadcrumbs(self, key: str) -> List[Dict[str, str]]:
+        """Home, then every section directory the output sits in."""
+        output_parts = key.split('/')
+        depth = len(output_parts) - 1
+        crumbs = [{'text': 'Home', 'url': '../' * depth or './'}]
+        for i, part in enumerate(output_parts[:-1]):
+            if part in SECTIONS:
+                crumbs.append({'text': SECTIONS[part]['brand_text'], 'url': '../' * (depth - i) + part + '/'})
+        return crumbs
+
+    def sidecar(self, source: Path) -> Optional[Path]:
+        """The YAML config next to a Markdown page, if there is one."""
+        if source.suffix != '.md':
+            return None
+        config = source.with_suffix('.yaml')
+        if config not in self.routes and not config.is_file():
+            return None
+        return config if self.route(config) is not None else None
+
+    def select(self, sections: Iterable[str] = (), patterns: Iterable[str] = (),
+               files: Iterable[Path] = ()) -> List[Path]:
+        """Source files picked by top-level section, glob pattern or path.
+
+        Patterns are matched against the path relative to the source directory
+        and against the output path, and only the directory named by a
+        pattern's literal prefix is walked. Raises ValueError for a section or
+        file outside the source tree.
+        """
+        selected: Set[Path] = set()
+        for section in sections:
+            directory = self.source_dir / section
+            if not section or '/' in section or not directory.is_dir():
+                raise ValueError(f"No section {section!r} in {self.source_dir}")
+            selected.update(path for path in directory.rglob('*') if path.is_file())
+
+        for pattern in patterns:
+            pattern = pattern.strip('/')
+            literal = []
+            for part in pattern.split('/'):
+                if any(char in part for char in '*?['):
+                    break
+                literal.append(part)
+            base = self.source_dir.joinpath(*literal)
+            if base.is_file():
+                base = base.parent
+            if not base.is_dir():
+                # The prefix may be an output path (pages/ is published at the root)
+                base = self.source_dir
+            for path in base.rglob('*'):
+                if not path.is_file():
+                    continue
+                route = self.route(path)
+                if fnmatchcase(path.relative_to(self.source_dir).as_posix(), pattern) or \
+                   (route is not None and fnmatchcase(route.key, pattern)):
+                    selected.add(path)
+
+        for path in files:
+            path = Path(path).resolve()
+            if self.source_dir != path and self.source_dir not in path.parents:
+                raise ValueError(f"{path} is not under {self.source_dir}")
+            if path.is_dir():
+                selected.update(child for child in path.rglob('*') if child.is_file())
+            elif path.is_file():
+                selected.add(path)
+            else:
+                raise ValueError(f"No such file: {path}")
+        return sorted(selected)
+
+    def pages(self) -> List[Route]:
+        """Routes of the pages rendered from Markdown/YAML."""
+        return [route for route in self.routes.values() if route is not None and route.kind == 'page']
+
+    def copied_html(self) -> List[Route]:
+        """Routes of HTML sources copied outside learn_concepts."""
+        return [route for route in self.routes.values() if route is not None and route.kind != 'page'
+                and route.source.relative_to(self.source_dir).parts[0] != COPIED_SECTION]
+
+    def navigation(self, section: Optional[str], depth: int) -> Dict[str, str]:
+        """Header/footer context of a page: navigation links relative to its
+        directory, the section's branding and the section itself."""
+        key = (section, depth)
+        if key not in self._navigation:
+            prefix = '../' * depth
+            context = {'home_link': prefix or './'}
+            context.update({name: prefix + target for name, target in NAV_LINKS.items()})
+            context.update(SECTIONS.get(section, ROOT_BRANDING))
+            context['section'] = section
+            self._navigation[key] = context
+        return dict(self._navigation[key])
@@ -0,0 +1,147 @@
+"""
+Streamed sitemap generation.
+Entries are written straight to disk; a site past the protocol limits
+(50,000 URLs or 50 MB per file) gets a sitemap index pointing at numbered
+child sitemaps. lastmod comes from the page's content history, not the build
+time, so crawlers only revisit pages that really changed.
+"""
+
+import subprocess
+from html import escape
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from output_writer import OutputWriter
+from site_routes import canonical_url
+
+
+# Sitemap protocol limits per file
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+URLSET_OPEN = '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = '</urlset>\n'
+INDEX_OPEN = '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = '</sitemapindex>\n'
+
+
+def git_dates(root: Path, paths: Iterable[Path]) -> Dict[Path, str]:
+    """Date (YYYY-MM-DD) of the last commit of each path, for the paths git
+    tracks and that have no uncommitted changes.
+
+    Empty outside a git work tree or without git. One git log covers all paths.
+    """
+    names = {}
+    for path in paths:
+        try:
+            names[path.relative_to(root).as_posix()] = path
+        except ValueError:
+            pass
+    if not names:
+        return {}
+    git = ['git', '-c', 'core.quotePath=false', '-C', str(root)]
+    try:
+        edited = subprocess.run(git + ['diff', '--name-only', '--relative', 'HEAD', '--', *sorted(names)],
+                                capture_output=True, text=True, check=True).stdout.splitlines()
+        log = subprocess.run(git + ['log', '--format=%x00%cI', '--name-only', '--relative', '--', *sorted(names)],
+                             capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    dates = {}
+    date = None
+    for line in log.splitlines():
+        if line.startswith('\0'):
+            date = line[1:11]
+        elif line and date and line in names and line not in edited:
+            # Newest commit first
+            dates.setdefault(names[line], date)
+    return dates
+
+
+def url_entry(loc: str, lastmod: str, priority: str) -> str:
+    return (
+        f'  <url>\n'
+        f'    <loc>{escape(loc, quote=False)}</loc>\n'
+        f'    <lastmod>{lastmod}</lastmod>\n'
+        f'    <changefreq>weekly</changefreq>\n'
+        f'    <priority>{priority}</priority>\n'
+        f'  </url>\n'
+    )
+
+
+class SitemapWriter:
+    """Writes sitemap.xml, splitting into an index and child sitemaps when needed."""
+
+    def __init__(self, output_dir: Path, base_url: str, writer: OutputWriter,
+                 max_urls: int = MAX_URLS, max_bytes: int = MAX_BYTES):
+        self.output_dir = output_dir
+        self.base_url = base_url.rstrip('/')
+        self.writer = writer
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+
+    def entries(self, pages: Iterable[Tuple[str, str]]) -> Iterator[Tuple[str, str]]:
+        """(XML, lastmod) per (output key, lastmod), in the order given."""
+        for key, lastmod in pages:
+            path = canonical_url(key)
+            yield url_entry(self.base_url + path, lastmod, '0.8' if path == '/' else '0.6'), lastmod
+
+    def partition(self, pages: List[Tuple[str, str]]) -> List[Tuple[int, int, str]]:
+        """Split pages into (start, end, latest lastmod) runs that fit in one file each."""
+        overhead = len((XML_HEADER + URLSET_OPEN + URLSET_CLOSE).encode('utf-8'))
+        parts = []
+        start, size, latest = 0, overhead, ''
+        for i, (entry, lastmod) in enumerate(self.entries(pages)):
+            entry_size = len(entry.encode('utf-8'))
+            if i > start and (i - start >= self.max_urls or size + entry_size > self.max_bytes):
+                parts.append((start, i, latest))
+                start, size, latest = i, overhead, ''
+            size += entry_size
+            latest = max(latest, lastmod)
+        parts.append((start, len(pages), latest))
+        return parts
+
+    def urlset(self, pages: List[Tuple[str, str]]) -> Iterator[str]:
+        yield XML_HEADER + URLSET_OPEN
+        for entry, _ in self.entries(pages):
+            yield entry
+        yield URLSET_CLOSE
+
+    def index(self, children: List[Tuple[str, str]]) -> Iterator[str]:
+        yield XML_HEADER + INDEX_OPEN
+        for name, lastmod in children:
+            yield (
+                f'  <sitemap>\n'
+                f'    <loc>{escape(self.base_url + "/" + name, quote=False)}</loc>\n'
+                f'    <lastmod>{lastmod}</lastmod>\n'
+                f'  </sitemap>\n'
+            )
+        yield INDEX_CLOSE
+
+    def write(self, pages: List[Tuple[str, str]]) -> Tuple[List[Path], int]:
+        """Write the sitemap for (output key, lastmod) pages.
+
+        Returns the files that make up the sitemap, sitemap.xml first, and how
+        many of them were rewritten.
+        """
+        parts = self.partition(pages)
+        sitemap = self.output_dir / 'sitemap.xml'
+        if len(parts) == 1:
+            return [sitemap], int(self.writer.write_chunks(sitemap, self.urlset(pages)))
+
+        files = [sitemap]
+        children = []
+        written = 0
+        for number, (start, end, latest) in enumerate(parts, 1):
+            child = self.output_dir / f'sitemap-{number}.xml'
+            written += self.writer.write_chunks(child, self.urlset(pages[start:end]))
+            files.append(child)
+            children.append((child.name, latest))
+        written += self.writer.write_chunks(sitemap, self.index(children))
+        return files, written
+
+    def stale_children(self, files: List[Path]) -> List[Path]:
+        """Child sitemaps of a previous, larger build that this one didn't write."""
+        return [path for path in self.output_dir.glob('sitemap-*.xml') if path not in files]
@@ -0,0 +1,197 @@
+/*
+ * Offline service worker (see src/precache.py). The build writes it to the site
+ * root with the version of /precache-manifest.json filled in, so a deploy that
+ * changes any output changes this file and gets installed.
+ *
+ * The core shell is cached on install, and a section's files the first time one
+ * of its pages is opened. Cached files are served without touching the network
+ * as long as their hash matches the manifest; after a deploy, only the entries
+ * whose hash changed are downloaded again, and entries that are gone are dropped.
+ */
+'use strict';
+
+var VERSION = '__PRECACHE_VERSION__';
+var CACHE = 'precache';
+var MANIFEST_URL = '/precache-manifest.json?v=' + VERSION;
+// Cached responses carry the hash they were checked against
+var HASH_HEADER = 'X-Precache-Hash';
+
+var manifest = null;
+
+function hex(buffer) {
+    return Array.prototype.map.call(new Uint8Array(buffer), function (byte) {
+        return ('0' + byte.toString(16)).slice(-2);
+    }).join('');
+}
+
+function fetchManifest() {
+    return fetch(MANIFEST_URL, { cache: 'no-cache' }).then(function (response) {
+        if (!response.ok) {
+            throw new Error('Precache manifest unavailable');
+        }
+        return response.clone().json().then(function (data) {
+            if (data.version !== VERSION) {
+                throw new Error('Precache manifest is from another deploy');
+            }
+            return caches.open(CACHE).then(function (cache) {
+                return cache.put(MANIFEST_URL, response);
+            }).then(function () {
+                return data;
+            });
+        });
+    });
+}
+
+// The manifest this worker was installed with, from the cache once it is there
+function loadManifest() {
+    if (!manifest) {
+        manifest = caches.open(CACHE).then(function (cache) {
+            return cache.match(MANIFEST_URL);
+        }).then(function (response) {
+            return response ? response.json() : fetchManifest();
+        });
+        manifest.catch(function () {
+            manifest = null;
+        });
+    }
+    return manifest;
+}
+
+// Download url into the cache unless the cached copy already has this hash.
+// Downloads that don't match the hash (e.g. a CDN still serving the previous
+// deploy) are not cached, the entry is tried again the next time it is needed.
+function update(cache, url, hash) {
+    return cache.match(url).then(function (cached) {
+        if (cached && cached.headers.get(HASH_HEADER) === hash) {
+            return;
+        }
+        return fetch(url, { cache: 'no-cache' }).then(function (response) {
+            if (!response.ok || response.redirected) {
+                return;
+            }
+            return response.arrayBuffer().then(function (body) {
+                return crypto.subtle.digest('SHA-256', body).then(function (digest) {
+                    if (hex(digest).slice(0, hash.length) !== hash) {
+                        return;
+                    }
+                    var headers = { 'Content-Type': response.headers.get('Content-Type') || '' };
+                    headers[HASH_HEADER] = hash;
+                    return cache.put(url, new Response(body, { headers: headers }));
+                });
+            });
+        });
+    }).catch(function () {
+        // Offline: left for next time
+    });
+}
+
+function cacheGroup(entries) {
+    return caches.open(CACHE).then(function (cache) {
+        return Promise.all(Object.keys(entries).map(function (url) {
+            return update(cache, url, entries[url]);
+        }));
+    });
+}
+
+// Manifest entry a request path is served from, the way the static host
+// resolves directories and extensionless URLs. A directory asked for without
+// its trailing slash gets the redirect the host sends (/aws -> /aws/), so the
+// page's relative links resolve against the directory.
+function lookup(data, path) {
+    try {
+        path = decodeURIComponent(path);
+    } catch (e) {
+        return null;
+    }
+    var candidates = /\/$/.test(path) ? [path + 'index.html'] : [path, path + '.html', path + '/index.html'];
+    for (var i = 0; i < candidates.length; i++) {
+        var url = candidates[i];
+        var group = url.split('/')[1];
+        var entry = null;
+        if (data.core[url]) {
+            entry = { url: url, hash: data.core[url], group: null };
+        } else if (data.groups[group] && data.groups[group][url]) {
+            entry = { url: url, hash: data.groups[group][url], group: group };
+        }
+        if (entry) {
+            if (url === path + '/index.html') {
+                entry.redirect = encodeURI(path + '/');
+            }
+            return entry;
+        }
+    }
+    return null;
+}
+
+self.addEventListener('install', function (event) {
+    event.waitUntil(fetchManifest().then(function (data) {
+        manifest = Promise.resolve(data);
+        return cacheGroup(data.core);
+    }).then(function () {
+        return self.skipWaiting();
+    }));
+});
+
+self.addEventListener('activate', function (event) {
+    event.waitUntil(loadManifest().then(function (data) {
+        return caches.open(CACHE).then(function (cache) {
+            return cache.keys().then(function (requests) {
+                var manifestUrl = new URL(MANIFEST_URL, self.location.href).href;
+                return Promise.all(requests.map(function (request) {
+                    var url = new URL(request.url);
+                    if (request.url === manifestUrl || (!url.search && lookup(data, url.pathname))) {
+                        return null;
+                    }
+                    // Removed outputs and the manifests of previous versions
+                    return cache.delete(request);
+                }));
+            });
+        });
+    }).then(function () {
+        return self.clients.claim();
+    }));
+});
+
+self.addEventListener('fetch', function (event) {
+    var request = event.request;
+    var url = new URL(request.url);
+    if (request.method !== 'GET' || url.origin !== self.location.origin || url.search) {
+        return;
+    }
+    event.respondWith(loadManifest().then(function (data) {
+        var entry = lookup(data, url.pathname);
+        if (!entry) {
+            return fetch(request);
+        }
+        if (entry.redirect) {
+            return Response.redirect(entry.redirect, 301);
+        }
+        if (entry.group && request.mode === 'navigate') {
+            // The rest of the section, for the next page and for reading offline
+            event.waitUntil(cacheGroup(data.groups[entry.group]));
+        }
+        return caches.open(CACHE).then(function (cache) {
+            return cache.match(entry.url).then(function (cached) {
+                if (cached && cached.headers.get(HASH_HEADER) === entry.hash) {
+                    return cached;
+                }
+                return update(cache, entry.url, entry.hash).then(function () {
+                    return cache.match(entry.url);
+                }).then(function (response) {
+                    if (response && response.headers.get(HASH_HEADER) === entry.hash) {
+                        return response;
+                    }
+                    // Not cacheable right now: the network, or an outdated copy when offline
+                    return fetch(request).catch(function (error) {
+                        if (cached) {
+                            return cached;
+                        }
+                        throw error;
+                    });
+                });
+            });
+        });
+    }, function () {
+        return fetch(request);
+    }));
+});
@@ -0,0 +1,88 @@
+"""
+Template dependency graph.
+Records which templates each template includes, extends or imports, so an
+output's fingerprint covers exactly the templates it is rendered from and a
+template edit invalidates only the outputs that reach it. The references of a
+template are kept in the build cache by file size and mtime, so templates are
+only parsed again after they change.
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class TemplateGraph:
+    """include/extends/import edges between the templates in a directory."""
+
+    def __init__(self, templates_dir: Path, state_path: Path,
+                 references: Callable[[str], Iterable[Optional[str]]]):
+        self.templates_dir = templates_dir
+        self.state_path = state_path
+        # Template source -> names it references; None for a name only known at render time
+        self.references = references
+        self.edges: Dict[str, List[Optional[str]]] = {}
+
+    def load(self) -> int:
+        """Refresh the graph from the templates on disk. Returns how many were parsed."""
+        previous = {}
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        state = {}
+        parsed = 0
+        for path in sorted(self.templates_dir.rglob('*')):
+            if not path.is_file():
+                continue
+            name = path.relative_to(self.templates_dir).as_posix()
+            stat = path.stat()
+            entry = previous.get(name)
+            if entry and entry[:2] == [stat.st_size, stat.st_mtime_ns]:
+                state[name] = entry
+                continue
+            refs = sorted(set(self.references(path.read_text(encoding='utf-8'))), key=lambda ref: ref or '')
+            state[name] = [stat.st_size, stat.st_mtime_ns, refs]
+            parsed += 1
+
+        self.edges = {name: entry[2] for name, entry in state.items()}
+        if state != previous:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.state_path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(state, separators=(',', ':'), sort_keys=True))
+        return parsed
+
+    def dependencies(self, roots: Iterable[str]) -> List[str]:
+        """The roots and every template they reach, sorted.
+
+        A template that picks what to include at render time could reach any
+        template, so it depends on all of them.
+        """
+        seen = set()
+        stack = list(roots)
+        while stack:
+            name = stack.pop()
+            if name in seen or name not in self.edges:
+                continue
+            seen.add(name)
+            for ref in self.edges[name]:
+                if ref is None:
+                    return sorted(self.edges)
+                stack.append(ref)
+        return sorted(seen)
+
+    def chain(self, roots: Iterable[str], target: str) -> List[str]:
+        """Shortest include path from one of the roots to target, both ends included."""
+        paths = {root: [root] for root in roots if root in self.edges}
+        queue = list(paths)
+        while queue:
+            name = queue.pop(0)
+            if name == target:
+                return paths[name]
+            for ref in self.edges[name]:
+                if ref is not None and ref in self.edges and ref not in paths:
+                    paths[ref] = paths[name] + [ref]
+                    queue.append(ref)
+        return [target]
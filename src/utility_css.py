@@ -0,0 +1,645 @@
+"""
+Build-time utility stylesheet.
+Generates only the Tailwind utility classes the site actually uses, so pages can
+link one small static stylesheet instead of running the Tailwind CDN compiler in
+every visitor's browser. Covers Tailwind's preflight, its default theme and the
+utility families and variants (sm/md/lg/xl/2xl, hover, focus, active,
+group-hover, ...) that appear in the site's pages, templates and scripts.
+"""
+
+import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+
+# Anything that could be a class name: Tailwind-style candidate extraction over
+# the whole file also picks up classes added from JavaScript strings
+CANDIDATE_RE = re.compile(r'[^<>"\'`\s=]*[^<>"\'`\s:=]')
+CLASS_ATTR_RE = re.compile(r'class\s*=\s*(?:"([^"]*)"|\'([^\']*)\')', re.IGNORECASE)
+
+BREAKPOINTS = [('sm', '640px'), ('md', '768px'), ('lg', '1024px'), ('xl', '1280px'), ('2xl', '1536px')]
+BREAKPOINT_INDEX = {name: index + 1 for index, (name, _) in enumerate(BREAKPOINTS)}
+
+# State variants in the order Tailwind emits them (later wins on equal specificity)
+GROUP_VARIANTS = {'group-hover': ':hover', 'group-focus': ':focus'}
+PSEUDO_VARIANTS = {
+    'first': ':first-child', 'last': ':last-child', 'odd': ':nth-child(odd)', 'even': ':nth-child(even)',
+    'focus-within': ':focus-within', 'hover': ':hover', 'focus': ':focus',
+    'focus-visible': ':focus-visible', 'active': ':active', 'disabled': ':disabled',
+}
+VARIANT_ORDER = {name: index + 1 for index, name in enumerate(list(GROUP_VARIANTS) + list(PSEUDO_VARIANTS))}
+
+SHADES = ['50', '100', '200', '300', '400', '500', '600', '700', '800', '900', '950']
+PALETTE = {
+    'slate': '#f8fafc #f1f5f9 #e2e8f0 #cbd5e1 #94a3b8 #64748b #475569 #334155 #1e293b #0f172a #020617',
+    'gray': '#f9fafb #f3f4f6 #e5e7eb #d1d5db #9ca3af #6b7280 #4b5563 #374151 #1f2937 #111827 #030712',
+    'zinc': '#fafafa #f4f4f5 #e4e4e7 #d4d4d8 #a1a1aa #71717a #52525b #3f3f46 #27272a #18181b #09090b',
+    'neutral': '#fafafa #f5f5f5 #e5e5e5 #d4d4d4 #a3a3a3 #737373 #525252 #404040 #262626 #171717 #0a0a0a',
+    'stone': '#fafaf9 #f5f5f4 #e7e5e4 #d6d3d1 #a8a29e #78716c #57534e #44403c #292524 #1c1917 #0c0a09',
+    'red': '#fef2f2 #fee2e2 #fecaca #fca5a5 #f87171 #ef4444 #dc2626 #b91c1c #991b1b #7f1d1d #450a0a',
+    'orange': '#fff7ed #ffedd5 #fed7aa #fdba74 #fb923c #f97316 #ea580c #c2410c #9a3412 #7c2d12 #431407',
+    'amber': '#fffbeb #fef3c7 #fde68a #fcd34d #fbbf24 #f59e0b #d97706 #b45309 #92400e #78350f #451a03',
+    'yellow': '#fefce8 #fef9c3 #fef08a #fde047 #facc15 #eab308 #ca8a04 #a16207 #854d0e #713f12 #422006',
+    'lime': '#f7fee7 #ecfccb #d9f99d #bef264 #a3e635 #84cc16 #65a30d #4d7c0f #3f6212 #365314 #1a2e05',
+    'green': '#f0fdf4 #dcfce7 #bbf7d0 #86efac #4ade80 #22c55e #16a34a #15803d #166534 #14532d #052e16',
+    'emerald': '#ecfdf5 #d1fae5 #a7f3d0 #6ee7b7 #34d399 #10b981 #059669 #047857 #065f46 #064e3b #022c22',
+    'teal': '#f0fdfa #ccfbf1 #99f6e4 #5eead4 #2dd4bf #14b8a6 #0d9488 #0f766e #115e59 #134e4a #042f2e',
+    'cyan': '#ecfeff #cffafe #a5f3fc #67e8f9 #22d3ee #06b6d4 #0891b2 #0e7490 #155e75 #164e63 #083344',
+    'sky': '#f0f9ff #e0f2fe #bae6fd #7dd3fc #38bdf8 #0ea5e9 #0284c7 #0369a1 #075985 #0c4a6e #082f49',
+    'blue': '#eff6ff #dbeafe #bfdbfe #93c5fd #60a5fa #3b82f6 #2563eb #1d4ed8 #1e40af #1e3a8a #172554',
+    'indigo': '#eef2ff #e0e7ff #c7d2fe #a5b4fc #818cf8 #6366f1 #4f46e5 #4338ca #3730a3 #312e81 #1e1b4b',
+    'violet': '#f5f3ff #ede9fe #ddd6fe #c4b5fd #a78bfa #8b5cf6 #7c3aed #6d28d9 #5b21b6 #4c1d95 #2e1065',
+    'purple': '#faf5ff #f3e8ff #e9d5ff #d8b4fe #c084fc #a855f7 #9333ea #7e22ce #6b21a8 #581c87 #3b0764',
+    'fuchsia': '#fdf4ff #fae8ff #f5d0fe #f0abfc #e879f9 #d946ef #c026d3 #a21caf #86198f #701a75 #4a044e',
+    'pink': '#fdf2f8 #fce7f3 #fbcfe8 #f9a8d4 #f472b6 #ec4899 #db2777 #be185d #9d174d #831843 #500724',
+    'rose': '#fff1f2 #ffe4e6 #fecdd3 #fda4af #fb7185 #f43f5e #e11d48 #be123c #9f1239 #881337 #4c0519',
+}
+COLORS = {f'{name}-{shade}': value
+          for name, values in PALETTE.items() for shade, value in zip(SHADES, values.split())}
+COLORS.update({'white': '#ffffff', 'black': '#000000'})
+KEYWORD_COLORS = {'transparent': 'transparent', 'current': 'currentColor', 'inherit': 'inherit'}
+
+FONT_FAMILIES = {
+    'sans': 'ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, '
+            '"Helvetica Neue", Arial, "Noto Sans", sans-serif, "Apple Color Emoji", "Segoe UI Emoji", '
+            '"Segoe UI Symbol", "Noto Color Emoji"',
+    'serif': 'ui-serif, Georgia, Cambria, "Times New Roman", Times, serif',
+    'mono': 'ui-monospace, SFMono-Regular, Menlo, Monaco, Consolas, "Liberation Mono", "Courier New", monospace',
+}
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'), '7xl': ('4.5rem', '1'), '8xl': ('6rem', '1'), '9xl': ('8rem', '1'),
+}
+FONT_WEIGHTS = {
+    'thin': '100', 'extralight': '200', 'light': '300', 'normal': '400', 'medium': '500',
+    'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900',
+}
+LEADING = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+TRACKING = {'tighter': '-0.05em', 'tight': '-0.025em', 'normal': '0em', 'wide': '0.025em',
+            'wider': '0.05em', 'widest': '0.1em'}
+RADII = {'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+         'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px'}
+SHADOWS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    '2xl': '0 25px 50px -12px rgb(0 0 0 / 0.25)',
+    'inner': 'inset 0 2px 4px 0 rgb(0 0 0 / 0.05)',
+    'none': '0 0 #0000',
+}
+MAX_WIDTHS = {
+    'none': 'none', 'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem',
+    '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem',
+    'full': '100%', 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content', 'prose': '65ch',
+    **{f'screen-{name}': width for name, width in BREAKPOINTS},
+}
+SIZE_KEYWORDS = {'auto': 'auto', 'full': '100%', 'min': 'min-content', 'max': 'max-content', 'fit': 'fit-content'}
+EASINGS = {'linear': 'linear', 'in': 'cubic-bezier(0.4, 0, 1, 1)', 'out': 'cubic-bezier(0, 0, 0.2, 1)',
+           'in-out': 'cubic-bezier(0.4, 0, 0.2, 1)'}
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, '
+        'box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+TRANSFORM = ('translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+             'scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))')
+BOX_SHADOW = 'var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)'
+# Shorthands first, then axes, then single sides, as Tailwind orders them
+SIDE_ORDER = ['', 'x', 'y', 't', 'r', 'b', 'l', 'tl', 'tr', 'br', 'bl']
+SIDES = {'t': ['top'], 'r': ['right'], 'b': ['bottom'], 'l': ['left'], 'x': ['left', 'right'], 'y': ['top', 'bottom']}
+CORNERS = {'t': ['top-left', 'top-right'], 'r': ['top-right', 'bottom-right'],
+           'b': ['bottom-right', 'bottom-left'], 'l': ['top-left', 'bottom-left'],
+           'tl': ['top-left'], 'tr': ['top-right'], 'br': ['bottom-right'], 'bl': ['bottom-left']}
+
+Declarations = List[Tuple[str, str]]
+
+# Keyword utilities, grouped per family in the order Tailwind emits them
+STATIC_UTILITIES: List[Dict[str, Declarations]] = [
+    {
+        'sr-only': [('position', 'absolute'), ('width', '1px'), ('height', '1px'), ('padding', '0'),
+                    ('margin', '-1px'), ('overflow', 'hidden'), ('clip', 'rect(0, 0, 0, 0)'),
+                    ('white-space', 'nowrap'), ('border-width', '0')],
+        'not-sr-only': [('position', 'static'), ('width', 'auto'), ('height', 'auto'), ('padding', '0'),
+                        ('margin', '0'), ('overflow', 'visible'), ('clip', 'auto'), ('white-space', 'normal')],
+    },
+    {'pointer-events-none': [('pointer-events', 'none')], 'pointer-events-auto': [('pointer-events', 'auto')]},
+    {'visible': [('visibility', 'visible')], 'invisible': [('visibility', 'hidden')]},
+    {name: [('position', name)] for name in ['static', 'fixed', 'absolute', 'relative', 'sticky']},
+    {'box-border': [('box-sizing', 'border-box')], 'box-content': [('box-sizing', 'content-box')]},
+    {
+        'block': [('display', 'block')], 'inline-block': [('display', 'inline-block')],
+        'inline': [('display', 'inline')], 'flex': [('display', 'flex')],
+        'inline-flex': [('display', 'inline-flex')], 'table': [('display', 'table')],
+        'grid': [('display', 'grid')], 'inline-grid': [('display', 'inline-grid')],
+        'contents': [('display', 'contents')], 'hidden': [('display', 'none')],
+    },
+    {
+        'flex-1': [('flex', '1 1 0%')], 'flex-auto': [('flex', '1 1 auto')],
+        'flex-initial': [('flex', '0 1 auto')], 'flex-none': [('flex', 'none')],
+        'flex-shrink-0': [('flex-shrink', '0')], 'shrink-0': [('flex-shrink', '0')],
+        'flex-shrink': [('flex-shrink', '1')], 'shrink': [('flex-shrink', '1')],
+        'flex-grow': [('flex-grow', '1')], 'grow': [('flex-grow', '1')],
+        'flex-grow-0': [('flex-grow', '0')], 'grow-0': [('flex-grow', '0')],
+    },
+    {'transform': [('transform', TRANSFORM)], 'transform-none': [('transform', 'none')]},
+    {'cursor-pointer': [('cursor', 'pointer')], 'cursor-default': [('cursor', 'default')],
+     'cursor-not-allowed': [('cursor', 'not-allowed')]},
+    {'select-none': [('user-select', 'none')], 'select-text': [('user-select', 'text')],
+     'select-all': [('user-select', 'all')]},
+    {'list-inside': [('list-style-position', 'inside')], 'list-outside': [('list-style-position', 'outside')]},
+    {'list-none': [('list-style-type', 'none')], 'list-disc': [('list-style-type', 'disc')],
+     'list-decimal': [('list-style-type', 'decimal')]},
+    {'flex-row': [('flex-direction', 'row')], 'flex-row-reverse': [('flex-direction', 'row-reverse')],
+     'flex-col': [('flex-direction', 'column')], 'flex-col-reverse': [('flex-direction', 'column-reverse')]},
+    {'flex-wrap': [('flex-wrap', 'wrap')], 'flex-wrap-reverse': [('flex-wrap', 'wrap-reverse')],
+     'flex-nowrap': [('flex-wrap', 'nowrap')]},
+    {f'items-{name}': [('align-items', value)] for name, value in
+     [('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'), ('baseline', 'baseline'),
+      ('stretch', 'stretch')]},
+    {f'justify-{name}': [('justify-content', value)] for name, value in
+     [('start', 'flex-start'), ('end', 'flex-end'), ('center', 'center'), ('between', 'space-between'),
+      ('around', 'space-around'), ('evenly', 'space-evenly')]},
+    {f'overflow-{axis}{value}': [(f'overflow{axis and "-" + axis[:-1]}', value)]
+     for axis in ['', 'x-', 'y-'] for value in ['auto', 'hidden', 'visible', 'scroll']},
+    {'truncate': [('overflow', 'hidden'), ('text-overflow', 'ellipsis'), ('white-space', 'nowrap')]},
+    {f'whitespace-{value}': [('white-space', value)] for value in ['normal', 'nowrap', 'pre', 'pre-line', 'pre-wrap']},
+    {f'border-{style}': [('border-style', style)] for style in ['solid', 'dashed', 'dotted', 'double', 'none']},
+    {f'text-{align}': [('text-align', align)] for align in ['left', 'center', 'right', 'justify']},
+    {'uppercase': [('text-transform', 'uppercase')], 'lowercase': [('text-transform', 'lowercase')],
+     'capitalize': [('text-transform', 'capitalize')], 'normal-case': [('text-transform', 'none')]},
+    {'italic': [('font-style', 'italic')], 'not-italic': [('font-style', 'normal')]},
+    {'underline': [('text-decoration-line', 'underline')], 'line-through': [('text-decoration-line', 'line-through')],
+     'no-underline': [('text-decoration-line', 'none')]},
+    {'antialiased': [('-webkit-font-smoothing', 'antialiased'), ('-moz-osx-font-smoothing', 'grayscale')]},
+    {'outline-none': [('outline', '2px solid transparent'), ('outline-offset', '2px')]},
+    {'scroll-smooth': [('scroll-behavior', 'smooth')], 'scroll-auto': [('scroll-behavior', 'auto')]},
+]
+STATIC_INDEX = {name: (index, declarations)
+                for index, family in enumerate(STATIC_UTILITIES) for name, declarations in family.items()}
+
+# Functional utilities: (class prefix, family order); the order interleaves
+# with the keyword families above by their position in this list
+FUNCTIONAL_ORDER = [
+    'inset', 'z', 'col-span', 'm', 'h', 'max-h', 'min-h', 'w', 'min-w', 'max-w', 'translate', 'rotate',
+    'scale', 'grid-cols', 'gap', 'space', 'rounded', 'border-width', 'border-color', 'bg', 'p',
+    'font-family', 'text-size', 'font-weight', 'leading', 'tracking', 'text-color', 'opacity', 'shadow',
+    'ring', 'ring-color', 'ring-offset', 'transition', 'duration', 'ease',
+]
+# Where each functional family sits relative to the keyword families
+FUNCTIONAL_AFTER_STATIC = {
+    'inset': 3, 'z': 3, 'col-span': 3, 'm': 3, 'h': 5, 'max-h': 5, 'min-h': 5, 'w': 5, 'min-w': 5,
+    'max-w': 5, 'translate': 6, 'rotate': 6, 'scale': 6, 'grid-cols': 11, 'gap': 15, 'space': 15,
+    'rounded': 18, 'border-width': 18, 'border-color': 19, 'bg': 19, 'p': 19, 'font-family': 20,
+    'text-size': 20, 'font-weight': 20, 'leading': 22, 'tracking': 22, 'text-color': 22,
+    'opacity': 24, 'shadow': 24, 'ring': 25, 'ring-color': 25, 'ring-offset': 25,
+    'transition': 26, 'duration': 26, 'ease': 26,
+}
+
+# Leading word of every functional utility; other tokens skip the per-family matching
+FUNCTIONAL_ROOT_RE = re.compile(
+    r'-?(?:inset|top|right|bottom|left|z|col|[mp][xytrbl]?|w|h|min|max|translate|rotate|scale|grid|gap|'
+    r'space|rounded|border|bg|font|text|leading|tracking|opacity|shadow|ring|transition|duration|ease)(?:-|$)'
+)
+
+BASE_CSS = '''*, ::before, ::after { --tw-translate-x: 0; --tw-translate-y: 0; --tw-rotate: 0; --tw-scale-x: 1; --tw-scale-y: 1; --tw-ring-offset-width: 0px; --tw-ring-offset-color: #fff; --tw-ring-color: rgb(59 130 246 / 0.5); --tw-ring-offset-shadow: 0 0 #0000; --tw-ring-shadow: 0 0 #0000; --tw-shadow: 0 0 #0000; }'''
+
+# Tailwind CSS preflight (MIT licensed), so pages render as they did with the CDN
+PREFLIGHT = '''*, ::before, ::after { box-sizing: border-box; border-width: 0; border-style: solid; border-color: #e5e7eb; }
+::before, ::after { --tw-content: ''; }
+html { line-height: 1.5; -webkit-text-size-adjust: 100%; -moz-tab-size: 4; tab-size: 4; font-family: {sans}; font-feature-settings: normal; font-variation-settings: normal; }
+body { margin: 0; line-height: inherit; }
+hr { height: 0; color: inherit; border-top-width: 1px; }
+abbr:where([title]) { text-decoration: underline dotted; }
+h1, h2, h3, h4, h5, h6 { font-size: inherit; font-weight: inherit; }
+a { color: inherit; text-decoration: inherit; }
+b, strong { font-weight: bolder; }
+code, kbd, samp, pre { font-family: {mono}; font-size: 1em; }
+small { font-size: 80%; }
+sub, sup { font-size: 75%; line-height: 0; position: relative; vertical-align: baseline; }
+sub { bottom: -0.25em; }
+sup { top: -0.5em; }
+table { text-indent: 0; border-color: inherit; border-collapse: collapse; }
+button, input, optgroup, select, textarea { font-family: inherit; font-feature-settings: inherit; font-variation-settings: inherit; font-size: 100%; font-weight: inherit; line-height: inherit; color: inherit; margin: 0; padding: 0; }
+button, select { text-transform: none; }
+button, [type='button'], [type='reset'], [type='submit'] { -webkit-appearance: button; background-color: transparent; background-image: none; }
+:-moz-focusring { outline: auto; }
+:-moz-ui-invalid { box-shadow: none; }
+progress { vertical-align: baseline; }
+::-webkit-inner-spin-button, ::-webkit-outer-spin-button { height: auto; }
+[type='search'] { -webkit-appearance: textfield; outline-offset: -2px; }
+::-webkit-search-decoration { -webkit-appearance: none; }
+::-webkit-file-upload-button { -webkit-appearance: button; font: inherit; }
+summary { display: list-item; }
+blockquote, dl, dd, h1, h2, h3, h4, h5, h6, hr, figure, p, pre { margin: 0; }
+fieldset { margin: 0; padding: 0; }
+legend { padding: 0; }
+ol, ul, menu { list-style: none; margin: 0; padding: 0; }
+dialog { padding: 0; }
+textarea { resize: vertical; }
+input::placeholder, textarea::placeholder { opacity: 1; color: #9ca3af; }
+button, [role="button"] { cursor: pointer; }
+:disabled { cursor: default; }
+img, svg, video, canvas, audio, iframe, embed, object { display: block; vertical-align: middle; }
+img, video { max-width: 100%; height: auto; }
+[hidden] { display: none; }'''.replace('{sans}', FONT_FAMILIES['sans']).replace('{mono}', FONT_FAMILIES['mono'])
+
+
+class Rule(NamedTuple):
+    """One generated rule and its position in the stylesheet."""
+    breakpoint: int
+    variant: int
+    family: float
+    sub: int
+    name: str
+    selector: str
+    declarations: Declarations
+
+
+def extract_candidates(text: str) -> Set[str]:
+    """Every token in a file that might be a utility class."""
+    candidates = set(CANDIDATE_RE.findall(text))
+    for match in CLASS_ATTR_RE.finditer(text):
+        candidates.update((match.group(1) or match.group(2) or '').split())
+    return candidates
+
+
+def escape_class(name: str) -> str:
+    """Escape a class name for use in a CSS selector."""
+    escaped = re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+    if escaped[0].isdigit():
+        escaped = f'\\{ord(escaped[0]):x} {escaped[1:]}'
+    return escaped
+
+
+def split_variants(candidate: str) -> List[str]:
+    """Split 'md:hover:bg-[#fff]' on colons outside brackets."""
+    parts, depth, start = [], 0, 0
+    for index, char in enumerate(candidate):
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        elif char == ':' and depth == 0:
+            parts.append(candidate[start:index])
+            start = index + 1
+    parts.append(candidate[start:])
+    return parts
+
+
+def _number(value: float) -> str:
+    return f'{value:.6f}'.rstrip('0').rstrip('.')
+
+
+def arbitrary(value: str) -> Optional[str]:
+    """The CSS value of an arbitrary '[...]' utility value (underscores are spaces)."""
+    if len(value) > 2 and value[0] == '[' and value[-1] == ']':
+        return value[1:-1].replace('_', ' ')
+    return None
+
+
+def spacing(value: str) -> Optional[str]:
+    """Tailwind spacing scale: n -> n * 0.25rem."""
+    if value == 'px':
+        return '1px'
+    if value == '0':
+        return '0px'
+    if re.fullmatch(r'\d+(\.5)?', value):
+        return f'{_number(float(value) / 4)}rem'
+    return arbitrary(value)
+
+
+def fraction(value: str) -> Optional[str]:
+    match = re.fullmatch(r'(\d+)/(\d+)', value)
+    if match is None or int(match.group(2)) == 0:
+        return None
+    return f'{_number(int(match.group(1)) * 100 / int(match.group(2)))}%'
+
+
+def hex_to_rgb(value: str) -> Optional[Tuple[int, int, int]]:
+    value = value.lstrip('#')
+    if len(value) == 3:
+        value = ''.join(char * 2 for char in value)
+    if not re.fullmatch(r'[0-9a-fA-F]{6}', value):
+        return None
+    return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+
+
+def color(value: str) -> Optional[str]:
+    """Palette, keyword or arbitrary color, with an optional /opacity modifier."""
+    match = re.fullmatch(r'(.+?)(?:/(\d+|\[[\d.]+\]))?', value)
+    if match is None:
+        return None
+    name, opacity = match.groups()
+
+    if name in KEYWORD_COLORS:
+        return KEYWORD_COLORS[name] if opacity is None else None
+    css = COLORS.get(name)
+    if css is None:
+        css = arbitrary(name)
+        if css is None or not (css.startswith('#') or css.startswith(('rgb', 'hsl'))):
+            return None
+    if opacity is None:
+        return css
+
+    alpha = arbitrary(opacity) or _number(int(opacity) / 100)
+    rgb = hex_to_rgb(css) if css.startswith('#') else None
+    if rgb is None:
+        return None
+    return f'rgb({rgb[0]} {rgb[1]} {rgb[2]} / {alpha})'
+
+
+class UtilityCss:
+    """Turns class-name candidates into a minimal utility stylesheet."""
+
+    def __init__(self):
+        # Candidate -> rules; scanned files repeat the same words many times
+        self._rules: Dict[str, List[Rule]] = {}
+
+    def functional(self, utility: str) -> Optional[Tuple[str, Declarations, str]]:
+        """Resolve a value-taking utility to (family, declarations, selector suffix[, sub-order])."""
+        negative = utility.startswith('-')
+        if negative:
+            utility = utility[1:]
+
+        def signed(value: Optional[str]) -> Optional[str]:
+            if value is None or not negative:
+                return value
+            return f'calc({value} * -1)' if value.startswith(('var', 'calc')) else f'-{value}'
+
+        # Positioning
+        match = re.fullmatch(r'(inset|inset-x|inset-y|top|right|bottom|left)-(.+)', utility)
+        if match:
+            value = signed(spacing(match.group(2)) or fraction(match.group(2)) or
+                           {'auto': 'auto', 'full': '100%'}.get(match.group(2)))
+            properties = {'inset': ['top', 'right', 'bottom', 'left'], 'inset-x': ['left', 'right'],
+                          'inset-y': ['top', 'bottom']}.get(match.group(1), [match.group(1)])
+            return value and ('inset', [(prop, value) for prop in properties], '')
+
+        match = re.fullmatch(r'z-(\d+|auto)', utility)
+        if match and not negative:
+            return 'z', [('z-index', match.group(1))], ''
+
+        match = re.fullmatch(r'col-span-(\d+|full)', utility)
+        if match and not negative:
+            value = '1 / -1' if match.group(1) == 'full' else f'span {match.group(1)} / span {match.group(1)}'
+            return 'col-span', [('grid-column', value)], ''
+
+        # Margin and padding
+        match = re.fullmatch(r'([mp])([xytrbl]?)-(.+)', utility)
+        if match:
+            kind, side, raw = match.groups()
+            value = spacing(raw) or ('auto' if kind == 'm' and raw == 'auto' else None)
+            if kind == 'p' and negative:
+                return None
+            value = signed(value)
+            prop = 'margin' if kind == 'm' else 'padding'
+            sides = SIDES.get(side)
+            declarations = [(f'{prop}-{name}', value) for name in sides] if sides else [(prop, value)]
+            return value and (kind, declarations, '', SIDE_ORDER.index(side))
+
+        # Sizing
+        match = re.fullmatch(r'(w|h|min-w|min-h|max-h)-(.+)', utility)
+        if match and not negative:
+            kind, raw = match.groups()
+            screen = '100vw' if kind.endswith('w') else '100vh'
+            value = (spacing(raw) if not kind.startswith('min') else ({'0': '0px'}.get(raw) or arbitrary(raw))) \
+                or fraction(raw) or SIZE_KEYWORDS.get(raw) or (screen if raw == 'screen' else None)
+            prop = {'w': 'width', 'h': 'height', 'min-w': 'min-width', 'min-h': 'min-height',
+                    'max-h': 'max-height'}[kind]
+            return value and (kind, [(prop, value)], '')
+
+        match = re.fullmatch(r'max-w-(.+)', utility)
+        if match and not negative:
+            value = MAX_WIDTHS.get(match.group(1)) or arbitrary(match.group(1))
+            return value and ('max-w', [('max-width', value)], '')
+
+        # Transforms
+        match = re.fullmatch(r'translate-([xy])-(.+)', utility)
+        if match:
+            value = signed(spacing(match.group(2)) or fraction(match.group(2)) or
+                           ('100%' if match.group(2) == 'full' else None))
+            return value and ('translate', [(f'--tw-translate-{match.group(1)}', value),
+                                            ('transform', TRANSFORM)], '')
+        match = re.fullmatch(r'rotate-(\d+)', utility)
+        if match:
+            return 'rotate', [('--tw-rotate', signed(f'{match.group(1)}deg')), ('transform', TRANSFORM)], ''
+        match = re.fullmatch(r'scale-(x-|y-)?(\d+)', utility)
+        if match and not negative:
+            value = _number(int(match.group(2)) / 100)
+            axes = [match.group(1)[0]] if match.group(1) else ['x', 'y']
+            return 'scale', [(f'--tw-scale-{axis}', value) for axis in axes] + [('transform', TRANSFORM)], ''
+
+        # Grid, gaps and child spacing
+        match = re.fullmatch(r'grid-cols-(\d+|none)', utility)
+        if match and not negative:
+            value = 'none' if match.group(1) == 'none' else f'repeat({match.group(1)}, minmax(0, 1fr))'
+            return 'grid-cols', [('grid-template-columns', value)], ''
+        match = re.fullmatch(r'gap-(?:(x|y)-)?(.+)', utility)
+        if match and not negative:
+            value = spacing(match.group(2))
+            prop = {'x': 'column-gap', 'y': 'row-gap'}.get(match.group(1), 'gap')
+            return value and ('gap', [(prop, value)], '')
+        match = re.fullmatch(r'space-([xy])-(.+)', utility)
+        if match:
+            value = signed(spacing(match.group(2)))
+            prop = 'margin-left' if match.group(1) == 'x' else 'margin-top'
+            return value and ('space', [(prop, value)], ' > :not([hidden]) ~ :not([hidden])')
+
+        if negative:
+            return None
+
+        # Borders
+        match = re.fullmatch(r'rounded(?:-(t|r|b|l|tl|tr|br|bl))?(?:-(.+))?', utility)
+        if match:
+            corner, size = match.group(1), match.group(2) or ''
+            value = RADII.get(size) or arbitrary(size)
+            if value is None:
+                return None
+            corners = CORNERS.get(corner)
+            declarations = [(f'border-{name}-radius', value) for name in corners] if corners \
+                else [('border-radius', value)]
+            return 'rounded', declarations, '', SIDE_ORDER.index(corner or '')
+        match = re.fullmatch(r'border(?:-([xytrbl]))?(?:-(\d+))?', utility)
+        if match:
+            sides = SIDES.get(match.group(1))
+            value = f'{match.group(2) or 1}px'
+            declarations = [(f'border-{name}-width', value) for name in sides] if sides \
+                else [('border-width', value)]
+            return 'border-width', declarations, '', SIDE_ORDER.index(match.group(1) or '')
+        match = re.fullmatch(r'border-(.+)', utility)
+        if match:
+            value = color(match.group(1))
+            return value and ('border-color', [('border-color', value)], '')
+
+        # Backgrounds
+        match = re.fullmatch(r'bg-(.+)', utility)
+        if match:
+            value = color(match.group(1))
+            return value and ('bg', [('background-color', value)], '')
+
+        # Typography
+        match = re.fullmatch(r'font-(.+)', utility)
+        if match:
+            name = match.group(1)
+            if name in FONT_WEIGHTS:
+                return 'font-weight', [('font-weight', FONT_WEIGHTS[name])], ''
+            value = FONT_FAMILIES.get(name) or arbitrary(name)
+            return value and ('font-family', [('font-family', value)], '')
+        match = re.fullmatch(r'text-(.+)', utility)
+        if match:
+            name = match.group(1)
+            if name in FONT_SIZES:
+                size, line_height = FONT_SIZES[name]
+                return 'text-size', [('font-size', size), ('line-height', line_height)], ''
+            value = color(name)
+            if value:
+                return 'text-color', [('color', value)], ''
+            value = arbitrary(name)
+            return value and ('text-size', [('font-size', value)], '')
+        match = re.fullmatch(r'leading-(.+)', utility)
+        if match:
+            value = LEADING.get(match.group(1)) or spacing(match.group(1))
+            return value and ('leading', [('line-height', value)], '')
+        match = re.fullmatch(r'tracking-(.+)', utility)
+        if match:
+            value = TRACKING.get(match.group(1)) or arbitrary(match.group(1))
+            return value and ('tracking', [('letter-spacing', value)], '')
+
+        # Effects
+        match = re.fullmatch(r'opacity-(\d+)', utility)
+        if match:
+            return 'opacity', [('opacity', _number(int(match.group(1)) / 100))], ''
+        match = re.fullmatch(r'shadow(?:-(.+))?', utility)
+        if match:
+            value = SHADOWS.get(match.group(1) or '')
+            return value and ('shadow', [('--tw-shadow', value), ('box-shadow', BOX_SHADOW)], '')
+
+        # Focus rings
+        match = re.fullmatch(r'ring(?:-(\d+))?', utility)
+        if match:
+            width = f'{match.group(1) or 3}px'
+            return 'ring', [
+                ('--tw-ring-offset-shadow', '0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color)'),
+                ('--tw-ring-shadow', f'0 0 0 calc({width} + var(--tw-ring-offset-width)) var(--tw-ring-color)'),
+                ('box-shadow', 'var(--tw-ring-offset-shadow), var(--tw-ring-shadow), var(--tw-shadow, 0 0 #0000)'),
+            ], ''
+        match = re.fullmatch(r'ring-offset-(\d+)', utility)
+        if match:
+            return 'ring-offset', [('--tw-ring-offset-width', f'{match.group(1)}px')], ''
+        match = re.fullmatch(r'ring-offset-(.+)', utility)
+        if match:
+            value = color(match.group(1))
+            return value and ('ring-offset', [('--tw-ring-offset-color', value)], '')
+        match = re.fullmatch(r'ring-(.+)', utility)
+        if match:
+            value = color(match.group(1))
+            return value and ('ring-color', [('--tw-ring-color', value)], '')
+
+        # Transitions
+        match = re.fullmatch(r'transition(?:-(.+))?', utility)
+        if match:
+            name = match.group(1) or ''
+            if name == 'none':
+                return 'transition', [('transition-property', 'none')], ''
+            value = TRANSITIONS.get(name)
+            return value and ('transition', [
+                ('transition-property', value),
+                ('transition-timing-function', EASINGS['in-out']),
+                ('transition-duration', '150ms'),
+            ], '')
+        match = re.fullmatch(r'duration-(\d+)', utility)
+        if match:
+            return 'duration', [('transition-duration', f'{match.group(1)}ms')], ''
+        match = re.fullmatch(r'ease-(.+)', utility)
+        if match:
+            value = EASINGS.get(match.group(1))
+            return value and ('ease', [('transition-timing-function', value)], '')
+
+        return None
+
+    def family_order(self, family: str) -> float:
+        """Sort position of a functional family among the keyword families."""
+        return FUNCTIONAL_AFTER_STATIC[family] + (FUNCTIONAL_ORDER.index(family) + 1) / 100
+
+    def rules(self, candidate: str) -> List[Rule]:
+        """The rules a candidate class produces, or [] if it is not a utility."""
+        rules = self._rules.get(candidate)
+        if rules is None:
+            rules = self._rules[candidate] = self._resolve(candidate)
+        return rules
+
+    def _resolve(self, candidate: str) -> List[Rule]:
+        *variants, utility = split_variants(candidate)
+        if not utility:
+            return []
+
+        breakpoint, state, group_state = 0, 0, ''
+        pseudo = ''
+        for variant in variants:
+            if variant in BREAKPOINT_INDEX and not breakpoint:
+                breakpoint = BREAKPOINT_INDEX[variant]
+            elif variant in GROUP_VARIANTS and not group_state:
+                group_state = GROUP_VARIANTS[variant]
+                state = max(state, VARIANT_ORDER[variant])
+            elif variant in PSEUDO_VARIANTS:
+                pseudo += PSEUDO_VARIANTS[variant]
+                state = max(state, VARIANT_ORDER[variant])
+            else:
+                return []
+
+        selector = f'.{escape_class(candidate)}{pseudo}'
+        if group_state:
+            selector = f'.group{group_state} {selector}'
+
+        if utility == 'container':
+            if variants:
+                return []
+            rules = [Rule(0, 0, -1, 0, candidate, selector, [('width', '100%')])]
+            rules.extend(Rule(index + 1, 0, -1, 0, candidate, selector, [('max-width', width)])
+                         for index, (_, width) in enumerate(BREAKPOINTS))
+            return rules
+
+        static = STATIC_INDEX.get(utility)
+        if static is not None:
+            family, declarations = static
+            return [Rule(breakpoint, state, family, 0, candidate, selector, declarations)]
+
+        resolved = FUNCTIONAL_ROOT_RE.match(utility) and self.functional(utility)
+        if not resolved:
+            return []
+        family, declarations, suffix, *sub = resolved
+        return [Rule(breakpoint, state, self.family_order(family), sub[0] if sub else 0,
+                     candidate, selector + suffix, declarations)]
+
+    def generate(self, candidates: Iterable[str]) -> Tuple[str, int]:
+        """Build the stylesheet. Returns (css, number of utility classes used)."""
+        rules = []
+        used = 0
+        for candidate in set(candidates):
+            candidate_rules = self.rules(candidate)
+            if candidate_rules:
+                used += 1
+                rules.extend(candidate_rules)
+        rules.sort(key=lambda rule: (rule.breakpoint, rule.variant, rule.family, rule.sub, rule.name))
+
+        lines = [PREFLIGHT, BASE_CSS]
+        current_breakpoint = 0
+        for rule in rules:
+            if rule.breakpoint != current_breakpoint:
+                if current_breakpoint:
+                    lines.append('}')
+                current_breakpoint = rule.breakpoint
+                lines.append(f'@media (min-width: {BREAKPOINTS[current_breakpoint - 1][1]}) {{')
+            body = '; '.join(f'{prop}: {value}' for prop, value in rule.declarations)
+            indent = '  ' if current_breakpoint else ''
+            lines.append(f'{indent}{rule.selector} {{ {body}; }}')
+        if current_breakpoint:
+            lines.append('}')
+        return '\n'.join(lines) + '\n', used
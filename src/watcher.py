@@ -0,0 +1,80 @@
+"""
+Polling file watcher for the development loop.
+Uses only the standard library, so it works the same on every platform.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Set, Tuple
+
+
+# Editor temp files and build by-products that should never trigger a rebuild
+IGNORED_PREFIXES = ('.tmp-', '.#', '#')
+IGNORED_SUFFIXES = ('~', '.swp', '.swx', '.tmp', '.pyc', '.gz', '.zst')
+IGNORED_DIRS = {'__pycache__', '.git', '.build_cache'}
+
+Snapshot = Dict[Path, Tuple[int, int]]
+
+
+class PollingWatcher:
+    """Detects added, modified and removed files under a set of directories."""
+
+    def __init__(self, roots: Iterable[Path], interval: float = 0.2, debounce: float = 0.15):
+        self.roots = [root for root in roots if root.exists()]
+        self.interval = interval
+        self.debounce = debounce
+        self.snapshot: Snapshot = self.scan()
+
+    def _ignored(self, name: str) -> bool:
+        return name.startswith(IGNORED_PREFIXES) or name.endswith(IGNORED_SUFFIXES)
+
+    def scan(self) -> Snapshot:
+        """Record (mtime_ns, size) for every watched file."""
+        snapshot = {}
+        stack = list(self.roots)
+        while stack:
+            directory = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORED_DIRS:
+                        stack.append(entry.path)
+                elif not self._ignored(entry.name):
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    snapshot[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def poll(self) -> Set[Path]:
+        """Return files changed since the last poll."""
+        current = self.scan()
+        changed = {path for path, stamp in current.items() if self.snapshot.get(path) != stamp}
+        changed |= set(self.snapshot) - set(current)
+        self.snapshot = current
+        return changed
+
+    def wait_for_changes(self) -> Set[Path]:
+        """Block until files change, then keep collecting until saves settle (debounce)."""
+        while True:
+            changed = self.poll()
+            if changed:
+                break
+            time.sleep(self.interval)
+
+        while True:
+            time.sleep(self.debounce)
+            more = self.poll()
+            if not more:
+                return changed
+            changed |= more
+
+    def watch(self, callback: Callable[[List[Path]], None]):
+        """Call callback with each settled batch of changed files, forever."""
+        while True:
+            callback(sorted(self.wait_for_changes()))
@@ -0,0 +1,11 @@
+"""
+Shared setup for the test suite: the build modules import each other flat
+from src/, as they do when build_system.py runs as a script.
+"""
+
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(0, str(PROJECT_ROOT / 'src'))
@@ -0,0 +1,37 @@
+"""
+Markdown fragment cache: a full build keeps the fragments of the current
+pages and drops those of deleted pages and of old versions of edited ones.
+"""
+
+import logging
+
+from benchmarks.bench_build import TreeGenerator
+from build_system import BuildConfig, BuildSystem
+
+
+def fragments(builder):
+    return {path.stem for path in (builder.config.cache_dir / 'markdown').rglob('*.html')}
+
+
+def test_orphaned_fragments_are_pruned(tmp_path):
+    TreeGenerator(12).generate(tmp_path)
+    logging.getLogger().setLevel(logging.WARNING)
+    builder = BuildSystem(BuildConfig(project_root=tmp_path))
+    assert builder.build()
+    sources = sorted((tmp_path / 'content').rglob('*.md'))
+    assert len(sources) >= 2
+    before = fragments(builder)
+    assert before
+
+    edited, deleted = sources[:2]
+    edited.write_text(edited.read_text(encoding='utf-8') + '\nOne more paragraph.\n', encoding='utf-8')
+    deleted.unlink()
+    assert builder.build()
+    after = fragments(builder)
+
+    recorded = {entry['flags']['fragment'] for entry in builder.manifest.entries.values()
+                if 'fragment' in entry.get('flags', {})}
+    assert after == recorded
+    # The deleted page's fragment and the edited page's old one are gone, its new one is kept
+    assert len(before - after) == 2
+    assert len(after - before) == 1
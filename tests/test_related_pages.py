@@ -0,0 +1,41 @@
+"""
+Related pages: the SciPy scorer ranks pages exactly like the pure-Python one.
+"""
+
+import random
+
+import pytest
+
+from related_pages import PythonScorer, SparseScorer, stored_terms
+
+pytest.importorskip('scipy')
+
+
+def documents(count: int, vocabulary: int, seed: int = 7):
+    """Pages with Zipf-like term frequencies over a shared vocabulary."""
+    rng = random.Random(seed)
+    terms = [f'term{i}' for i in range(vocabulary)]
+    weights = [1 / (rank + 1) for rank in range(vocabulary)]
+    pages = {}
+    for index in range(count):
+        picked = rng.choices(terms, weights, k=rng.randint(20, 200))
+        counts = {}
+        for term in picked:
+            counts[term] = counts.get(term, 0) + 1
+        pages[f'section{index % 5}/page-{index}.html'] = stored_terms(
+            {term: round(1 + n ** 0.5, 4) for term, n in counts.items()})
+    return pages
+
+
+@pytest.mark.parametrize('top_k', [5, None])
+def test_sparse_scorer_matches_python_scorer(top_k):
+    pages = documents(400, 1500)
+    rows = sorted(pages)
+    expected = PythonScorer(pages, 64).similar(rows, top_k, 0.05)
+    # Small batches so rows are split across several products
+    actual = SparseScorer(pages, 64, batch_size=64).similar(rows, top_k, 0.05)
+
+    assert sum(len(scores) for scores in expected.values()) > len(rows)
+    for key in rows:
+        assert [other for other, _ in actual[key]] == [other for other, _ in expected[key]], key
+        assert [score for _, score in actual[key]] == pytest.approx([score for _, score in expected[key]])
@@ -0,0 +1,55 @@
+"""
+Service worker lookup: request paths resolve to precache manifest entries the
+way the static host resolves them, including its redirect of a directory
+asked for without its trailing slash.
+"""
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+NODE = shutil.which('node')
+WORKER = Path(__file__).resolve().parent.parent / 'src' / 'sw.js'
+
+# Loads sw.js with stubbed worker globals and prints lookup() of every path
+LOOKUP_SCRIPT = """
+const fs = require('fs');
+const vm = require('vm');
+const [workerPath, manifestPath, paths] = process.argv.slice(1);
+const context = {self: {addEventListener() {}, location: {href: 'https://example.org/sw.js'}}};
+vm.createContext(context);
+vm.runInContext(fs.readFileSync(workerPath, 'utf8'), context);
+const manifest = JSON.parse(fs.readFileSync(manifestPath, 'utf8'));
+console.log(JSON.stringify(JSON.parse(paths).map((path) => context.lookup(manifest, path))));
+"""
+
+MANIFEST = {
+    'version': '0123456789abcdef',
+    'core': {'/index.html': '1' * 16, '/assets/site.css': '2' * 16},
+    'groups': {'aws': {'/aws/index.html': '3' * 16, '/aws/s3.html': '4' * 16}},
+}
+
+
+def lookup(tmp_path, paths):
+    manifest_path = tmp_path / 'precache-manifest.json'
+    manifest_path.write_text(json.dumps(MANIFEST), encoding='utf-8')
+    result = subprocess.run([NODE, '-e', LOOKUP_SCRIPT, str(WORKER), str(manifest_path), json.dumps(paths)],
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+@pytest.mark.skipif(NODE is None, reason='needs node')
+def test_lookup_redirects_slashless_directories(tmp_path):
+    slashless, directory, page, extensionless, root, asset, missing = lookup(
+        tmp_path, ['/aws', '/aws/', '/aws/s3.html', '/aws/s3', '/', '/assets/site.css', '/azure'])
+
+    assert slashless == {'url': '/aws/index.html', 'hash': '3' * 16, 'group': 'aws', 'redirect': '/aws/'}
+    assert directory == {'url': '/aws/index.html', 'hash': '3' * 16, 'group': 'aws'}
+    assert page == {'url': '/aws/s3.html', 'hash': '4' * 16, 'group': 'aws'}
+    assert extensionless == page
+    assert root == {'url': '/index.html', 'hash': '1' * 16, 'group': None}
+    assert asset == {'url': '/assets/site.css', 'hash': '2' * 16, 'group': None}
+    assert missing is None
@@ -0,0 +1,48 @@
+"""
+Sitemap lastmod: without a cached history (a fresh clone or CI checkout),
+pages are dated by the last commit of their source, not the checkout time.
+"""
+
+import logging
+import os
+import re
+import shutil
+import subprocess
+from datetime import datetime
+
+import pytest
+
+from benchmarks.bench_build import TreeGenerator
+from build_system import BuildConfig, BuildSystem
+
+COMMIT_DATE = '2021-03-04T10:00:00+00:00'
+
+
+def lastmods(builder):
+    sitemap = (builder.config.output_dir / 'sitemap.xml').read_text(encoding='utf-8')
+    return dict(re.findall(r'<loc>([^<]*)</loc>\s*<lastmod>([^<]*)</lastmod>', sitemap))
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='needs git')
+def test_lastmod_from_git_history(tmp_path):
+    TreeGenerator(12).generate(tmp_path)
+    env = dict(os.environ, GIT_AUTHOR_DATE=COMMIT_DATE, GIT_COMMITTER_DATE=COMMIT_DATE,
+               GIT_AUTHOR_NAME='test', GIT_AUTHOR_EMAIL='test@example.org',
+               GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@example.org')
+    for command in (['init', '-q'], ['add', 'content'], ['commit', '-q', '-m', 'content']):
+        subprocess.run(['git', '-C', str(tmp_path)] + command, env=env, check=True)
+
+    logging.getLogger().setLevel(logging.WARNING)
+    builder = BuildSystem(BuildConfig(project_root=tmp_path))
+    assert builder.build()
+    dates = lastmods(builder)
+    assert dates and set(dates.values()) == {'2021-03-04'}
+
+    # An uncommitted edit is dated by the file's mtime
+    home = tmp_path / 'content' / 'pages' / 'index.yaml'
+    home.write_text(home.read_text(encoding='utf-8') + '  One more paragraph.\n', encoding='utf-8')
+    assert builder.build()
+    edited = lastmods(builder)
+    home_url = builder.config.site_url.rstrip('/') + '/'
+    assert edited.pop(home_url) == datetime.fromtimestamp(home.stat().st_mtime).strftime('%Y-%m-%d')
+    assert set(edited.values()) == {'2021-03-04'}
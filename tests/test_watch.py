@@ -0,0 +1,40 @@
+"""
+Watch mode: a template edit is rebuilt once, and the assets that rebuild
+renames in the watched assets directory don't trigger another one.
+"""
+
+import logging
+
+from benchmarks.bench_build import TreeGenerator
+from build_system import BuildConfig, BuildSystem
+from watcher import PollingWatcher
+
+
+def test_template_edit_rebuilds_once(tmp_path):
+    TreeGenerator(12).generate(tmp_path)
+    builder = BuildSystem(BuildConfig(project_root=tmp_path))
+    logging.getLogger().setLevel(logging.WARNING)
+    assert builder.build()
+
+    builds = []
+    build = builder.build
+    builder.build = lambda: builds.append(1) or build()
+
+    config = builder.config
+    watcher = PollingWatcher([config.source_dir, config.templates_dir, config.assets_dir])
+    stylesheets = sorted(path.name for path in config.assets_dir.glob('utilities.*.css'))
+
+    # A class no page uses yet changes the utility stylesheet's hash
+    header = config.templates_dir / 'components' / 'header.html'
+    header.write_text(header.read_text(encoding='utf-8') + '\n<div class="tracking-tighter"></div>\n', encoding='utf-8')
+
+    rebuilds = []
+    for _ in range(3):
+        batch = sorted(watcher.poll())
+        if batch:
+            rebuilds.append(builder.watch_batch(batch))
+
+    assert sorted(path.name for path in config.assets_dir.glob('utilities.*.css')) != stylesheets
+    # The second batch only holds the renamed stylesheet
+    assert rebuilds == [True, None]
+    assert len(builds) == 1